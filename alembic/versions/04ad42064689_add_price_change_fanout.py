@@ -0,0 +1,62 @@
+"""add price change fan-out
+
+Revision ID: 04ad42064689
+Revises: 61f9727264a4
+Create Date: 2026-10-19 15:36:55.482019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '04ad42064689'
+down_revision: Union[str, Sequence[str], None] = '61f9727264a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_collection_pins_product_id_collection_id', 'collection_pins',
+                    ['product_id', 'collection_id'], unique=False)
+    op.create_table('price_change_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('old_price', sa.BigInteger(), nullable=False),
+    sa.Column('new_price', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('fanout_cursor', sa.UUID(), nullable=True),
+    sa.Column('fanned_out_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_price_change_events_pending', 'price_change_events', ['id'], unique=False,
+                    postgresql_where=sa.text('fanned_out_at IS NULL'))
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('source_id', sa.BigInteger(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'source_id', 'user_id', name='uq_notification_outbox_source_user')
+    )
+    op.create_index('ix_notification_outbox_unsent', 'notification_outbox', ['id'], unique=False,
+                    postgresql_where=sa.text('sent_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_outbox_unsent', table_name='notification_outbox',
+                  postgresql_where=sa.text('sent_at IS NULL'))
+    op.drop_table('notification_outbox')
+    op.drop_index('ix_price_change_events_pending', table_name='price_change_events',
+                  postgresql_where=sa.text('fanned_out_at IS NULL'))
+    op.drop_table('price_change_events')
+    op.drop_index('ix_collection_pins_product_id_collection_id', table_name='collection_pins')
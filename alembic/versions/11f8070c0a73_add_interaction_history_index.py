@@ -0,0 +1,30 @@
+"""add interaction history index
+
+Revision ID: 11f8070c0a73
+Revises: 04ad42064689
+Create Date: 2026-10-19 16:52:08.319406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11f8070c0a73'
+down_revision: Union[str, Sequence[str], None] = '04ad42064689'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_product_interactions_user_id_created_at', 'product_interactions',
+                    ['user_id', sa.text('created_at DESC'), sa.text('product_id DESC')], unique=False,
+                    postgresql_include=['interaction_type'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_interactions_user_id_created_at', table_name='product_interactions')
@@ -0,0 +1,28 @@
+"""add index on product_images.product_id
+
+Revision ID: 126e4147ffbb
+Revises: 2ca5173d1908
+Create Date: 2026-10-19 11:42:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '126e4147ffbb'
+down_revision: Union[str, Sequence[str], None] = '2ca5173d1908'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_product_images_product_id'), 'product_images', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_images_product_id'), table_name='product_images')
@@ -0,0 +1,119 @@
+"""add catalog change notifications
+
+Revision ID: 42599d051703
+Revises: 93844f898000
+Create Date: 2026-10-19 14:21:07.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42599d051703'
+down_revision: Union[str, Sequence[str], None] = '93844f898000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level triggers publish the ids touched by each statement on the catalog_changes
+# channel as "p:<id>,<id>,..." (products) or "c:" (category tree). Payloads are capped at
+# 8000 bytes, so ids go out in chunks of 200. Notifications are only delivered on commit and
+# identical payloads of one transaction are merged. Image writes (updates since 43796af48c66)
+# and attribute, brand and search_vector changes UPDATE products through other triggers, so
+# the products triggers cover them too.
+NOTIFY_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION notify_catalog_changes(kind text, ids text[]) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    i integer;
+BEGIN
+    FOR i IN 1 .. coalesce(cardinality(ids), 0) BY 200 LOOP
+        PERFORM pg_notify('catalog_changes', kind || ':' || array_to_string(ids[i:i + 199], ','));
+    END LOOP;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION products_notify_changes() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM notify_catalog_changes('p', ARRAY(SELECT DISTINCT id::text FROM changed_rows));
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION product_links_notify_changes() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM notify_catalog_changes('p', ARRAY(SELECT DISTINCT product_id::text FROM changed_rows));
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION categories_notify_changes() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify('catalog_changes', 'c:');
+    RETURN NULL;
+END
+$$
+""",
+]
+
+NOTIFY_TRIGGERS = [
+    """
+CREATE TRIGGER products_notify_inserted AFTER INSERT ON products
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_notify_changes()
+""",
+    """
+CREATE TRIGGER products_notify_updated AFTER UPDATE ON products
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_notify_changes()
+""",
+    """
+CREATE TRIGGER products_notify_deleted AFTER DELETE ON products
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_notify_changes()
+""",
+    """
+CREATE TRIGGER product_category_links_notify_inserted AFTER INSERT ON product_category_association
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_links_notify_changes()
+""",
+    """
+CREATE TRIGGER product_category_links_notify_deleted AFTER DELETE ON product_category_association
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION product_links_notify_changes()
+""",
+    """
+CREATE TRIGGER categories_notify AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION categories_notify_changes()
+""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # asyncpg prepares every statement, and a prepared statement can only hold one command
+    for statement in NOTIFY_FUNCTIONS + NOTIFY_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS categories_notify ON categories")
+    op.execute("DROP TRIGGER IF EXISTS product_category_links_notify_deleted ON product_category_association")
+    op.execute("DROP TRIGGER IF EXISTS product_category_links_notify_inserted ON product_category_association")
+    op.execute("DROP TRIGGER IF EXISTS products_notify_deleted ON products")
+    op.execute("DROP TRIGGER IF EXISTS products_notify_updated ON products")
+    op.execute("DROP TRIGGER IF EXISTS products_notify_inserted ON products")
+    op.execute("DROP FUNCTION IF EXISTS categories_notify_changes()")
+    op.execute("DROP FUNCTION IF EXISTS product_links_notify_changes()")
+    op.execute("DROP FUNCTION IF EXISTS products_notify_changes()")
+    op.execute("DROP FUNCTION IF EXISTS notify_catalog_changes(text, text[])")
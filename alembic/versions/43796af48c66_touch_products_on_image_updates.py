@@ -0,0 +1,53 @@
+"""touch products on image updates
+
+Revision ID: 43796af48c66
+Revises: c4cc9ac1cfd5
+Create Date: 2026-10-19 19:52:14.083517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '43796af48c66'
+down_revision: Union[str, Sequence[str], None] = 'c4cc9ac1cfd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Image inserts and deletes already move products.updated_at (93844f898000), which is what
+# the change feed and the catalog_changes notifications key on; an UPDATE of an image (new
+# url, or the image moved to another product) did not. Both the old and the new product are
+# touched, and the products_notify_updated trigger publishes them.
+IMAGE_UPDATE_TRIGGER = [
+    """
+CREATE OR REPLACE FUNCTION products_touch_by_image_updates() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE products SET updated_at = now()
+    WHERE id IN (SELECT product_id FROM old_rows UNION SELECT product_id FROM changed_rows);
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER product_images_updated AFTER UPDATE ON product_images
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_touch_by_image_updates()
+""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # asyncpg prepares every statement, and a prepared statement can only hold one command
+    for statement in IMAGE_UPDATE_TRIGGER:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS product_images_updated ON product_images")
+    op.execute("DROP FUNCTION IF EXISTS products_touch_by_image_updates()")
@@ -0,0 +1,140 @@
+"""add product search vector
+
+Revision ID: 5e1d9a04c7b2
+Revises: 8cbf03ce1893
+Create Date: 2026-10-19 13:02:16.904271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1d9a04c7b2'
+down_revision: Union[str, Sequence[str], None] = '8cbf03ce1893'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The document spans three tables, so it cannot be a generated column. Products compute it
+# in a BEFORE trigger; changes to attribute links, attribute values and brand names refresh
+# the affected products with statement-level triggers (one UPDATE per statement, not per row).
+# The 'simple' configuration is used because product names are not English.
+SEARCH_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION product_search_vector(p_id uuid, p_name text, p_brand_id integer) RETURNS tsvector
+LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(p_name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce((SELECT name FROM brands WHERE id = p_brand_id), '')), 'B')
+        || setweight(to_tsvector('simple', coalesce((
+               SELECT string_agg(av.value, ' ')
+               FROM product_attribute_association pa
+               JOIN attribute_values av ON av.id = pa.attribute_value_id
+               WHERE pa.product_id = p_id
+           ), '')), 'C')
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION products_search_vector_row() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := product_search_vector(NEW.id, NEW.name, NEW.brand_id);
+    RETURN NEW;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION products_search_vector_by_attribute_link() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE products p SET search_vector = product_search_vector(p.id, p.name, p.brand_id)
+    WHERE p.id IN (SELECT product_id FROM changed_rows);
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION products_search_vector_by_attribute_value() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE products p SET search_vector = product_search_vector(p.id, p.name, p.brand_id)
+    WHERE p.id IN (
+        SELECT pa.product_id FROM product_attribute_association pa
+        JOIN changed_rows c ON c.id = pa.attribute_value_id
+    );
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION products_search_vector_by_brand() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE products p SET search_vector = product_search_vector(p.id, p.name, p.brand_id)
+    WHERE p.brand_id IN (SELECT id FROM changed_rows);
+    RETURN NULL;
+END
+$$
+""",
+]
+
+SEARCH_TRIGGERS = [
+    """
+CREATE TRIGGER products_search_vector BEFORE INSERT OR UPDATE OF name, brand_id ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector_row()
+""",
+    """
+CREATE TRIGGER product_attribute_links_inserted AFTER INSERT ON product_attribute_association
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_search_vector_by_attribute_link()
+""",
+    """
+CREATE TRIGGER product_attribute_links_deleted AFTER DELETE ON product_attribute_association
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_search_vector_by_attribute_link()
+""",
+    """
+CREATE TRIGGER attribute_values_search_vector AFTER UPDATE ON attribute_values
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_search_vector_by_attribute_value()
+""",
+    """
+CREATE TRIGGER brands_search_vector AFTER UPDATE ON brands
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_search_vector_by_brand()
+""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('products', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    # asyncpg prepares every statement, and a prepared statement can only hold one command
+    for statement in SEARCH_FUNCTIONS + SEARCH_TRIGGERS:
+        op.execute(statement)
+    op.execute("UPDATE products SET search_vector = product_search_vector(id, name, brand_id)")
+    op.create_index('ix_products_search_vector', 'products', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_products_name_trgm', 'products', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_name_trgm', table_name='products', postgresql_using='gin')
+    op.drop_index('ix_products_search_vector', table_name='products', postgresql_using='gin')
+    op.execute("DROP TRIGGER IF EXISTS brands_search_vector ON brands")
+    op.execute("DROP TRIGGER IF EXISTS attribute_values_search_vector ON attribute_values")
+    op.execute("DROP TRIGGER IF EXISTS product_attribute_links_deleted ON product_attribute_association")
+    op.execute("DROP TRIGGER IF EXISTS product_attribute_links_inserted ON product_attribute_association")
+    op.execute("DROP TRIGGER IF EXISTS products_search_vector ON products")
+    op.execute("DROP FUNCTION IF EXISTS products_search_vector_by_brand()")
+    op.execute("DROP FUNCTION IF EXISTS products_search_vector_by_attribute_value()")
+    op.execute("DROP FUNCTION IF EXISTS products_search_vector_by_attribute_link()")
+    op.execute("DROP FUNCTION IF EXISTS products_search_vector_row()")
+    op.execute("DROP FUNCTION IF EXISTS product_search_vector(uuid, text, integer)")
+    op.drop_column('products', 'search_vector')
@@ -0,0 +1,216 @@
+"""add seller engagement rollups
+
+Revision ID: 61f9727264a4
+Revises: 42599d051703
+Create Date: 2026-10-19 14:58:42.107356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '61f9727264a4'
+down_revision: Union[str, Sequence[str], None] = '42599d051703'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level triggers turn every change to likes, pins and impression counts into
+# signed deltas in engagement_events (a like that becomes a dislike is -1, an unpin is -1,
+# an impression upsert adds new - old). The seller is resolved when the event is written,
+# so stats survive the product being deleted later. Days are UTC.
+EVENT_TRIGGERS = [
+    """
+CREATE OR REPLACE FUNCTION engagement_events_from_interactions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO engagement_events (product_id, seller_id, day, likes)
+        SELECT n.product_id, p.seller_id, (now() AT TIME ZONE 'UTC')::date, count(*)
+        FROM new_rows n JOIN products p ON p.id = n.product_id
+        WHERE n.interaction_type = 'LIKE'
+        GROUP BY n.product_id, p.seller_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO engagement_events (product_id, seller_id, day, likes)
+        SELECT o.product_id, p.seller_id, (now() AT TIME ZONE 'UTC')::date, -count(*)
+        FROM old_rows o JOIN products p ON p.id = o.product_id
+        WHERE o.interaction_type = 'LIKE'
+        GROUP BY o.product_id, p.seller_id;
+    ELSE
+        INSERT INTO engagement_events (product_id, seller_id, day, likes)
+        SELECT n.product_id, p.seller_id, (now() AT TIME ZONE 'UTC')::date,
+               sum((n.interaction_type = 'LIKE')::int - (o.interaction_type = 'LIKE')::int)
+        FROM new_rows n
+        JOIN old_rows o ON o.user_id = n.user_id AND o.product_id = n.product_id
+        JOIN products p ON p.id = n.product_id
+        WHERE n.interaction_type IS DISTINCT FROM o.interaction_type
+        GROUP BY n.product_id, p.seller_id;
+    END IF;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION engagement_events_from_pins() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO engagement_events (product_id, seller_id, day, favorites)
+    SELECT c.product_id, p.seller_id, (now() AT TIME ZONE 'UTC')::date,
+           CASE TG_OP WHEN 'INSERT' THEN count(*) ELSE -count(*) END
+    FROM changed_rows c
+    JOIN products p ON p.id = c.product_id
+    GROUP BY c.product_id, p.seller_id;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION engagement_events_from_impressions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO engagement_events (product_id, seller_id, day, views)
+        SELECT n.product_id, p.seller_id, n.day, n.impressions
+        FROM new_rows n JOIN products p ON p.id = n.product_id
+        WHERE n.impressions <> 0;
+    ELSE
+        INSERT INTO engagement_events (product_id, seller_id, day, views)
+        SELECT n.product_id, p.seller_id, n.day, n.impressions - o.impressions
+        FROM new_rows n
+        JOIN old_rows o ON o.product_id = n.product_id AND o.day = n.day
+        JOIN products p ON p.id = n.product_id
+        WHERE n.impressions <> o.impressions;
+    END IF;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER product_interactions_inserted_engagement AFTER INSERT ON product_interactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_interactions()
+""",
+    """
+CREATE TRIGGER product_interactions_updated_engagement AFTER UPDATE ON product_interactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_interactions()
+""",
+    """
+CREATE TRIGGER product_interactions_deleted_engagement AFTER DELETE ON product_interactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_interactions()
+""",
+    """
+CREATE TRIGGER collection_pins_inserted_engagement AFTER INSERT ON collection_pins
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_pins()
+""",
+    """
+CREATE TRIGGER collection_pins_deleted_engagement AFTER DELETE ON collection_pins
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_pins()
+""",
+    """
+CREATE TRIGGER product_impression_stats_inserted_engagement AFTER INSERT ON product_impression_stats
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_impressions()
+""",
+    """
+CREATE TRIGGER product_impression_stats_updated_engagement AFTER UPDATE ON product_impression_stats
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_impressions()
+""",
+]
+
+# History from before the triggers existed, on the day each like or pin was created
+BACKFILL = [
+    """
+INSERT INTO engagement_events (product_id, seller_id, day, likes)
+SELECT i.product_id, p.seller_id, (i.created_at AT TIME ZONE 'UTC')::date, count(*)
+FROM product_interactions i JOIN products p ON p.id = i.product_id
+WHERE i.interaction_type = 'LIKE'
+GROUP BY 1, 2, 3
+""",
+    """
+INSERT INTO engagement_events (product_id, seller_id, day, favorites)
+SELECT c.product_id, p.seller_id, (c.created_at AT TIME ZONE 'UTC')::date, count(*)
+FROM collection_pins c JOIN products p ON p.id = c.product_id
+GROUP BY 1, 2, 3
+""",
+    """
+INSERT INTO engagement_events (product_id, seller_id, day, views)
+SELECT s.product_id, p.seller_id, s.day, s.impressions
+FROM product_impression_stats s JOIN products p ON p.id = s.product_id
+WHERE s.impressions <> 0
+""",
+    """
+INSERT INTO rollup_state (name, high_water_mark) VALUES ('engagement', 0)
+""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('engagement_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('txid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'),
+              nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('seller_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('likes', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('favorites', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('views', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_engagement_events_txid'), 'engagement_events', ['txid'], unique=False)
+    op.create_table('product_daily_stats',
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('seller_id', sa.UUID(), nullable=False),
+    sa.Column('likes', sa.BigInteger(), nullable=False),
+    sa.Column('favorites', sa.BigInteger(), nullable=False),
+    sa.Column('views', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    op.create_index('ix_product_daily_stats_seller_id_day', 'product_daily_stats', ['seller_id', 'day'],
+                    unique=False)
+    op.create_table('seller_daily_stats',
+    sa.Column('seller_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('likes', sa.BigInteger(), nullable=False),
+    sa.Column('favorites', sa.BigInteger(), nullable=False),
+    sa.Column('views', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('seller_id', 'day')
+    )
+    op.create_table('rollup_state',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('high_water_mark', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # asyncpg prepares every statement, and a prepared statement can only hold one command
+    for statement in EVENT_TRIGGERS + BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS product_impression_stats_updated_engagement ON product_impression_stats")
+    op.execute("DROP TRIGGER IF EXISTS product_impression_stats_inserted_engagement ON product_impression_stats")
+    op.execute("DROP TRIGGER IF EXISTS collection_pins_deleted_engagement ON collection_pins")
+    op.execute("DROP TRIGGER IF EXISTS collection_pins_inserted_engagement ON collection_pins")
+    op.execute("DROP TRIGGER IF EXISTS product_interactions_deleted_engagement ON product_interactions")
+    op.execute("DROP TRIGGER IF EXISTS product_interactions_updated_engagement ON product_interactions")
+    op.execute("DROP TRIGGER IF EXISTS product_interactions_inserted_engagement ON product_interactions")
+    op.execute("DROP FUNCTION IF EXISTS engagement_events_from_impressions()")
+    op.execute("DROP FUNCTION IF EXISTS engagement_events_from_pins()")
+    op.execute("DROP FUNCTION IF EXISTS engagement_events_from_interactions()")
+    op.drop_table('rollup_state')
+    op.drop_table('seller_daily_stats')
+    op.drop_index('ix_product_daily_stats_seller_id_day', table_name='product_daily_stats')
+    op.drop_table('product_daily_stats')
+    op.drop_index(op.f('ix_engagement_events_txid'), table_name='engagement_events')
+    op.drop_table('engagement_events')
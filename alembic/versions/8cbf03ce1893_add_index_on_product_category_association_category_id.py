@@ -0,0 +1,29 @@
+"""add index on product_category_association.category_id
+
+Revision ID: 8cbf03ce1893
+Revises: 126e4147ffbb
+Create Date: 2026-10-19 12:20:54.381946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8cbf03ce1893'
+down_revision: Union[str, Sequence[str], None] = '126e4147ffbb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_product_category_association_category_id'), 'product_category_association',
+                    ['category_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_category_association_category_id'), table_name='product_category_association')
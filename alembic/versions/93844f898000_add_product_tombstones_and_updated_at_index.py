@@ -0,0 +1,88 @@
+"""add product tombstones and updated_at index
+
+Revision ID: 93844f898000
+Revises: 5e1d9a04c7b2
+Create Date: 2026-10-19 13:47:29.615830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93844f898000'
+down_revision: Union[str, Sequence[str], None] = '5e1d9a04c7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TOMBSTONE_TRIGGER = [
+    """
+CREATE OR REPLACE FUNCTION products_write_tombstones() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO product_tombstones (product_id, deleted_at)
+    SELECT id, now() FROM deleted_rows
+    ON CONFLICT (product_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER products_tombstones AFTER DELETE ON products
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_write_tombstones()
+""",
+]
+
+# The change feed carries the primary image, so image changes must move updated_at too.
+IMAGE_TOUCH_TRIGGERS = [
+    """
+CREATE OR REPLACE FUNCTION products_touch_by_images() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE products SET updated_at = now() WHERE id IN (SELECT product_id FROM changed_rows);
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER product_images_inserted AFTER INSERT ON product_images
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_touch_by_images()
+""",
+    """
+CREATE TRIGGER product_images_deleted AFTER DELETE ON product_images
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_touch_by_images()
+""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_tombstones',
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index('ix_product_tombstones_deleted_at_product_id', 'product_tombstones',
+                    ['deleted_at', 'product_id'], unique=False)
+    op.create_index('ix_products_updated_at_id', 'products', ['updated_at', 'id'], unique=False)
+    # asyncpg prepares every statement, and a prepared statement can only hold one command
+    for statement in TOMBSTONE_TRIGGER + IMAGE_TOUCH_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS product_images_deleted ON product_images")
+    op.execute("DROP TRIGGER IF EXISTS product_images_inserted ON product_images")
+    op.execute("DROP FUNCTION IF EXISTS products_touch_by_images()")
+    op.execute("DROP TRIGGER IF EXISTS products_tombstones ON products")
+    op.execute("DROP FUNCTION IF EXISTS products_write_tombstones()")
+    op.drop_index('ix_products_updated_at_id', table_name='products')
+    op.drop_index('ix_product_tombstones_deleted_at_product_id', table_name='product_tombstones')
+    op.drop_table('product_tombstones')
@@ -0,0 +1,183 @@
+"""partition product_interactions by user_id
+
+Revision ID: 97ad1609e292
+Revises: 11f8070c0a73
+Create Date: 2026-10-19 17:24:41.604127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '97ad1609e292'
+down_revision: Union[str, Sequence[str], None] = '11f8070c0a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# product_interactions is rebuilt as a table hash-partitioned by user_id without blocking
+# writes for the duration of the copy:
+#   1. product_interactions_new and its partitions are created, and a row trigger on the old
+#      table mirrors every insert, update and delete into it from then on.
+#   2. Existing rows are copied in key order, one committed batch at a time. Each batch holds
+#      FOR SHARE locks on its source rows, so a concurrent update or delete waits for the batch
+#      and its mirrored change lands after the copy instead of being overwritten by it.
+#   3. A short transaction locks the old table, drops it and renames the new one into place.
+# The redundant _user_product_uc (a second unique index on the primary key columns) is not
+# carried over. The engagement triggers are recreated on the new table after the swap, so the
+# copy does not count anything twice.
+PARTITIONS = settings.INTERACTION_PARTITIONS
+BATCH_SIZE = settings.INTERACTION_BACKFILL_BATCH_SIZE
+
+CREATE_PARTITIONED = [
+    """
+CREATE TABLE product_interactions_new (
+    user_id uuid NOT NULL,
+    product_id uuid NOT NULL,
+    interaction_type interactiontype NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    CONSTRAINT product_interactions_new_pkey PRIMARY KEY (user_id, product_id),
+    CONSTRAINT product_interactions_product_id_fkey FOREIGN KEY (product_id) REFERENCES products (id),
+    CONSTRAINT product_interactions_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)
+) PARTITION BY HASH (user_id)
+""",
+    """
+CREATE INDEX ix_product_interactions_new_user_id_created_at
+    ON product_interactions_new (user_id, created_at DESC, product_id DESC) INCLUDE (interaction_type)
+""",
+]
+
+MIRROR_TRIGGER = [
+    """
+CREATE OR REPLACE FUNCTION mirror_product_interactions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM product_interactions_new WHERE user_id = OLD.user_id AND product_id = OLD.product_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO product_interactions_new (user_id, product_id, interaction_type, created_at)
+        VALUES (NEW.user_id, NEW.product_id, NEW.interaction_type, NEW.created_at)
+        ON CONFLICT (user_id, product_id) DO UPDATE
+        SET interaction_type = EXCLUDED.interaction_type, created_at = EXCLUDED.created_at;
+    END IF;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER product_interactions_mirror AFTER INSERT OR UPDATE OR DELETE ON product_interactions
+    FOR EACH ROW EXECUTE FUNCTION mirror_product_interactions()
+""",
+]
+
+# Returns the key of the last row copied; no row once the old table is exhausted
+BACKFILL_BATCH = """
+WITH batch AS (
+    SELECT user_id, product_id, interaction_type, created_at FROM product_interactions
+    WHERE (user_id, product_id) > (CAST(:user_id AS uuid), CAST(:product_id AS uuid))
+    ORDER BY user_id, product_id
+    LIMIT :batch_size
+    FOR SHARE
+),
+copied AS (
+    INSERT INTO product_interactions_new (user_id, product_id, interaction_type, created_at)
+    SELECT user_id, product_id, interaction_type, created_at FROM batch
+    ON CONFLICT (user_id, product_id) DO NOTHING
+)
+SELECT user_id, product_id FROM batch ORDER BY user_id DESC, product_id DESC LIMIT 1
+"""
+
+SWAP = [
+    "LOCK TABLE product_interactions IN ACCESS EXCLUSIVE MODE",
+    "DROP TABLE product_interactions",
+    "DROP FUNCTION mirror_product_interactions()",
+    "ALTER TABLE product_interactions_new RENAME TO product_interactions",
+    "ALTER TABLE product_interactions RENAME CONSTRAINT product_interactions_new_pkey TO product_interactions_pkey",
+    "ALTER INDEX ix_product_interactions_new_user_id_created_at RENAME TO ix_product_interactions_user_id_created_at",
+]
+
+ENGAGEMENT_TRIGGERS = [
+    """
+CREATE TRIGGER product_interactions_inserted_engagement AFTER INSERT ON product_interactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_interactions()
+""",
+    """
+CREATE TRIGGER product_interactions_updated_engagement AFTER UPDATE ON product_interactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_interactions()
+""",
+    """
+CREATE TRIGGER product_interactions_deleted_engagement AFTER DELETE ON product_interactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION engagement_events_from_interactions()
+""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # asyncpg prepares every statement, and a prepared statement can only hold one command
+    for statement in CREATE_PARTITIONED:
+        op.execute(statement)
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE product_interactions_p{remainder:02d} PARTITION OF product_interactions_new "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    for statement in MIRROR_TRIGGER:
+        op.execute(statement)
+
+    # Commits the steps above so the mirror trigger is live, then commits every batch on its own
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last = ('00000000-0000-0000-0000-000000000000', '00000000-0000-0000-0000-000000000000')
+        while True:
+            row = bind.execute(sa.text(BACKFILL_BATCH), {
+                "user_id": str(last[0]), "product_id": str(last[1]), "batch_size": BATCH_SIZE,
+            }).first()
+            if row is None:
+                break
+            last = (row.user_id, row.product_id)
+        op.execute("ANALYZE product_interactions_new")
+
+    # Back in the migration's own transaction, so the lock is held from LOCK TABLE to the last rename
+    for statement in SWAP + ENGAGEMENT_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE product_interactions RENAME TO product_interactions_partitioned")
+    op.execute("ALTER INDEX ix_product_interactions_user_id_created_at "
+               "RENAME TO ix_product_interactions_partitioned_user_id_created_at")
+    op.execute("ALTER TABLE product_interactions_partitioned "
+               "RENAME CONSTRAINT product_interactions_pkey TO product_interactions_partitioned_pkey")
+    op.create_table('product_interactions',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('interaction_type', postgresql.ENUM('LIKE', 'DISLIKE', name='interactiontype', create_type=False),
+              nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='product_interactions_product_id_fkey'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='product_interactions_user_id_fkey'),
+    sa.PrimaryKeyConstraint('user_id', 'product_id'),
+    sa.UniqueConstraint('user_id', 'product_id', name='_user_product_uc')
+    )
+    op.execute("""
+        INSERT INTO product_interactions (user_id, product_id, interaction_type, created_at)
+        SELECT user_id, product_id, interaction_type, created_at FROM product_interactions_partitioned
+    """)
+    op.drop_table('product_interactions_partitioned')
+    op.create_index('ix_product_interactions_user_id_created_at', 'product_interactions',
+                    ['user_id', sa.text('created_at DESC'), sa.text('product_id DESC')], unique=False,
+                    postgresql_include=['interaction_type'])
+    for statement in ENGAGEMENT_TRIGGERS:
+        op.execute(statement)
@@ -0,0 +1,107 @@
+"""add collection pin counts and cover images
+
+Revision ID: c4cc9ac1cfd5
+Revises: e6bc9a7e9cd0
+Create Date: 2026-10-19 18:31:50.227143
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4cc9ac1cfd5'
+down_revision: Union[str, Sequence[str], None] = 'e6bc9a7e9cd0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level triggers keep collections.pin_count and cover_image_urls (first image of
+# the four most recently pinned products that have one) current. The covers are re-read
+# from the (collection_id, created_at DESC) index, so a pin write costs the same whatever
+# the size of the collection. Image changes of already pinned products show up on the next
+# pin or unpin.
+SUMMARY_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION collection_cover_image_urls(target uuid) RETURNS text[]
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(array_agg(url ORDER BY created_at DESC, product_id DESC), '{}')
+    FROM (
+        SELECT p.product_id, p.created_at, cover.url
+        FROM collection_pins p
+        CROSS JOIN LATERAL (
+            SELECT i.url FROM product_images i WHERE i.product_id = p.product_id ORDER BY i.id LIMIT 1
+        ) cover
+        WHERE p.collection_id = target
+        ORDER BY p.created_at DESC, p.product_id DESC
+        LIMIT 4
+    ) latest
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION collection_summaries_from_pins() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE collections c
+    SET pin_count = c.pin_count + d.delta,
+        cover_image_urls = collection_cover_image_urls(c.id)
+    FROM (
+        SELECT collection_id, CASE TG_OP WHEN 'INSERT' THEN count(*) ELSE -count(*) END AS delta
+        FROM changed_rows
+        GROUP BY collection_id
+    ) d
+    WHERE c.id = d.collection_id;
+    RETURN NULL;
+END
+$$
+""",
+    """
+CREATE TRIGGER collection_pins_inserted_summary AFTER INSERT ON collection_pins
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION collection_summaries_from_pins()
+""",
+    """
+CREATE TRIGGER collection_pins_deleted_summary AFTER DELETE ON collection_pins
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION collection_summaries_from_pins()
+""",
+]
+
+BACKFILL = """
+UPDATE collections c
+SET pin_count = (SELECT count(*) FROM collection_pins p WHERE p.collection_id = c.id),
+    cover_image_urls = collection_cover_image_urls(c.id)
+WHERE EXISTS (SELECT 1 FROM collection_pins p WHERE p.collection_id = c.id)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('collections', sa.Column('created_at', sa.DateTime(timezone=True),
+                                           server_default=sa.text('now()'), nullable=False))
+    op.add_column('collections', sa.Column('pin_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('collections', sa.Column('cover_image_urls', postgresql.ARRAY(sa.Text()),
+                                           server_default='{}', nullable=False))
+    op.create_index('ix_collections_user_id_created_at', 'collections', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_collection_pins_collection_id_created_at', 'collection_pins',
+                    ['collection_id', sa.text('created_at DESC'), sa.text('product_id DESC')], unique=False)
+    # asyncpg prepares every statement, and a prepared statement can only hold one command
+    for statement in SUMMARY_FUNCTIONS:
+        op.execute(statement)
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS collection_pins_deleted_summary ON collection_pins")
+    op.execute("DROP TRIGGER IF EXISTS collection_pins_inserted_summary ON collection_pins")
+    op.execute("DROP FUNCTION IF EXISTS collection_summaries_from_pins()")
+    op.execute("DROP FUNCTION IF EXISTS collection_cover_image_urls(uuid)")
+    op.drop_index('ix_collection_pins_collection_id_created_at', table_name='collection_pins')
+    op.drop_index('ix_collections_user_id_created_at', table_name='collections')
+    op.drop_column('collections', 'cover_image_urls')
+    op.drop_column('collections', 'pin_count')
+    op.drop_column('collections', 'created_at')
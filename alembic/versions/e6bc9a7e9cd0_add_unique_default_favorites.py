@@ -0,0 +1,63 @@
+"""add unique default favorites per user
+
+Revision ID: e6bc9a7e9cd0
+Revises: 97ad1609e292
+Create Date: 2026-10-19 17:58:13.902554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6bc9a7e9cd0'
+down_revision: Union[str, Sequence[str], None] = '97ad1609e292'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The partial unique index was declared on the model but never created (the __table_args__
+# attribute was misspelled), so concurrent first favorites could create several default
+# collections per user. Their pins are merged into the lowest id before the index is built.
+MERGE_DUPLICATE_FAVORITES = [
+    """
+CREATE TEMP TABLE duplicate_favorites ON COMMIT DROP AS
+SELECT c.id, k.keeper_id
+FROM collections c
+JOIN (
+    SELECT DISTINCT ON (user_id) user_id, id AS keeper_id FROM collections
+    WHERE is_default_favorites ORDER BY user_id, id
+) k ON k.user_id = c.user_id
+WHERE c.is_default_favorites AND c.id <> k.keeper_id
+""",
+    """
+INSERT INTO collection_pins (collection_id, product_id, created_at)
+SELECT d.keeper_id, p.product_id, p.created_at
+FROM collection_pins p JOIN duplicate_favorites d ON d.id = p.collection_id
+ON CONFLICT DO NOTHING
+""",
+    """
+DELETE FROM collection_pins WHERE collection_id IN (SELECT id FROM duplicate_favorites)
+""",
+    """
+DELETE FROM collections WHERE id IN (SELECT id FROM duplicate_favorites)
+""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One command per execute (asyncpg prepares every statement). All of them run in the
+    # migration's transaction, which the ON COMMIT DROP temp table relies on.
+    for statement in MERGE_DUPLICATE_FAVORITES:
+        op.execute(statement)
+    op.create_index('_user_default_favorites_uc', 'collections', ['user_id'], unique=True,
+                    postgresql_where=sa.text('is_default_favorites = true'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('_user_default_favorites_uc', table_name='collections',
+                  postgresql_where=sa.text('is_default_favorites = true'))
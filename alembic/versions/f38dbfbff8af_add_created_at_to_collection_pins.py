@@ -0,0 +1,30 @@
+"""add created_at to collection_pins
+
+Revision ID: f38dbfbff8af
+Revises: a30bc2c358d1
+Create Date: 2026-10-19 09:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f38dbfbff8af'
+down_revision: Union[str, Sequence[str], None] = 'a30bc2c358d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing pins have no known pin time; they are stamped with the migration time.
+    op.add_column('collection_pins', sa.Column('created_at', sa.DateTime(timezone=True),
+                                               server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('collection_pins', 'created_at')
@@ -1,3 +1,6 @@
+import uuid
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -7,6 +10,7 @@ from app.models.user import User
 from app.crud import user as user_crud
 from fastapi.security import OAuth2PasswordBearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/verify-otp")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/verify-otp", auto_error=False)
 
 async def get_current_user(
         db: AsyncSession = Depends(get_async_db),
@@ -29,4 +33,21 @@ async def get_current_user(
             detail="User not found or inactive",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
\ No newline at end of file
+    return user
+
+
+async def get_optional_user_id(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[uuid.UUID]:
+    """
+    The signed-in user's id on public endpoints, or None for guests. A missing, invalid or
+    expired token is treated as a guest and the user is not loaded, so only use this to
+    personalize responses, never to authorize anything.
+    """
+    if not token:
+        return None
+    payload = security.decode_token(token)
+    if not payload or payload.type != 'access' or not payload.sub:
+        return None
+    try:
+        return uuid.UUID(payload.sub)
+    except ValueError:
+        return None
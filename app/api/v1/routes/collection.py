@@ -1,29 +1,39 @@
 import uuid
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as redis
 
 from app.api.v1.dependencies import get_current_user
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.redis_session import get_redis_client
 from app.db.session import get_async_db
+from app.models.collection import Collection
 from app.models.user import User
+from app.schemas.collection import CollectionCreate, CollectionRead, CollectionUpdate
+from app.schemas.common import CursorPage
 from app.schemas.product import ProductFeedItemSchema
 from app.crud import collection as collection_crud
+from app.services import activity, favorites, product_cards, viewer_state
 
 router = APIRouter(prefix="/me/favorites", tags=["Profile & Collections"])
+collections_router = APIRouter(prefix="/me/collections", tags=["Profile & Collections"])
 
 
 @router.post("/{product_id}", status_code=status.HTTP_201_CREATED, summary="Add a product to favorites")
 async def add_product_to_favorites(
         product_id: uuid.UUID,
         current_user: User = Depends(get_current_user),
-        db: AsyncSession = Depends(get_async_db)
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Adds the specified product to the user's default "Favorites" list.
     """
-    favorites_collection = await collection_crud.get_or_create_favorites_collection(db, user_id=current_user.id)
+    collection_id = await favorites.get_collection_id(redis_client, db, current_user.id)
 
-    added = await collection_crud.add_product_to_collection(db, collection=favorites_collection, product_id=product_id)
+    added = await collection_crud.add_product_to_collection(db, collection_id=collection_id, product_id=product_id)
 
     if not added:
         # This case might occur if the product doesn't exist or is already in the list.
@@ -31,20 +41,37 @@ async def add_product_to_favorites(
         # A more precise implementation could return a 404 error if the product doesn't exist.
         return {"message": "Product is already in favorites."}
 
+    await activity.favorite_added(redis_client, db, current_user.id, product_id)
     return {"message": "Product added to favorites successfully."}
 
 
-@router.get("", response_model=List[ProductFeedItemSchema], summary="Get user's favorite products")
+@router.get("", response_model=CursorPage[ProductFeedItemSchema], summary="Get user's favorite products")
 async def get_my_favorites(
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
         current_user: User = Depends(get_current_user),
-        db: AsyncSession = Depends(get_async_db)
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
-    Retrieves the list of all products in the user's "Favorites" collection.
+    Products in the user's "Favorites" collection, most recently added first.
     """
-    favorites_collection = await collection_crud.get_or_create_favorites_collection(db, user_id=current_user.id)
-    products = await collection_crud.get_products_in_collection(db, collection_id=favorites_collection.id)
-    return products
+    after = None
+    if cursor:
+        try:
+            ts, product_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(ts), uuid.UUID(product_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    collection_id = await favorites.get_collection_id(redis_client, db, current_user.id)
+
+    rows = await collection_crud.get_collection_pins(db, collection_id, limit, after)
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor([rows[-1].created_at.isoformat(), str(rows[-1].product_id)])
+    items = await product_cards.get_cards(redis_client, db, [row.product_id for row in rows])
+    items = await viewer_state.with_viewer_flags(redis_client, db, current_user.id, items)
+    return CursorPage(items=items, next_cursor=next_cursor)
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT,
@@ -52,17 +79,152 @@ async def get_my_favorites(
 async def remove_product_from_favorites(
         product_id: uuid.UUID,
         current_user: User = Depends(get_current_user),
-        db: AsyncSession = Depends(get_async_db)
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Removes the specified product from the user's "Favorites" list.
     """
-    favorites_collection = await collection_crud.get_or_create_favorites_collection(db, user_id=current_user.id)
+    collection_id = await favorites.get_collection_id(redis_client, db, current_user.id)
 
-    removed = await collection_crud.remove_product_from_collection(db, collection=favorites_collection,
-                                                                   product_id=product_id)
+    pinned_at = await collection_crud.remove_product_from_collection(db, collection_id=collection_id,
+                                                                     product_id=product_id)
 
-    if not removed:
+    if pinned_at is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found in favorites.")
 
+    await activity.favorite_removed(redis_client, db, current_user.id, product_id, created_at=pinned_at)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def _get_own_collection(db: AsyncSession, user: User, collection_id: uuid.UUID) -> Collection:
+    collection = await collection_crud.get_user_collection(db, user.id, collection_id)
+    if not collection:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Collection not found.")
+    return collection
+
+
+@collections_router.get("", response_model=List[CollectionRead], summary="List my collections")
+async def list_my_collections(
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
+):
+    """
+    All of the user's collections with their pin counts and cover images, favorites first.
+    """
+    # Makes sure the grid always starts with the favorites collection
+    await favorites.get_collection_id(redis_client, db, current_user.id)
+    return await collection_crud.get_user_collections(db, current_user.id)
+
+
+@collections_router.post("", response_model=CollectionRead, status_code=status.HTTP_201_CREATED,
+                         summary="Create a collection")
+async def create_collection(
+        collection_in: CollectionCreate,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+):
+    return await collection_crud.create_collection(db, current_user.id, collection_in)
+
+
+@collections_router.patch("/{collection_id}", response_model=CollectionRead, summary="Rename a collection")
+async def update_collection(
+        collection_id: uuid.UUID,
+        collection_in: CollectionUpdate,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Changes the name and/or visibility of one of the user's collections.
+    """
+    collection = await _get_own_collection(db, current_user, collection_id)
+    return await collection_crud.update_collection(db, collection, collection_in)
+
+
+@collections_router.delete("/{collection_id}", status_code=status.HTTP_204_NO_CONTENT,
+                           summary="Delete a collection")
+async def delete_collection(
+        collection_id: uuid.UUID,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
+):
+    """
+    Deletes one of the user's collections with its pins. The favorites collection cannot be deleted.
+    """
+    collection = await _get_own_collection(db, current_user, collection_id)
+    if collection.is_default_favorites:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="The favorites collection cannot be deleted.")
+    pins = await collection_crud.delete_collection(db, collection.id)
+    await activity.favorites_removed(redis_client, db, current_user.id, pins)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@collections_router.get("/{collection_id}/pins", response_model=CursorPage[ProductFeedItemSchema],
+                        summary="List the products in a collection")
+async def get_collection_pins(
+        collection_id: uuid.UUID,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
+):
+    """
+    Products pinned to one of the user's collections, most recently pinned first.
+    """
+    after = None
+    if cursor:
+        try:
+            ts, product_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(ts), uuid.UUID(product_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    collection = await _get_own_collection(db, current_user, collection_id)
+
+    rows = await collection_crud.get_collection_pins(db, collection.id, limit, after)
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor([rows[-1].created_at.isoformat(), str(rows[-1].product_id)])
+    items = await product_cards.get_cards(redis_client, db, [row.product_id for row in rows])
+    items = await viewer_state.with_viewer_flags(redis_client, db, current_user.id, items)
+    return CursorPage(items=items, next_cursor=next_cursor)
+
+
+@collections_router.post("/{collection_id}/pins/{product_id}", status_code=status.HTTP_201_CREATED,
+                         summary="Pin a product to a collection")
+async def pin_product(
+        collection_id: uuid.UUID,
+        product_id: uuid.UUID,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
+):
+    collection = await _get_own_collection(db, current_user, collection_id)
+    added = await collection_crud.add_product_to_collection(db, collection_id=collection.id, product_id=product_id)
+    if not added:
+        return {"message": "Product is already in the collection."}
+
+    await activity.favorite_added(redis_client, db, current_user.id, product_id)
+    return {"message": "Product added to the collection successfully."}
+
+
+@collections_router.delete("/{collection_id}/pins/{product_id}", status_code=status.HTTP_204_NO_CONTENT,
+                           summary="Unpin a product from a collection")
+async def unpin_product(
+        collection_id: uuid.UUID,
+        product_id: uuid.UUID,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
+):
+    collection = await _get_own_collection(db, current_user, collection_id)
+    pinned_at = await collection_crud.remove_product_from_collection(db, collection_id=collection.id,
+                                                                     product_id=product_id)
+    if pinned_at is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found in the collection.")
+
+    await activity.favorite_removed(redis_client, db, current_user.id, product_id, created_at=pinned_at)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, status
+import redis.asyncio as redis
+
+from app.api.v1.dependencies import get_current_user
+from app.db.redis_session import get_redis_client
+from app.models.user import User
+from app.schemas.impression import ImpressionBatch
+from app.services import impressions
+
+router = APIRouter(prefix="/me/impressions", tags=["Interactions"])
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def record_impressions(
+    batch: ImpressionBatch,
+    current_user: User = Depends(get_current_user),
+    redis_client: redis.Redis = Depends(get_redis_client),
+):
+    """
+    Records which feed items were shown to the user. Impressions are queued in Redis
+    and aggregated in the background; this endpoint never writes to the database.
+    """
+    await impressions.append(redis_client, current_user.id, batch.product_ids, batch.source)
+    return {"message": "Impressions accepted."}
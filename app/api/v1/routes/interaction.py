@@ -1,13 +1,23 @@
 import uuid
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as redis
 
 from app.api.v1.dependencies import get_current_user
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.redis_session import get_redis_client
 from app.db.session import get_async_db
+from app.models.interaction import InteractionType
 from app.models.user import User
-from app.schemas.interaction import InteractionCreate, InteractionRead, InteractionWithProduct
+from app.schemas.common import CursorPage
+from app.schemas.interaction import (
+    InteractionBulkCreate, InteractionBulkResult, InteractionCreate, InteractionRead, InteractionWithProduct
+)
 from app.crud import interaction as interaction_crud
+from app.services import activity, interaction_buffer, product_cards
 
 router = APIRouter(prefix="/me/interactions", tags=["Interactions"])
 
@@ -15,38 +25,130 @@ router = APIRouter(prefix="/me/interactions", tags=["Interactions"])
 async def record_interaction(
     interaction_in: InteractionCreate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Records a user's interaction (like or dislike) with a product.
     If an interaction for this product already exists, it will be updated.
     """
-    interaction = await interaction_crud.create_interaction(db, user_id=current_user.id, interaction_in=interaction_in)
-    return interaction
+    if settings.INTERACTION_WRITE_BEHIND:
+        await interaction_buffer.append(redis_client, current_user.id,
+                                        [(interaction_in.product_id, interaction_in.interaction_type)])
+        return InteractionRead(user_id=current_user.id, **interaction_in.model_dump())
 
+    row = await interaction_crud.upsert_interaction(db, current_user.id, interaction_in.product_id,
+                                                    interaction_in.interaction_type)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found.")
+    if row.changed:
+        await activity.interaction_recorded(redis_client, db, current_user.id, row.product_id,
+                                            row.interaction_type, row.previous_type, row.previous_at,
+                                            created_at=row.created_at)
+    return InteractionRead(user_id=current_user.id, product_id=row.product_id, interaction_type=row.interaction_type)
 
 
-@router.get("", response_model=List[InteractionWithProduct])
+@router.post("/bulk", response_model=InteractionBulkResult)
+async def record_interactions_bulk(
+    bulk_in: InteractionBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+):
+    """
+    Records up to 500 likes/dislikes in one statement, e.g. a batch of swipes.
+    Interactions with products that do not exist are skipped and reported back.
+    In write-behind mode everything is only queued, and unknown products are dropped silently on flush.
+    """
+    if settings.INTERACTION_WRITE_BEHIND:
+        await interaction_buffer.append(
+            redis_client, current_user.id, [(item.product_id, item.interaction_type) for item in bulk_in.interactions]
+        )
+        return InteractionBulkResult(changed=0, unchanged=0, unknown_product_ids=[],
+                                     queued=len(bulk_in.interactions))
+
+    rows = await interaction_crud.upsert_interactions(
+        db, current_user.id, [(item.product_id, item.interaction_type) for item in bulk_in.interactions]
+    )
+    changed = [row for row in rows if row.changed]
+    await activity.interactions_recorded(redis_client, db, current_user.id, changed)
+    unknown = [row.product_id for row in rows if row.interaction_type is None]
+    return InteractionBulkResult(
+        changed=len(changed), unchanged=len(rows) - len(changed) - len(unknown), unknown_product_ids=unknown
+    )
+
+
+@router.get("", response_model=CursorPage[InteractionWithProduct])
 async def get_my_interactions(
+    interaction_type: Optional[InteractionType] = Query(None, description="Only likes or only dislikes"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
-    Retrieves a list of the current user's likes and dislikes.
+    Retrieves the current user's likes and dislikes, newest first, one page at a time.
     """
-    interactions = await interaction_crud.get_interactions_by_user(db, user_id=current_user.id)
-    return interactions
+    after = None
+    if cursor:
+        try:
+            ts, product_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(ts), uuid.UUID(product_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    rows = await interaction_crud.get_interactions_by_user(db, current_user.id, limit, after, interaction_type)
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor([rows[-1].created_at.isoformat(), str(rows[-1].product_id)])
+    entries = [(row.product_id, row.interaction_type) for row in rows]
+
+    if settings.INTERACTION_WRITE_BEHIND:
+        # Read-your-writes: rows with a write still waiting in the buffer are replaced by it,
+        # and the first page starts with those writes, newest first
+        pending = await interaction_buffer.get_pending(redis_client, current_user.id)
+        entries = [entry for entry in entries if entry[0] not in pending]
+        if after is None:
+            queued = sorted(
+                ((product_id, pending_type, at) for product_id, (pending_type, at) in pending.items()
+                 if pending_type is not None and interaction_type in (None, pending_type)),
+                key=lambda item: item[2], reverse=True,
+            )
+            entries = [(product_id, pending_type) for product_id, pending_type, _ in queued] + entries
+
+    cards = {
+        card["id"]: card
+        for card in await product_cards.get_cards(redis_client, db, [product_id for product_id, _ in entries])
+    }
+    items = [
+        InteractionWithProduct(interaction_type=entry_type, product=cards[str(product_id)])
+        for product_id, entry_type in entries if str(product_id) in cards
+    ]
+    return CursorPage(items=items, next_cursor=next_cursor)
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_interaction(
     product_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Deletes a user's interaction (like or dislike) for a specific product.
     """
+    if settings.INTERACTION_WRITE_BEHIND:
+        pending = (await interaction_buffer.get_pending(redis_client, current_user.id)).get(product_id)
+        exists = (pending[0] is not None if pending
+                  else await interaction_crud.get_interaction(db, current_user.id, product_id) is not None)
+        if not exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interaction not found.")
+        await interaction_buffer.append(redis_client, current_user.id, [(product_id, None)])
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
     deleted = await interaction_crud.delete_interaction(db, user_id=current_user.id, product_id=product_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interaction not found.")
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+    await activity.interaction_removed(redis_client, db, current_user.id, product_id,
+                                       deleted.interaction_type, deleted.created_at)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,19 +1,40 @@
 import uuid
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as redis
 
-from app.api.v1.dependencies import get_current_user
+from app.api.v1.dependencies import get_current_user, get_optional_user_id
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.redis_session import get_redis_client
 from app.db.session import get_async_db
 from app.models import User
-from app.schemas.product import ProductFeedItemSchema, ProductDetailSchema
+from app.schemas.common import CursorPage
+from app.schemas.product import ProductFeedItemSchema, ProductDetailSchema, FacetedProductPage, ProductChangesPage
 from app.crud import product as product_crud
+from app.services import (
+    activity, category_tree, facets, feed as feed_service, feed_queue, popularity, product_cards, product_search,
+    viewer_state,
+)
 
 router = APIRouter(prefix="", tags=["Products"])
 
 @router.get("/feed", response_model=List[ProductFeedItemSchema])
-async def get_guest_feed(db: AsyncSession = Depends(get_async_db)):
-    products = await product_crud.get_guest_feed_products(db, limit=20)
+async def get_guest_feed(
+    category_id: Optional[int] = Query(None, description="Only products in this category or its subcategories"),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+    viewer_id: Optional[uuid.UUID] = Depends(get_optional_user_id),
+):
+    if category_id is None:
+        products = await product_crud.get_guest_feed_products(db, limit=20)
+    else:
+        tree = await category_tree.get_tree(redis_client, db)
+        if category_id not in tree:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+        products = await product_crud.get_category_feed_products(db, tree.get_descendants(category_id), limit=20)
 
     for product in products:
         if product.images:
@@ -21,13 +42,123 @@ async def get_guest_feed(db: AsyncSession = Depends(get_async_db)):
         else:
             product.images = []
 
-    return products
+    return await viewer_state.with_viewer_flags(redis_client, db, viewer_id, products)
+
+
+@router.get("/search", response_model=CursorPage[ProductFeedItemSchema])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+    viewer_id: Optional[uuid.UUID] = Depends(get_optional_user_id),
+):
+    """
+    Searches product names, brands and attribute values, best matches first.
+    Falls back to typo-tolerant name matching when nothing matches exactly.
+    """
+    try:
+        product_ids, next_cursor = await product_search.search(db, q, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    items = await product_cards.get_cards(redis_client, db, product_ids)
+    items = await viewer_state.with_viewer_flags(redis_client, db, viewer_id, items)
+    return CursorPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/browse", response_model=FacetedProductPage)
+async def browse_products(
+    brand_id: List[int] = Query([], description="Repeatable; any of the brands"),
+    attribute_value_id: List[int] = Query([], description="Repeatable; values of one attribute are OR-ed"),
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    category_id: Optional[int] = Query(None, description="Includes subcategories"),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    facet_limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+    viewer_id: Optional[uuid.UUID] = Depends(get_optional_user_id),
+):
+    """
+    Newest products matching the filters, with the number of matching products for each
+    brand, attribute value and the price range. Served from the shared catalog snapshot.
+    """
+    filters = facets.BrowseFilters(
+        brand_ids=brand_id, attribute_value_ids=attribute_value_id, min_price=min_price, max_price=max_price,
+    )
+    if category_id is not None:
+        tree = await category_tree.get_tree(redis_client, db)
+        if category_id not in tree:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+        filters.category_ids = tree.get_descendants(category_id)
+
+    try:
+        result = await facets.browse(db, filters, limit=limit, cursor=cursor, facet_limit=facet_limit)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    except facets.CatalogIndexNotReady:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Catalog index is not ready",
+                            headers={"Retry-After": "30"})
+
+    items = await product_cards.get_cards(redis_client, db, result.product_ids)
+    items = await viewer_state.with_viewer_flags(redis_client, db, viewer_id, items)
+    return FacetedProductPage(items=items, next_cursor=result.next_cursor, total=result.total, facets=result.facets)
+
+
+@router.get("/changes", response_model=ProductChangesPage, response_model_exclude_none=True)
+async def get_product_changes(
+    since: Optional[str] = Query(None, description="next_cursor of the previous sync; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Products changed or deleted since the cursor, oldest first, as compact card records.
+    Deleted products come back as tombstones. Keep calling with next_cursor while has_more is true.
+    Cursors older than the tombstone retention get 410 Gone: drop the cache and sync from scratch.
+    """
+    # Cursors carry the time the client was fully synced up to, not just its last row: a client
+    # at the end of the feed has seen every tombstone up to the horizon, however long ago its
+    # last change was. The worker never prunes past now - retention, so anything synced after
+    # that point has missed nothing.
+    after = None
+    if since:
+        retention = timedelta(days=settings.PRODUCT_TOMBSTONE_RETENTION_DAYS)
+        try:
+            ts, product_id, *horizon = decode_cursor(since)
+            after = (datetime.fromisoformat(ts), uuid.UUID(product_id))
+            synced_to = datetime.fromisoformat(horizon[0]) if horizon else after[0]
+            expired = synced_to < datetime.now(timezone.utc) - retention
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if expired:
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Cursor expired, sync from scratch")
+
+    # Rows newer than the settle window are held back, so a final page only vouches for this far
+    horizon = datetime.now(timezone.utc) - timedelta(seconds=settings.PRODUCT_CHANGES_SETTLE_SECONDS)
+    rows = await product_crud.get_product_changes(db, after, settings.PRODUCT_CHANGES_SETTLE_SECONDS, limit)
+    changes = [
+        {
+            "id": row.id, "deleted": row.deleted, "updated_at": row.ts, "name": row.name,
+            "selling_price": row.selling_price, "brand": row.brand, "image_url": row.image_url,
+        }
+        for row in rows
+    ]
+    has_more = len(rows) == limit
+    last = (rows[-1].ts, rows[-1].id) if rows else after
+    next_cursor = ""
+    if last:
+        synced_to = last[0] if has_more else max(horizon, last[0])
+        next_cursor = encode_cursor([last[0].isoformat(), str(last[1]), synced_to.isoformat()])
+    return ProductChangesPage(changes=changes, next_cursor=next_cursor, has_more=has_more)
 
 
 @router.get("/{product_id}", response_model=ProductDetailSchema)
 async def get_product_details(
         product_id: uuid.UUID,
-        db: AsyncSession = Depends(get_async_db)
+        db: AsyncSession = Depends(get_async_db),
+        redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Retrieves detailed information for a single product, suitable for a product detail page.
@@ -35,6 +166,7 @@ async def get_product_details(
     product = await product_crud.get_product_by_id(db, product_id=product_id)
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    await activity.product_viewed(redis_client, product_id)
 
     # Manually populate the seller field for the schema from the loaded relationship
     # This is needed because the schema expects 'seller' but the relationship is product.seller.user
@@ -47,11 +179,33 @@ async def get_product_details(
 @router.get("/feed/personalized", response_model=List[ProductFeedItemSchema])
 async def get_personalized_feed(
     db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
     current_user: User = Depends(get_current_user) # This endpoint is now protected
 ):
     """
     Provides a personalized feed for the currently logged-in user based on their
     interactions and saved items. Simulates the output of a recommendation engine.
+    Active users are served from their precomputed feed queue; the feed is computed
+    synchronously when the queue is empty.
+    """
+    items = await feed_queue.pop_page(redis_client, db, current_user.id, count=20)
+    if not items:
+        items = await feed_service.get_personalized_feed(db, redis_client, user=current_user, limit=20)
+    return await viewer_state.with_viewer_flags(redis_client, db, current_user.id, items)
+
+
+@router.get("/feed/trending", response_model=List[ProductFeedItemSchema])
+async def get_trending_feed(
+    offset: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+    viewer_id: Optional[uuid.UUID] = Depends(get_optional_user_id),
+):
+    """
+    Products with the most recent likes, favorites and views, served from the
+    precomputed trending set rather than aggregated per request.
     """
-    products = await product_crud.get_personalized_feed_for_user(db, user=current_user, limit=20)
-    return products
\ No newline at end of file
+    product_ids = await popularity.get_trending_ids(redis_client, offset=offset, limit=limit)
+    items = await product_cards.get_cards(redis_client, db, product_ids)
+    return await viewer_state.with_viewer_flags(redis_client, db, viewer_id, items)
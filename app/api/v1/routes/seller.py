@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.dependencies import get_current_user
+from app.core.config import settings
+from app.crud import analytics as analytics_crud
+from app.crud import user as user_crud
+from app.db.session import get_async_db
+from app.models.user import User
+from app.schemas.seller import EngagementCounts, SellerDayStats, SellerProductStats, SellerStatsSchema
+
+router = APIRouter(prefix="/me/seller", tags=["Seller"])
+
+
+@router.get("/stats", response_model=SellerStatsSchema)
+async def get_seller_stats(
+    days: int = Query(30, ge=1, le=settings.SELLER_STATS_MAX_DAYS, description="Number of days up to today (UTC)"),
+    top: int = Query(10, ge=0, le=100, description="Number of top products to return"),
+    sort: Literal["likes", "favorites", "views"] = Query("views", description="Ranking of the top products"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Daily likes, favorites and views for the current seller's listings. Served from the
+    rollup tables maintained by the seller-stats worker, so it trails live activity by
+    up to a rollup interval.
+    """
+    seller = await user_crud.get_seller_by_user_id(db, current_user.id)
+    if seller is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not a seller.")
+
+    end = datetime.now(timezone.utc).date()
+    start = end - timedelta(days=days - 1)
+    rows = {row.day: row for row in await analytics_crud.get_seller_daily_stats(db, seller.id, start, end)}
+    # Days without activity are reported as zeros, so clients can plot the series directly
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = rows.get(day)
+        counts = {"likes": row.likes, "favorites": row.favorites, "views": row.views} if row else {}
+        series.append(SellerDayStats(day=day, **counts))
+    totals = EngagementCounts(
+        likes=sum(d.likes for d in series),
+        favorites=sum(d.favorites for d in series),
+        views=sum(d.views for d in series),
+    )
+
+    top_products = []
+    if top:
+        top_rows = await analytics_crud.get_seller_top_products(db, seller.id, start, end, sort, top)
+        top_products = [SellerProductStats.model_validate(row, from_attributes=True) for row in top_rows]
+    return SellerStatsSchema(start=start, end=end, totals=totals, days=series, top_products=top_products)
@@ -1,5 +1,6 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,6 +9,7 @@ from app.db.session import get_async_db
 from app.models.user import User
 from app.schemas.user import UserRead, UserBase
 from app.crud import user as user_crud
+from app.services import data_export
 
 router = APIRouter(tags=["Users"])
 logger = logging.getLogger(__name__)
@@ -36,3 +38,28 @@ async def update_user_profile(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while updating the profile."
         )
+
+
+@router.get("/me/export", response_class=StreamingResponse)
+async def export_my_data(
+    gzip: bool = Query(False, description="Compress the export with gzip"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Downloads all of the user's likes, dislikes, collections and pins as NDJSON, one record
+    per line. The file is streamed, so it starts immediately whatever its size.
+    """
+    if data_export.is_busy():
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Too many exports are running, try again shortly.",
+                            headers={"Retry-After": "30"})
+    # The export reads through its own session; give this request's connection back to the pool now
+    await db.close()
+
+    filename = "export.ndjson.gz" if gzip else "export.ndjson"
+    return StreamingResponse(
+        data_export.export_user_data(current_user.id, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
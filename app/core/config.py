@@ -41,6 +41,91 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 20
     DB_POOL_TIMEOUT: int = 30
 
+    # Taste profiles
+    TASTE_PROFILE_HALF_LIFE_DAYS: float = 30.0
+    TASTE_PROFILE_TTL_DAYS: int = 90
+    TASTE_PROFILE_TOP_N: int = 10
+
+    # Seen-item filter (per-user Bloom filter) and feed candidate sampling
+    SEEN_FILTER_BITS: int = 262144  # 32 KB per user, ~1% false positives at 27k items
+    SEEN_FILTER_HASHES: int = 7
+    SEEN_FILTER_TTL_DAYS: int = 90
+    FEED_CANDIDATE_OVERSAMPLE: int = 4
+
+    # Product card cache
+    PRODUCT_CARD_TTL_SECONDS: int = 3600
+
+    # Precomputed per-user feed queues
+    FEED_QUEUE_SIZE: int = 100
+    FEED_QUEUE_LOW_WATER: int = 40
+    FEED_QUEUE_ACTIVE_WINDOW_MINUTES: int = 30
+    FEED_QUEUE_REFILL_INTERVAL_SECONDS: float = 5.0
+    FEED_QUEUE_REFILL_CONCURRENCY: int = 8
+
+    # Trending (time-decayed popularity counters)
+    TRENDING_BUCKET_SECONDS: int = 3600
+    TRENDING_WINDOW_BUCKETS: int = 48
+    TRENDING_HALF_LIFE_HOURS: float = 12.0
+    TRENDING_MAX_ITEMS: int = 1000
+    TRENDING_REFRESH_INTERVAL_SECONDS: float = 60.0
+
+    # Impression tracking
+    IMPRESSION_STREAM_MAXLEN: int = 1_000_000
+    IMPRESSION_READ_COUNT: int = 500
+    IMPRESSION_FLUSH_INTERVAL_SECONDS: float = 30.0
+    RECENTLY_SHOWN_SIZE: int = 500
+    RECENTLY_SHOWN_TTL_HOURS: int = 24
+
+    # Write-behind likes/dislikes: queued in Redis, merged into Postgres by the interactions worker
+    INTERACTION_WRITE_BEHIND: bool = False
+    INTERACTION_READ_COUNT: int = 1000
+    INTERACTION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    INTERACTION_FLUSH_MAX_ENTRIES: int = 10000
+    INTERACTION_PENDING_TTL_SECONDS: int = 86400  # read-your-writes window if the worker is down
+    # Hash partitions of product_interactions by user_id; read by the migration that partitions it
+    INTERACTION_PARTITIONS: int = 16
+    INTERACTION_BACKFILL_BATCH_SIZE: int = 5000
+
+    # Memory-mapped catalog snapshot shared by all worker processes
+    CATALOG_SNAPSHOT_PATH: str = f"{BASE_DIR}/data/catalog.snapshot"
+    CATALOG_SNAPSHOT_INTERVAL_SECONDS: float = 600.0
+    CATALOG_SNAPSHOT_CHECK_SECONDS: float = 30.0
+    # Rebuilds early (at most this often) when catalog change notifications flagged the snapshot
+    CATALOG_SNAPSHOT_MIN_INTERVAL_SECONDS: float = 60.0
+
+    # Catalog delta feed for client-side caches (GET /products/changes)
+    PRODUCT_CHANGES_SETTLE_SECONDS: int = 30  # longer than any catalog write transaction
+    PRODUCT_TOMBSTONE_RETENTION_DAYS: int = 30
+    PRODUCT_TOMBSTONE_PRUNE_INTERVAL_SECONDS: float = 3600.0
+
+    # Cache invalidation from Postgres catalog change notifications (LISTEN/NOTIFY)
+    CATALOG_CHANGES_LISTEN: bool = True
+    CATALOG_CHANGES_KEEPALIVE_SECONDS: float = 30.0
+    CATALOG_CHANGES_RECONNECT_SECONDS: float = 5.0
+
+    # In-memory category tree
+    CATEGORY_TREE_CHECK_SECONDS: float = 10.0
+
+    # Incremental catalog sync from the upstream source
+    CATALOG_SYNC_SOURCE_URL: Optional[str] = None
+    CATALOG_SYNC_SELLER_ID: Optional[str] = None
+    CATALOG_SYNC_INTERVAL_SECONDS: float = 60.0
+    CATALOG_SYNC_CONCURRENCY: int = 16
+    CATALOG_SYNC_PAGE_SIZE: int = 500
+
+    # Seller stats (daily rollups of likes, favorites and views)
+    SELLER_STATS_ROLLUP_INTERVAL_SECONDS: float = 60.0
+    SELLER_STATS_ROLLUP_BATCH_SIZE: int = 50000
+    SELLER_STATS_MAX_DAYS: int = 365
+
+    # Price-change notifications to users who pinned the product
+    PRICE_ALERT_INTERVAL_SECONDS: float = 10.0
+    PRICE_ALERT_PAGE_SIZE: int = 1000
+
+    # User data export (GET /users/me/export); each running export holds one DB connection
+    EXPORT_MAX_CONCURRENT: int = 2  # per process, keep well below DB_POOL_SIZE
+    EXPORT_BATCH_SIZE: int = 1000
+
     @classmethod
     @field_validator("SQLALCHEMY_DATABASE_URI", mode='before')
     def assemble_db_uri(cls, v: Optional[str], info: ValidationInfo) -> Any:
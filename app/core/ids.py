@@ -0,0 +1,38 @@
+import os
+import threading
+import time
+import uuid
+
+# UUIDv7 (RFC 9562): 48-bit Unix time in milliseconds, then version, a 12-bit counter,
+# variant and 62 random bits. Ids created later sort later, so new rows append to the
+# right edge of B-tree indexes instead of splitting pages all over them. The counter keeps
+# ids from one process strictly increasing within the same millisecond.
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    global _last_ms, _counter
+    random_bits = int.from_bytes(os.urandom(8), "big")
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Random start leaves room to count up within the millisecond
+            _counter = random_bits >> 53
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted (or the clock went backwards): borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms, counter = _last_ms, _counter
+
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    return uuid.UUID(int=value)
@@ -0,0 +1,129 @@
+import uuid
+from datetime import date
+from typing import Any, List
+
+from sqlalchemy import delete, desc, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import EngagementEvent, ProductDailyStats, RollupState, SellerDailyStats
+from app.models.product import Product
+
+ENGAGEMENT_ROLLUP = "engagement"
+
+
+async def rollup_engagement(db: AsyncSession, batch_size: int) -> int:
+    """
+    Folds the next batch of engagement events into the daily product and seller stats and
+    advances the high-water mark, all in one transaction. Returns the number of events applied
+    (0 when caught up).
+
+    The mark is a transaction id: only events of transactions below the oldest one still
+    running are taken, so an event can never commit behind the mark. A batch ends on a
+    transaction boundary and holds roughly batch_size events.
+    """
+    state = (await db.execute(
+        select(RollupState).where(RollupState.name == ENGAGEMENT_ROLLUP).with_for_update()
+    )).scalar_one()
+    low = state.high_water_mark
+    horizon = (await db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))).scalar_one()
+    if low >= horizon:
+        await db.commit()
+        return 0
+
+    high = (await db.execute(
+        select(EngagementEvent.txid)
+        .where(EngagementEvent.txid >= low, EngagementEvent.txid < horizon)
+        .order_by(EngagementEvent.txid)
+        .offset(batch_size)
+        .limit(1)
+    )).scalar_one_or_none()
+    # A single transaction larger than the batch is applied whole
+    high = horizon if high is None else max(high, low + 1)
+    in_batch = (EngagementEvent.txid >= low, EngagementEvent.txid < high)
+
+    by_product = (
+        select(
+            EngagementEvent.product_id, EngagementEvent.day,
+            # Constant per product in practice; aggregated so the upsert never sees a product twice
+            func.array_agg(EngagementEvent.seller_id)[1],
+            func.sum(EngagementEvent.likes), func.sum(EngagementEvent.favorites), func.sum(EngagementEvent.views),
+        )
+        .where(*in_batch)
+        .group_by(EngagementEvent.product_id, EngagementEvent.day)
+    )
+    stmt = insert(ProductDailyStats).from_select(
+        ["product_id", "day", "seller_id", "likes", "favorites", "views"], by_product
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ProductDailyStats.product_id, ProductDailyStats.day],
+        set_={
+            "seller_id": stmt.excluded.seller_id,
+            "likes": ProductDailyStats.likes + stmt.excluded.likes,
+            "favorites": ProductDailyStats.favorites + stmt.excluded.favorites,
+            "views": ProductDailyStats.views + stmt.excluded.views,
+        },
+    ))
+
+    by_seller = (
+        select(
+            EngagementEvent.seller_id, EngagementEvent.day,
+            func.sum(EngagementEvent.likes), func.sum(EngagementEvent.favorites), func.sum(EngagementEvent.views),
+        )
+        .where(*in_batch)
+        .group_by(EngagementEvent.seller_id, EngagementEvent.day)
+    )
+    stmt = insert(SellerDailyStats).from_select(["seller_id", "day", "likes", "favorites", "views"], by_seller)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[SellerDailyStats.seller_id, SellerDailyStats.day],
+        set_={
+            "likes": SellerDailyStats.likes + stmt.excluded.likes,
+            "favorites": SellerDailyStats.favorites + stmt.excluded.favorites,
+            "views": SellerDailyStats.views + stmt.excluded.views,
+        },
+    ))
+
+    applied = (await db.execute(delete(EngagementEvent).where(*in_batch))).rowcount
+    await db.execute(
+        update(RollupState).where(RollupState.name == ENGAGEMENT_ROLLUP).values(high_water_mark=high)
+    )
+    await db.commit()
+    return applied
+
+
+async def get_seller_daily_stats(db: AsyncSession, seller_id: uuid.UUID, start: date, end: date) -> List[Any]:
+    """(day, likes, favorites, views) rows for the days in [start, end] that had any activity."""
+    stmt = (
+        select(SellerDailyStats.day, SellerDailyStats.likes, SellerDailyStats.favorites, SellerDailyStats.views)
+        .where(SellerDailyStats.seller_id == seller_id, SellerDailyStats.day.between(start, end))
+        .order_by(SellerDailyStats.day)
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def get_seller_top_products(
+        db: AsyncSession, seller_id: uuid.UUID, start: date, end: date, order_by: str, limit: int,
+) -> List[Any]:
+    """
+    The seller's products with the highest `order_by` total (likes, favorites or views) in
+    [start, end]. Rows have product_id, name (None once the product is deleted), likes, favorites and views.
+    """
+    totals = (
+        select(
+            ProductDailyStats.product_id,
+            func.sum(ProductDailyStats.likes).label("likes"),
+            func.sum(ProductDailyStats.favorites).label("favorites"),
+            func.sum(ProductDailyStats.views).label("views"),
+        )
+        .where(ProductDailyStats.seller_id == seller_id, ProductDailyStats.day.between(start, end))
+        .group_by(ProductDailyStats.product_id)
+        .order_by(desc(order_by), ProductDailyStats.product_id)
+        .limit(limit)
+        .subquery()
+    )
+    stmt = (
+        select(totals.c.product_id, Product.name, totals.c.likes, totals.c.favorites, totals.c.views)
+        .outerjoin(Product, Product.id == totals.c.product_id)
+        .order_by(desc(totals.c[order_by]), totals.c.product_id)
+    )
+    return (await db.execute(stmt)).all()
@@ -1,95 +1,163 @@
 import uuid
-from typing import List
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-
-from app.models.collection import Collection
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy import select, delete, literal, tuple_, Row
+from sqlalchemy.dialects.postgresql import UUID, insert
+
+from app.core.ids import uuid7
+from app.models.collection import Collection, collection_pins_table
 from app.models.product import Product
+from app.schemas.collection import CollectionCreate, CollectionUpdate
 
 
-async def get_or_create_favorites_collection(db: AsyncSession, user_id: uuid.UUID) -> Collection:
+async def get_or_create_favorites_collection_id(db: AsyncSession, user_id: uuid.UUID) -> uuid.UUID:
     """
-    Retrieves the default 'Favorites' collection for a user using the is_default_favorites flag,
-    creating it if it doesn't exist.
+    Returns the id of the user's default 'Favorites' collection, creating it if it doesn't exist.
+    Safe under concurrent calls: the partial unique index on (user_id) WHERE is_default_favorites
+    lets only one insert win.
     """
-    # Query using the new, more robust flag
-    stmt = select(Collection).where(
-        Collection.user_id == user_id,
-        Collection.is_default_favorites == True
+    stmt = select(Collection.id).where(Collection.user_id == user_id, Collection.is_default_favorites == True)
+    collection_id = (await db.execute(stmt)).scalar_one_or_none()
+    if collection_id is not None:
+        return collection_id
+
+    insert_stmt = (
+        insert(Collection)
+        .values(id=uuid7(), user_id=user_id, name="favorite", is_public=False, is_default_favorites=True)
+        .on_conflict_do_nothing(index_elements=[Collection.user_id],
+                                index_where=Collection.is_default_favorites == True)
+        .returning(Collection.id)
     )
-    result = await db.execute(stmt)
-    favorites_collection = result.scalar_one_or_none()
+    collection_id = (await db.execute(insert_stmt)).scalar_one_or_none()
+    await db.commit()
+    if collection_id is None:
+        # Lost the race to a concurrent request
+        collection_id = (await db.execute(stmt)).scalar_one()
+    return collection_id
+
+
+async def create_collection(db: AsyncSession, user_id: uuid.UUID, collection_in: CollectionCreate) -> Collection:
+    """Creates an empty collection for the user."""
+    collection = Collection(user_id=user_id, **collection_in.model_dump())
+    db.add(collection)
+    await db.commit()
+    await db.refresh(collection)
+    return collection
 
-    if not favorites_collection:
-        favorites_collection = Collection(
-            user_id=user_id,
-            name="favorite",
-            is_public=False,
-            is_default_favorites=True
-        )
-        db.add(favorites_collection)
-        await db.commit()
-        await db.refresh(favorites_collection)
 
-    return favorites_collection
+async def get_user_collection(db: AsyncSession, user_id: uuid.UUID, collection_id: uuid.UUID) -> Optional[Collection]:
+    """Fetches one of the user's collections; None if it does not exist or belongs to someone else."""
+    stmt = select(Collection).where(Collection.id == collection_id, Collection.user_id == user_id)
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
-async def add_product_to_collection(db: AsyncSession, collection: Collection, product_id: uuid.UUID) -> bool:
+async def get_user_collections(db: AsyncSession, user_id: uuid.UUID) -> List[Collection]:
     """
-    Adds a product to a collection if it's not already there.
-    Returns True if added, False if it was already present or product not found.
+    The user's collections for the collection grid, favorites first, then newest first.
+    Pin counts and cover images are stored on the rows, so this is a single query.
     """
-    product = await db.get(Product, product_id)
-    if not product:
-        return False
-
-    # Eagerly load the products relationship if not already loaded to avoid extra queries.
-    if 'products' not in collection.__dict__:
-        await db.refresh(collection, attribute_names=['products'])
+    stmt = (
+        select(Collection)
+        .where(Collection.user_id == user_id)
+        .order_by(Collection.is_default_favorites.desc(), Collection.created_at.desc(), Collection.id.desc())
+    )
+    return (await db.execute(stmt)).scalars().all()
 
-    if product not in collection.products:
-        collection.products.append(product)
-        await db.commit()
-        return True
 
-    return False
+async def update_collection(db: AsyncSession, collection: Collection, collection_in: CollectionUpdate) -> Collection:
+    """Applies the fields that were set in the update."""
+    for field, value in collection_in.model_dump(exclude_unset=True, exclude_none=True).items():
+        setattr(collection, field, value)
+    await db.commit()
+    await db.refresh(collection)
+    return collection
 
 
-async def remove_product_from_collection(db: AsyncSession, collection: Collection, product_id: uuid.UUID) -> bool:
+async def delete_collection(db: AsyncSession, collection_id: uuid.UUID) -> List[Row]:
+    """
+    Deletes a collection and its pins (never the pinned products).
+    Returns the removed pins as (product_id, created_at) rows.
     """
-    Removes a product from a collection.
-    Returns True if removed, False if it was not in the collection or product not found.
+    pins = await db.execute(
+        delete(collection_pins_table)
+        .where(collection_pins_table.c.collection_id == collection_id)
+        .returning(collection_pins_table.c.product_id, collection_pins_table.c.created_at)
+    )
+    removed = pins.all()
+    await db.execute(delete(Collection).where(Collection.id == collection_id))
+    await db.commit()
+    return removed
+
+
+async def get_collection_pins(
+        db: AsyncSession,
+        collection_id: uuid.UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+) -> List[Row]:
     """
-    product = await db.get(Product, product_id)
-    if not product:
-        return False
+    One page of a collection's pins, newest first, as (product_id, created_at) rows.
+    `after` is the (created_at, product_id) of the last row of the previous page.
+    """
+    pins = collection_pins_table.c
+    stmt = (
+        select(pins.product_id, pins.created_at)
+        .where(pins.collection_id == collection_id)
+        .order_by(pins.created_at.desc(), pins.product_id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(pins.created_at, pins.product_id) < after)
+    return (await db.execute(stmt)).all()
 
-    if 'products' not in collection.__dict__:
-        await db.refresh(collection, attribute_names=['products'])
 
-    if product in collection.products:
-        collection.products.remove(product)
-        await db.commit()
-        return True
+async def stream_user_pins(db: AsyncSession, user_id: uuid.UUID, batch_size: int) -> AsyncResult:
+    """
+    (collection_id, product_id, created_at) of every pin in the user's collections, grouped by
+    collection and oldest first, fetched through a server-side cursor `batch_size` rows at a time.
+    """
+    pins = collection_pins_table.c
+    stmt = (
+        select(pins.collection_id, pins.product_id, pins.created_at)
+        .join(Collection, Collection.id == pins.collection_id)
+        .where(Collection.user_id == user_id)
+        .order_by(pins.collection_id, pins.created_at, pins.product_id)
+        .execution_options(yield_per=batch_size)
+    )
+    return await db.stream(stmt)
 
-    return False
 
+async def add_product_to_collection(db: AsyncSession, collection_id: uuid.UUID, product_id: uuid.UUID) -> bool:
+    """
+    Pins a product to a collection in one statement, whatever the size of the collection.
+    Returns True if added, False if it was already present or the product does not exist.
+    """
+    stmt = (
+        insert(collection_pins_table)
+        .from_select(["collection_id", "product_id"],
+                     select(literal(collection_id, UUID(as_uuid=True)), Product.id).where(Product.id == product_id))
+        .on_conflict_do_nothing()
+        .returning(collection_pins_table.c.product_id)
+    )
+    added = (await db.execute(stmt)).first() is not None
+    await db.commit()
+    return added
 
-async def get_products_in_collection(db: AsyncSession, collection_id: uuid.UUID) -> List[Product]:
+
+async def remove_product_from_collection(
+        db: AsyncSession, collection_id: uuid.UUID, product_id: uuid.UUID,
+) -> Optional[datetime]:
     """
-    Retrieves all products within a specific collection, optimized with eager loading.
+    Unpins a product from a collection in one statement.
+    Returns when the removed pin was created, or None if it was not in the collection.
     """
     stmt = (
-        select(Collection)
-        .where(Collection.id == collection_id)
-        .options(
-            selectinload(Collection.products)
-            .selectinload(Product.images),
-            selectinload(Collection.products)
-            .selectinload(Product.brand)
-        )
+        delete(collection_pins_table)
+        .where(collection_pins_table.c.collection_id == collection_id,
+               collection_pins_table.c.product_id == product_id)
+        .returning(collection_pins_table.c.created_at)
     )
-    result = await db.execute(stmt)
-    collection = result.scalar_one_or_none()
-    return collection.products if collection else []
+    pinned_at = (await db.execute(stmt)).scalar_one_or_none()
+    await db.commit()
+    return pinned_at
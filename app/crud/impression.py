@@ -0,0 +1,39 @@
+import uuid
+from datetime import date
+from typing import List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.impression import ProductImpressionStats
+from app.models.product import Product
+
+
+async def upsert_daily_stats(db: AsyncSession, rows: List[Tuple[uuid.UUID, date, int, int]]) -> None:
+    """
+    Adds (product_id, day, impressions, unique_viewers) aggregates in one statement.
+    Impressions accumulate; unique_viewers is replaced by the latest HyperLogLog estimate.
+    Rows for unknown products (clients report ids they were shown) are dropped.
+    """
+    if not rows:
+        return
+    known_ids = set((await db.execute(
+        select(Product.id).where(Product.id.in_({row[0] for row in rows}))
+    )).scalars().all())
+    rows = [row for row in rows if row[0] in known_ids]
+    if not rows:
+        return
+    stmt = insert(ProductImpressionStats).values([
+        {"product_id": product_id, "day": day, "impressions": impressions, "unique_viewers": unique_viewers}
+        for product_id, day, impressions, unique_viewers in rows
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProductImpressionStats.product_id, ProductImpressionStats.day],
+        set_={
+            "impressions": ProductImpressionStats.impressions + stmt.excluded.impressions,
+            "unique_viewers": stmt.excluded.unique_viewers,
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
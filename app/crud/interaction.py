@@ -1,87 +1,167 @@
 import uuid
-from typing import List
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
+from sqlalchemy import select, delete, text, tuple_, Boolean, DateTime, Enum, Row, String
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
-from app.models import Collection
-from app.models.interaction import ProductInteraction
-from app.schemas.interaction import InteractionCreate
-from app.models.product import Product # Import Product model
+from app.models.interaction import InteractionType, ProductInteraction
 
-async def create_interaction(db: AsyncSession, user_id: uuid.UUID, interaction_in: InteractionCreate) -> ProductInteraction:
+async def get_interaction(db: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID) -> Optional[ProductInteraction]:
+    """Fetches a user's interaction with a specific product, if any."""
+    return await db.get(ProductInteraction, (user_id, product_id))
+
+
+# One statement for any number of interactions of one user. `previous` and the INSERT run
+# on the same snapshot, so previous_* is the state before this statement. Rows whose type
+# does not change are not rewritten; unknown products are skipped (interaction_type is NULL).
+# A changed type restarts created_at, so a like always dates from when it was given.
+# If a product appears twice in the input, the last occurrence wins.
+UPSERT_INTERACTIONS = text("""
+WITH input AS (
+    SELECT DISTINCT ON (product_id) product_id, interaction_type, ord
+    FROM unnest(CAST(:product_ids AS uuid[]), CAST(CAST(:interaction_types AS text[]) AS interactiontype[]))
+        WITH ORDINALITY AS i(product_id, interaction_type, ord)
+    ORDER BY product_id, ord DESC
+),
+previous AS (
+    SELECT product_id, interaction_type, created_at FROM product_interactions
+    WHERE user_id = CAST(:user_id AS uuid) AND product_id IN (SELECT product_id FROM input)
+),
+upserted AS (
+    INSERT INTO product_interactions AS pi (user_id, product_id, interaction_type)
+    SELECT CAST(:user_id AS uuid), i.product_id, i.interaction_type FROM input i JOIN products p ON p.id = i.product_id
+    ON CONFLICT (user_id, product_id) DO UPDATE
+    SET interaction_type = EXCLUDED.interaction_type, created_at = EXCLUDED.created_at
+    WHERE pi.interaction_type <> EXCLUDED.interaction_type
+    RETURNING pi.product_id, pi.interaction_type, pi.created_at
+)
+SELECT i.product_id,
+       coalesce(u.interaction_type, pr.interaction_type) AS interaction_type,
+       coalesce(u.created_at, pr.created_at) AS created_at,
+       u.product_id IS NOT NULL AS changed,
+       pr.interaction_type AS previous_type,
+       pr.created_at AS previous_at
+FROM input i
+LEFT JOIN upserted u ON u.product_id = i.product_id
+LEFT JOIN previous pr ON pr.product_id = i.product_id
+ORDER BY i.ord
+""").columns(
+    product_id=PG_UUID(as_uuid=True),
+    interaction_type=Enum(InteractionType),
+    created_at=DateTime(timezone=True),
+    changed=Boolean,
+    previous_type=Enum(InteractionType),
+    previous_at=DateTime(timezone=True),
+)
+
+
+async def upsert_interactions(
+        db: AsyncSession, user_id: uuid.UUID, interactions: Sequence[Tuple[uuid.UUID, InteractionType]],
+) -> List[Row]:
     """
-    Creates a new product interaction (like/dislike) for a user.
-    If an interaction already exists for this user and product, it will be updated.
+    Creates or updates a user's interactions in one round trip and commits.
+    Returns one row per distinct product with product_id, interaction_type (None for unknown
+    products), created_at, changed, previous_type and previous_at.
     """
-    # Check for existing interaction
-    existing_interaction = await db.get(ProductInteraction, (user_id, interaction_in.product_id))
-
-    if existing_interaction:
-        # Update the existing interaction
-        existing_interaction.interaction_type = interaction_in.interaction_type
-        db.add(existing_interaction)
-        await db.commit()
-        await db.refresh(existing_interaction)
-        return existing_interaction
-    else:
-        # Create a new interaction
-        db_interaction = ProductInteraction(
-            user_id=user_id,
-            product_id=interaction_in.product_id,
-            interaction_type=interaction_in.interaction_type
-        )
-        db.add(db_interaction)
-        await db.commit()
-        await db.refresh(db_interaction)
-        return db_interaction
-
-
-
-async def get_interactions_by_user(db: AsyncSession, user_id: uuid.UUID) -> List[ProductInteraction]:
+    if not interactions:
+        return []
+    result = await db.execute(UPSERT_INTERACTIONS, {
+        "user_id": user_id,
+        "product_ids": [product_id for product_id, _ in interactions],
+        "interaction_types": [interaction_type.name for _, interaction_type in interactions],
+    })
+    rows = result.all()
+    await db.commit()
+    return rows
+
+
+async def upsert_interaction(
+        db: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID, interaction_type: InteractionType,
+) -> Optional[Row]:
+    """Single-interaction form of upsert_interactions; None if the product does not exist."""
+    rows = await upsert_interactions(db, user_id, [(product_id, interaction_type)])
+    return rows[0] if rows and rows[0].interaction_type is not None else None
+
+
+async def get_interactions_by_user(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        interaction_type: Optional[InteractionType] = None,
+) -> List[Row]:
     """
-    Retrieves all interactions for a specific user, with product details.
+    One page of a user's interactions, newest first, as (product_id, interaction_type, created_at)
+    rows. `after` is the (created_at, product_id) of the last row of the previous page.
+    Served by an index-only scan; product details are up to the caller.
     """
     stmt = (
-        select(ProductInteraction)
+        select(ProductInteraction.product_id, ProductInteraction.interaction_type, ProductInteraction.created_at)
         .where(ProductInteraction.user_id == user_id)
-        .options(
-            selectinload(ProductInteraction.product)
-            .selectinload(Product.images),
-            selectinload(ProductInteraction.product)
-            .selectinload(Product.brand)
-        )
-        .order_by(ProductInteraction.created_at.desc())
+        .order_by(ProductInteraction.created_at.desc(), ProductInteraction.product_id.desc())
+        .limit(limit)
     )
+    if after is not None:
+        stmt = stmt.where(tuple_(ProductInteraction.created_at, ProductInteraction.product_id) < after)
+    if interaction_type is not None:
+        stmt = stmt.where(ProductInteraction.interaction_type == interaction_type)
     result = await db.execute(stmt)
-    return result.scalars().all()
+    return result.all()
 
-async def delete_interaction(db: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID) -> bool:
+async def stream_interactions_by_user(
+        db: AsyncSession, user_id: uuid.UUID, batch_size: int,
+) -> AsyncScalarResult[ProductInteraction]:
     """
-    Deletes a specific interaction for a user.
-    Returns True if an interaction was deleted, False otherwise.
+    All of a user's interactions, oldest first, fetched through a server-side cursor
+    `batch_size` rows at a time. Products are not loaded.
     """
     stmt = (
-        delete(ProductInteraction)
-        .where(ProductInteraction.user_id == user_id, ProductInteraction.product_id == product_id)
+        select(ProductInteraction)
+        .where(ProductInteraction.user_id == user_id)
+        .order_by(ProductInteraction.created_at, ProductInteraction.product_id)
+        .execution_options(yield_per=batch_size)
     )
-    result = await db.execute(stmt)
-    await db.commit()
-    return result.rowcount > 0
+    return await db.stream_scalars(stmt)
+
+
+# The viewer's likes/dislikes and favorites among one page of products, in one round trip.
+# Both halves only read the viewer's own rows: one product_interactions partition by primary
+# key, and the pins of the viewer's favorites collection.
+VIEWER_STATES = text("""
+SELECT product_id, interaction_type::text AS state FROM product_interactions
+WHERE user_id = CAST(:user_id AS uuid) AND product_id = ANY(CAST(:product_ids AS uuid[]))
+UNION ALL
+SELECT p.product_id, 'FAVORITE' FROM collection_pins p
+JOIN collections c ON c.id = p.collection_id
+WHERE c.user_id = CAST(:user_id AS uuid) AND c.is_default_favorites
+  AND p.product_id = ANY(CAST(:product_ids AS uuid[]))
+""").columns(product_id=PG_UUID(as_uuid=True), state=String)
 
 
-async def remove_product_from_collection(db: AsyncSession, collection: Collection, product_id: uuid.UUID) -> bool:
+async def get_viewer_states(db: AsyncSession, user_id: uuid.UUID, product_ids: Sequence[uuid.UUID]) -> List[Row]:
     """
-    Removes a product from a collection.
-    Returns True if removed, False if it was not in the collection.
+    (product_id, state) rows for the given products, where state is 'LIKE' or 'DISLIKE' (the
+    user's interaction) or 'FAVORITE' (in the user's favorites). Products with neither have no row.
     """
-    product = await db.get(Product, product_id)
-    if not product:
-        return False  # Product not found
+    if not product_ids:
+        return []
+    result = await db.execute(VIEWER_STATES, {"user_id": user_id, "product_ids": list(product_ids)})
+    return result.all()
 
-    if product in collection.products:
-        collection.products.remove(product)
-        await db.commit()
-        return True
 
-    return False
\ No newline at end of file
+async def delete_interaction(db: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID) -> Optional[Row]:
+    """
+    Deletes a specific interaction for a user.
+    Returns the deleted row's (interaction_type, created_at), or None if nothing was deleted.
+    """
+    stmt = (
+        delete(ProductInteraction)
+        .where(ProductInteraction.user_id == user_id, ProductInteraction.product_id == product_id)
+        .returning(ProductInteraction.interaction_type, ProductInteraction.created_at)
+    )
+    result = await db.execute(stmt)
+    deleted = result.first()
+    await db.commit()
+    return deleted
+
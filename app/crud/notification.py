@@ -0,0 +1,78 @@
+from typing import Optional
+
+from sqlalchemy import distinct, func, literal, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collection import Collection, collection_pins_table
+from app.models.notification import NotificationOutbox, PriceChangeEvent
+
+PRICE_CHANGE = "price_change"
+
+
+async def fan_out_price_change(db: AsyncSession, page_size: int) -> Optional[int]:
+    """
+    Claims the oldest pending price change that no other worker holds and copies the next
+    page of its pins into the notification outbox, one row per user. Each page is its own
+    short transaction, so a product with many fans never holds locks for long.
+    Returns the number of pins read, or None when nothing is pending.
+    """
+    event = (await db.execute(
+        select(PriceChangeEvent)
+        .where(PriceChangeEvent.fanned_out_at.is_(None))
+        .order_by(PriceChangeEvent.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )).scalar_one_or_none()
+    if event is None:
+        await db.commit()
+        return None
+
+    if event.fanout_cursor is None:
+        # A newer pending change of the same product replaces this one; it inherits the
+        # original price, so fans get one notification with the net change. The newer row is
+        # locked too (waiting for a worker that claimed it), and only taken over while its own
+        # fan-out has not started. Locks are always taken oldest first, so workers cannot deadlock.
+        newer = (await db.execute(
+            select(PriceChangeEvent)
+            .where(PriceChangeEvent.product_id == event.product_id, PriceChangeEvent.id > event.id,
+                   PriceChangeEvent.fanned_out_at.is_(None))
+            .order_by(PriceChangeEvent.id)
+            .limit(1)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )).scalar_one_or_none()
+        if newer is not None and newer.fanout_cursor is not None:
+            newer = None
+        if newer is not None:
+            newer.old_price = event.old_price
+        if newer is not None or event.old_price == event.new_price:
+            event.fanned_out_at = func.now()
+            await db.commit()
+            return 0
+
+    stmt = (
+        select(collection_pins_table.c.collection_id)
+        .where(collection_pins_table.c.product_id == event.product_id)
+        .order_by(collection_pins_table.c.collection_id)
+        .limit(page_size)
+    )
+    if event.fanout_cursor is not None:
+        stmt = stmt.where(collection_pins_table.c.collection_id > event.fanout_cursor)
+    collection_ids = (await db.execute(stmt)).scalars().all()
+
+    if collection_ids:
+        payload = {"product_id": str(event.product_id), "old_price": event.old_price, "new_price": event.new_price}
+        subscribers = select(
+            distinct(Collection.user_id), literal(PRICE_CHANGE), literal(event.id), literal(payload, JSONB)
+        ).where(Collection.id.in_(collection_ids))
+        await db.execute(
+            insert(NotificationOutbox)
+            .from_select(["user_id", "kind", "source_id", "payload"], subscribers)
+            .on_conflict_do_nothing(constraint="uq_notification_outbox_source_user")
+        )
+        event.fanout_cursor = collection_ids[-1]
+    if len(collection_ids) < page_size:
+        event.fanned_out_at = func.now()
+    await db.commit()
+    return len(collection_ids)
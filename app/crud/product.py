@@ -1,15 +1,24 @@
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    select, or_, and_, any_, bindparam, cast, delete, literal, tuple_, union_all, BigInteger, DateTime, Integer,
+    String,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REAL
 from sqlalchemy.orm import selectinload
 import typing as t
 
-from sqlalchemy.sql.expression import distinct
 from sqlalchemy.sql.functions import func
 
-from app.models import Product, Seller, AttributeValue, ProductInteraction, User
+from app.models import (
+    Product, Seller, Attribute, AttributeValue, Brand, ProductImage, ProductInteraction, ProductTombstone, User,
+    Collection, Category,
+)
 from app.models.collection import collection_pins_table
+from app.models.interaction import InteractionType
 from app.models.product import product_category_association
 
 
@@ -30,6 +39,55 @@ async def get_guest_feed_products(db: AsyncSession, limit: int = 20) -> t.List[P
     return products
 
 
+async def get_category_feed_products(
+        db: AsyncSession,
+        category_ids: t.Sequence[int],
+        limit: int = 20,
+) -> t.List[Product]:
+    """
+    Newest products in any of the given categories (a category and its precomputed descendants).
+    The ids are sent as one array parameter, so the statement is the same for every subtree size.
+    """
+    category_ids_param = bindparam("category_ids", list(category_ids), type_=ARRAY(Integer))
+    in_categories = select(product_category_association.c.product_id).where(
+        product_category_association.c.category_id == any_(category_ids_param)
+    )
+    stmt = (
+        select(Product)
+        .where(Product.id.in_(in_categories))
+        .order_by(Product.created_at.desc())
+        .limit(limit)
+        .options(selectinload(Product.images), selectinload(Product.brand))
+    )
+    return (await db.scalars(stmt)).all()
+
+
+async def get_category_parents(db: AsyncSession) -> t.List[t.Tuple[int, t.Optional[int]]]:
+    """(id, parent_id) of every category, for building the in-memory category tree."""
+    return (await db.execute(select(Category.id, Category.parent_id))).all()
+
+
+async def get_brand_names(db: AsyncSession, brand_ids: t.Sequence[int]) -> t.Dict[int, str]:
+    if not brand_ids:
+        return {}
+    stmt = select(Brand.id, Brand.name).where(Brand.id.in_(brand_ids))
+    return {brand_id: name for brand_id, name in (await db.execute(stmt)).all()}
+
+
+async def get_attribute_value_labels(
+        db: AsyncSession,
+        value_ids: t.Sequence[int],
+) -> t.Dict[int, t.Tuple[int, str, str]]:
+    """Maps attribute value id -> (attribute_id, attribute name, value) without loading ORM objects."""
+    if not value_ids:
+        return {}
+    stmt = (
+        select(AttributeValue.id, Attribute.id, Attribute.name, AttributeValue.value)
+        .join(Attribute, Attribute.id == AttributeValue.attribute_id)
+        .where(AttributeValue.id.in_(value_ids))
+    )
+    return {value_id: (attribute_id, name, value) for value_id, attribute_id, name, value in await db.execute(stmt)}
+
 
 async def get_product_by_id(db: AsyncSession, product_id: uuid.UUID) -> t.Optional[Product]:
     """
@@ -54,65 +112,318 @@ async def get_product_by_id(db: AsyncSession, product_id: uuid.UUID) -> t.Option
     return result.scalar_one_or_none()
 
 
-async def get_personalized_feed_for_user(db: AsyncSession, user: User, limit: int = 20) -> t.List[Product]:
+async def get_product_features(db: AsyncSession, product_id: uuid.UUID) -> t.Optional[t.Tuple[int, t.List[int]]]:
+    """
+    Returns the (brand_id, category_ids) pair used to update a user's taste profile,
+    or None if the product does not exist.
+    """
+    stmt = (
+        select(
+            Product.brand_id,
+            func.array_remove(func.array_agg(product_category_association.c.category_id), None)
+        )
+        .outerjoin(product_category_association, product_category_association.c.product_id == Product.id)
+        .where(Product.id == product_id)
+        .group_by(Product.brand_id)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        return None
+    return row[0], list(row[1] or [])
+
+
+async def get_products_features(
+        db: AsyncSession, product_ids: t.Sequence[uuid.UUID],
+) -> t.Dict[uuid.UUID, t.Tuple[int, t.List[int]]]:
+    """Batch form of get_product_features in one query; products that do not exist are left out."""
+    if not product_ids:
+        return {}
+    stmt = (
+        select(
+            Product.id,
+            Product.brand_id,
+            func.array_remove(func.array_agg(product_category_association.c.category_id), None)
+        )
+        .outerjoin(product_category_association, product_category_association.c.product_id == Product.id)
+        .where(Product.id.in_(set(product_ids)))
+        .group_by(Product.id)
+    )
+    return {row[0]: (row[1], list(row[2] or [])) for row in await db.execute(stmt)}
+
+
+async def get_taste_weights(
+        db: AsyncSession, user_id: uuid.UUID, landmark: datetime, half_life_seconds: float,
+) -> t.Tuple[t.Dict[int, float], t.Dict[int, float], t.Dict[int, float], t.Dict[int, float]]:
     """
-    Simulates an AI recommendation engine to generate a personalized feed for a logged-in user.
+    Aggregates a user's full history into brand and category weights. Every like and every pin
+    adds 2 ** ((created_at - landmark) / half_life), the forward decay of the taste profile, so
+    a later removal dated by the same row takes it back exactly. A product pinned to two
+    collections counts twice, as it does when the pins are added one by one.
+    Returns (liked_brands, liked_categories, saved_brands, saved_categories), each mapping id -> weight.
+    Only used to seed a taste profile the first time it is needed.
     """
-    # 1. Find all products the user has already interacted with (liked, disliked, or saved)
-    interacted_stmt = select(ProductInteraction.product_id).where(ProductInteraction.user_id == user.id)
-    saved_stmt = select(collection_pins_table.c.product_id).join(User.collections).where(User.id == user.id)
+    landmark_param = bindparam("landmark", landmark, type_=DateTime(timezone=True))
+    likes = (
+        select(ProductInteraction.product_id, ProductInteraction.created_at)
+        .where(ProductInteraction.user_id == user_id,
+               ProductInteraction.interaction_type == InteractionType.LIKE)
+        .subquery()
+    )
+    pins = (
+        select(collection_pins_table.c.product_id, collection_pins_table.c.created_at)
+        .join(Collection, Collection.id == collection_pins_table.c.collection_id)
+        .where(Collection.user_id == user_id)
+        .subquery()
+    )
+
+    async def _sum(source) -> t.Tuple[t.Dict[int, float], t.Dict[int, float]]:
+        age_seconds = func.extract("epoch", source.c.created_at - landmark_param)
+        weight = func.sum(func.power(2.0, age_seconds / half_life_seconds))
+        brands_stmt = (
+            select(Product.brand_id, weight)
+            .join(source, source.c.product_id == Product.id)
+            .group_by(Product.brand_id)
+        )
+        categories_stmt = (
+            select(product_category_association.c.category_id, weight)
+            .join(source, source.c.product_id == product_category_association.c.product_id)
+            .group_by(product_category_association.c.category_id)
+        )
+        brands = {brand_id: float(total) for brand_id, total in (await db.execute(brands_stmt)).all() if brand_id}
+        categories = {category_id: float(total) for category_id, total in (await db.execute(categories_stmt)).all()}
+        return brands, categories
 
-    interacted_ids = (await db.execute(interacted_stmt)).scalars().all()
-    saved_ids = (await db.execute(saved_stmt)).scalars().all()
-    excluded_product_ids = set(interacted_ids + saved_ids)
+    liked_brands, liked_categories = await _sum(likes)
+    saved_brands, saved_categories = await _sum(pins)
+    return liked_brands, liked_categories, saved_brands, saved_categories
 
-    # 2. Get the "taste profile" (favorite brands and categories) from liked and saved items
-    liked_stmt = select(ProductInteraction.product_id).where(ProductInteraction.user_id == user.id,
-                                                             ProductInteraction.interaction_type == 'like')
-    liked_ids = (await db.execute(liked_stmt)).scalars().all()
-    taste_profile_ids = set(saved_ids + liked_ids)
 
-    if not taste_profile_ids:
-        # If user has no interactions, return the guest feed but exclude seen items
-        return await get_guest_feed_products(db, limit)
+async def get_seen_product_ids(db: AsyncSession, user_id: uuid.UUID) -> t.List[uuid.UUID]:
+    """
+    Returns every product the user has interacted with or saved.
+    Only used to seed the user's seen-item filter.
+    """
+    interacted_stmt = select(ProductInteraction.product_id).where(ProductInteraction.user_id == user_id)
+    saved_stmt = (
+        select(collection_pins_table.c.product_id)
+        .join(Collection, Collection.id == collection_pins_table.c.collection_id)
+        .where(Collection.user_id == user_id)
+    )
+    result = await db.execute(interacted_stmt.union(saved_stmt))
+    return result.scalars().all()
+
+
+async def get_taste_candidate_ids(
+        db: AsyncSession,
+        brand_ids: t.Sequence[int],
+        category_ids: t.Sequence[int],
+        limit: int,
+) -> t.List[uuid.UUID]:
+    """
+    Returns random product ids matching any of the given brands or categories.
+    Exclusion of already-seen products is left to the caller.
+    """
+    in_categories = (
+        select(product_category_association.c.product_id)
+        .where(product_category_association.c.category_id.in_(category_ids))
+    )
+    stmt = (
+        select(Product.id)
+        .where(or_(Product.brand_id.in_(brand_ids), Product.id.in_(in_categories)))
+        .order_by(func.random())
+        .limit(limit)
+    )
+    return (await db.execute(stmt)).scalars().all()
+
+
+SearchKey = t.Tuple[float, uuid.UUID]
+
 
-    # 3. Extract brand and category IDs from the taste profile products
-    taste_brands_stmt = select(distinct(Product.brand_id)).where(Product.id.in_(taste_profile_ids))
-    taste_categories_stmt = select(distinct(product_category_association.c.category_id)).where(
-        product_category_association.c.product_id.in_(taste_profile_ids))
+def _keyset_after(score, after: t.Optional[SearchKey]):
+    """Rows strictly after (score, id) in ORDER BY score DESC, id ASC."""
+    after_score, after_id = after
+    after_score = cast(after_score, REAL)
+    return or_(score < after_score, and_(score == after_score, Product.id > after_id))
 
-    brand_ids = (await db.execute(taste_brands_stmt)).scalars().all()
-    category_ids = (await db.execute(taste_categories_stmt)).scalars().all()
 
-    # 4. Find new, unseen products that match the user's taste profile
+async def search_product_ids(
+        db: AsyncSession,
+        tsquery: str,
+        limit: int = 20,
+        after: t.Optional[SearchKey] = None,
+) -> t.List[t.Tuple[uuid.UUID, float]]:
+    """
+    Full-text matches on the trigger-maintained search_vector (GIN index), best ts_rank first.
+    Returns (id, rank) pairs; pass the last pair as `after` for the next page.
+    """
+    query = func.to_tsquery("simple", tsquery)
+    rank = func.ts_rank(Product.search_vector, query)
+    stmt = select(Product.id, rank).where(Product.search_vector.op("@@")(query))
+    if after is not None:
+        stmt = stmt.where(_keyset_after(rank, after))
+    stmt = stmt.order_by(rank.desc(), Product.id).limit(limit)
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
+async def search_product_ids_fuzzy(
+        db: AsyncSession,
+        text: str,
+        limit: int = 20,
+        after: t.Optional[SearchKey] = None,
+) -> t.List[t.Tuple[uuid.UUID, float]]:
+    """
+    Typo-tolerant fallback: names containing a word similar to the text (pg_trgm `<%`,
+    served by the trigram index), most similar first. Same paging contract as search_product_ids.
+    """
+    similarity = func.word_similarity(text, Product.name)
+    stmt = select(Product.id, similarity).where(literal(text).op("<%")(Product.name))
+    if after is not None:
+        stmt = stmt.where(_keyset_after(similarity, after))
+    stmt = stmt.order_by(similarity.desc(), Product.id).limit(limit)
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
+async def get_random_product_ids(db: AsyncSession, limit: int) -> t.List[uuid.UUID]:
+    """Returns random product ids, used as a discovery fallback."""
+    stmt = select(Product.id).order_by(func.random()).limit(limit)
+    return (await db.execute(stmt)).scalars().all()
+
+
+async def get_products_by_ids(db: AsyncSession, product_ids: t.Sequence[uuid.UUID]) -> t.List[Product]:
+    """
+    Loads feed-ready products (with images and brand) in a single query,
+    preserving the order of product_ids and skipping ids that no longer exist.
+    """
+    if not product_ids:
+        return []
+    stmt = (
+        select(Product)
+        .where(Product.id.in_(product_ids))
+        .options(selectinload(Product.images), selectinload(Product.brand))
+    )
+    products = {product.id: product for product in (await db.scalars(stmt)).all()}
+    return [products[product_id] for product_id in product_ids if product_id in products]
+
+
+def _unseen_by(user_id: uuid.UUID):
+    """Anti-join: products the user has neither liked/disliked nor pinned to any collection."""
+    interacted = select(ProductInteraction.product_id).where(
+        ProductInteraction.user_id == user_id, ProductInteraction.product_id == Product.id
+    )
+    pinned = (
+        select(collection_pins_table.c.product_id)
+        .join(Collection, Collection.id == collection_pins_table.c.collection_id)
+        .where(Collection.user_id == user_id, collection_pins_table.c.product_id == Product.id)
+    )
+    return and_(~interacted.exists(), ~pinned.exists())
+
+
+async def get_personalized_feed_for_user(db: AsyncSession, user: User, limit: int = 20) -> t.List[Product]:
+    """
+    Database-only personalized feed, used when Redis is unavailable: random unseen products
+    sharing a brand or category with the user's liked and saved products. The history never
+    leaves Postgres; seen products are excluded with NOT EXISTS anti-joins.
+    """
+    liked_ids = select(ProductInteraction.product_id).where(
+        ProductInteraction.user_id == user.id, ProductInteraction.interaction_type == InteractionType.LIKE
+    )
+    saved_ids = (
+        select(collection_pins_table.c.product_id)
+        .join(Collection, Collection.id == collection_pins_table.c.collection_id)
+        .where(Collection.user_id == user.id)
+    )
+    taste_ids = liked_ids.union(saved_ids).subquery()
+    if not (await db.execute(select(taste_ids.c.product_id).limit(1))).first():
+        # If user has no interactions, return the guest feed
+        return await get_guest_feed_products(db, limit)
+
+    taste_brands = select(Product.brand_id).where(Product.id.in_(select(taste_ids.c.product_id)))
+    taste_categories = select(product_category_association.c.category_id).where(
+        product_category_association.c.product_id.in_(select(taste_ids.c.product_id))
+    )
+    in_taste_categories = select(product_category_association.c.product_id).where(
+        product_category_association.c.category_id.in_(taste_categories)
+    )
+    unseen = _unseen_by(user.id)
+
     recommendation_stmt = (
         select(Product)
-        .join(product_category_association)
-        .where(
-            Product.id.notin_(excluded_product_ids),
-            (Product.brand_id.in_(brand_ids) | product_category_association.c.category_id.in_(category_ids))
-        )
+        .where(unseen, or_(Product.brand_id.in_(taste_brands), Product.id.in_(in_taste_categories)))
         .order_by(func.random())  # Use random order to simulate discovery
         .limit(limit)
-        .options(
-            selectinload(Product.images),
-            selectinload(Product.brand)
-        )
+        .options(selectinload(Product.images), selectinload(Product.brand))
     )
-
-    result = await db.scalars(recommendation_stmt)
-    recommended_products = result.unique().all()
+    recommended_products = (await db.scalars(recommendation_stmt)).all()
 
     # Fallback: If no recommendations found, return some random unseen items
     if not recommended_products:
         fallback_stmt = (
             select(Product)
-            .where(Product.id.notin_(excluded_product_ids))
+            .where(unseen)
             .order_by(func.random())
             .limit(limit)
             .options(selectinload(Product.images), selectinload(Product.brand))
         )
-        result = await db.scalars(fallback_stmt)
-        return result.unique().all()
+        return (await db.scalars(fallback_stmt)).all()
 
     return recommended_products
+
+
+async def get_product_changes(
+        db: AsyncSession,
+        after: t.Optional[t.Tuple[datetime, uuid.UUID]],
+        settle_seconds: int,
+        limit: int = 500,
+) -> t.List[t.Any]:
+    """
+    Changed and deleted products in (updated_at, id) order, strictly after the `after` key.
+    Rows newer than settle_seconds are held back: updated_at is the writing transaction's
+    start time, so a row committed late could otherwise land behind a cursor a client already has.
+    Each row has id, ts, deleted, name, selling_price, brand and image_url (None for deletions).
+    """
+    horizon = func.statement_timestamp() - timedelta(seconds=settle_seconds)
+    primary_image = (
+        select(ProductImage.url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    changed = (
+        select(
+            Product.id.label("id"), Product.updated_at.label("ts"), literal(False).label("deleted"),
+            Product.name.label("name"), Product.selling_price.label("selling_price"), Brand.name.label("brand"),
+            primary_image.label("image_url"),
+        )
+        .outerjoin(Brand, Brand.id == Product.brand_id)
+        .where(Product.updated_at < horizon)
+        .order_by(Product.updated_at, Product.id)
+        .limit(limit)
+    )
+    deleted = (
+        select(
+            ProductTombstone.product_id.label("id"), ProductTombstone.deleted_at.label("ts"),
+            literal(True).label("deleted"), literal(None, String).label("name"),
+            literal(None, BigInteger).label("selling_price"), literal(None, String).label("brand"),
+            literal(None, String).label("image_url"),
+        )
+        .where(ProductTombstone.deleted_at < horizon)
+        .order_by(ProductTombstone.deleted_at, ProductTombstone.product_id)
+        .limit(limit)
+    )
+    if after is not None:
+        after_ts, after_id = after
+        after_key = tuple_(after_ts, after_id)
+        changed = changed.where(tuple_(Product.updated_at, Product.id) > after_key)
+        deleted = deleted.where(tuple_(ProductTombstone.deleted_at, ProductTombstone.product_id) > after_key)
+
+    # Each branch walks its own (ts, id) index and stops after `limit` rows; the merge keeps the first `limit`
+    merged = union_all(select(changed.subquery()), select(deleted.subquery())).subquery()
+    stmt = select(merged).order_by(merged.c.ts, merged.c.id).limit(limit)
+    return (await db.execute(stmt)).all()
+
+
+async def delete_tombstones_before(db: AsyncSession, cutoff: datetime) -> int:
+    result = await db.execute(delete(ProductTombstone).where(ProductTombstone.deleted_at < cutoff))
+    await db.commit()
+    return result.rowcount
@@ -6,7 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.user import User, RefreshToken, OtpRequest
+from app.models.user import User, RefreshToken, OtpRequest, Seller
 from app.schemas.user import UserBase
 
 
@@ -97,3 +97,10 @@ async def update_user(db: AsyncSession, db_user: User, user_in: UserBase) -> Use
     updated_user = result.scalar_one_or_none()
 
     return updated_user
+
+
+async def get_seller_by_user_id(db: AsyncSession, user_id: uuid.UUID) -> Optional[Seller]:
+    """Fetches the seller profile of a user, if they have one."""
+    stmt = select(Seller).where(Seller.user_id == user_id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
@@ -22,6 +22,13 @@ async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncS
 
 Base = declarative_base()
 
+def get_asyncpg_dsn() -> str:
+    """
+    Plain DSN for code that needs a raw asyncpg connection (COPY, LISTEN/NOTIFY).
+    """
+    return DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
     FastAPI dependency that provides an async database session.
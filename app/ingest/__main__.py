@@ -0,0 +1,92 @@
+# File: app/ingest/__main__.py
+# Usage: python -m app.ingest catalog.jsonl --seller-id <uuid> [--chunk-size 5000] [--restart]
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import asyncpg
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from tqdm import tqdm
+
+from app.core.logging_config import configure_logging
+from app.db.redis_session import redis_pool
+from app.db.session import get_asyncpg_dsn
+from app.ingest.catalog import CatalogIngestor, Checkpoint, chunked, read_records
+from app.services import category_tree
+
+logger = logging.getLogger(__name__)
+
+
+async def publish_category_changes() -> None:
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    try:
+        await category_tree.bump_version(redis_client)
+    except RedisError as e:
+        logger.warning(f"New categories were created but the category tree version could not be bumped: {e}")
+    finally:
+        await redis_client.close()
+
+
+async def ingest(args: argparse.Namespace) -> None:
+    checkpoint = Checkpoint.load(args.checkpoint or f"{args.path}.checkpoint", args.path)
+    if args.restart:
+        checkpoint.records_done = 0
+    if checkpoint.records_done:
+        logger.info(f"Resuming {args.path} after {checkpoint.records_done} committed records.")
+
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    try:
+        ingestor = CatalogIngestor(conn, seller_id=args.seller_id)
+        await ingestor.prepare()
+
+        started = time.monotonic()
+        totals = {"records": 0, "inserted": 0, "updated": 0, "new_categories": 0}
+        records = read_records(args.path, args.format, skip=checkpoint.records_done)
+        with tqdm(initial=checkpoint.records_done, unit="rec", desc="ingest") as progress:
+            for chunk in chunked(records, args.chunk_size):
+                chunk_started = time.monotonic()
+                stats = await ingestor.ingest_chunk(chunk)
+                checkpoint.records_done += len(chunk)
+                checkpoint.save()
+                if stats.new_categories:
+                    await publish_category_changes()
+
+                elapsed = time.monotonic() - chunk_started
+                for key in totals:
+                    totals[key] += getattr(stats, key)
+                progress.update(len(chunk))
+                progress.set_postfix(chunk_rps=f"{len(chunk) / elapsed:.0f}", inserted=totals["inserted"],
+                                     updated=totals["updated"])
+                logger.debug(f"Chunk of {len(chunk)} records in {elapsed:.2f}s "
+                             f"({stats.inserted} inserted, {stats.updated} updated).")
+
+        elapsed = time.monotonic() - started
+        logger.info(f"Ingested {totals['records']} records in {elapsed:.1f}s "
+                    f"({totals['records'] / max(elapsed, 1e-9):.0f} rec/s): "
+                    f"{totals['inserted']} inserted, {totals['updated']} updated, "
+                    f"{totals['records'] - totals['inserted'] - totals['updated']} unchanged.")
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream a JSONL or CSV catalog export into the database.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Defaults to the file extension.")
+    parser.add_argument("--seller-id", type=uuid.UUID, required=True, help="Seller that owns new products.")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--checkpoint", help="Progress file (default: <path>.checkpoint).")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the top.")
+    args = parser.parse_args()
+    args.format = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+
+    configure_logging()
+    asyncio.run(ingest(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+# File: app/ingest/catalog.py
+
+import csv
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from app.core.ids import uuid7
+
+logger = logging.getLogger(__name__)
+
+# Streaming catalog import. Records are read in fixed-size chunks (bounded memory),
+# COPY-ed into temporary staging tables and merged with set-based statements:
+# brands, attributes and attribute values with INSERT ... ON CONFLICT DO NOTHING,
+# products with an upsert keyed on dg_variant_id that only touches rows whose
+# values changed, and association tables by diffing against the staged rows.
+# Each chunk is one transaction; a checkpoint file records committed progress,
+# so an interrupted import resumes after the last committed chunk.
+
+CATEGORY_SEPARATOR = ">"
+LIST_SEPARATOR = "|"
+
+
+@dataclass
+class CatalogRecord:
+    dg_variant_id: int
+    name: str
+    selling_price: int
+    dg_product_id: Optional[int] = None
+    brand: Optional[str] = None
+    # None means "not provided": the product's existing associations are left untouched
+    categories: Optional[List[Tuple[str, ...]]] = None
+    attributes: Optional[List[Tuple[str, str]]] = None
+    images: Optional[List[str]] = None
+
+
+def _category_path(path) -> Tuple[str, ...]:
+    parts = path if isinstance(path, (list, tuple)) else str(path).split(CATEGORY_SEPARATOR)
+    return tuple(part.strip() for part in parts if part and part.strip())
+
+
+def parse_json_record(raw: dict) -> CatalogRecord:
+    """
+    {"dg_variant_id": 1, "dg_product_id": 2, "name": "...", "selling_price": 1000, "brand": "...",
+     "categories": ["Men > Shoes", ["Men", "Sport"]], "attributes": {"Color": "Red"}, "images": ["https://..."]}
+    """
+    categories = raw.get("categories")
+    attributes = raw.get("attributes")
+    images = raw.get("images")
+    return CatalogRecord(
+        dg_variant_id=int(raw["dg_variant_id"]),
+        dg_product_id=int(raw["dg_product_id"]) if raw.get("dg_product_id") not in (None, "") else None,
+        name=str(raw["name"]).strip(),
+        selling_price=int(raw["selling_price"]),
+        brand=(raw.get("brand") or "").strip() or None,
+        categories=None if categories is None else [path for path in map(_category_path, categories) if path],
+        attributes=None if attributes is None else [(str(k).strip(), str(v).strip()) for k, v in attributes.items()],
+        images=None if images is None else [str(url) for url in images],
+    )
+
+
+def parse_csv_row(row: Dict[str, str]) -> CatalogRecord:
+    """
+    CSV columns mirror the JSON keys. categories and images are '|'-separated lists,
+    attributes is a JSON object. Empty or missing columns leave associations untouched.
+    """
+    raw: dict = {key: value for key, value in row.items() if key}
+    for key in ("categories", "images"):
+        raw[key] = raw[key].split(LIST_SEPARATOR) if raw.get(key) else None
+    raw["attributes"] = json.loads(raw["attributes"]) if raw.get("attributes") else None
+    return parse_json_record(raw)
+
+
+def read_records(path: str, fmt: str, skip: int = 0) -> Iterator[CatalogRecord]:
+    """Streams records from a JSONL or CSV file, skipping the first `skip` records."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            rows: Iterable = csv.DictReader(f)
+            parse = parse_csv_row
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+            parse = parse_json_record
+        for row in islice(rows, skip, None):
+            yield parse(row)
+
+
+def chunked(records: Iterator[CatalogRecord], size: int) -> Iterator[List[CatalogRecord]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# --- Checkpoints ---
+
+@dataclass
+class Checkpoint:
+    path: str
+    records_done: int = 0
+    source: Dict[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def _fingerprint(input_path: str) -> Dict[str, int]:
+        stat = os.stat(input_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    @classmethod
+    def load(cls, path: str, input_path: str) -> "Checkpoint":
+        fingerprint = cls._fingerprint(input_path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path=path, source=fingerprint)
+        if data.get("source") != fingerprint:
+            logger.warning(f"Checkpoint {path} belongs to a different version of the input; starting over.")
+            return cls(path=path, source=fingerprint)
+        return cls(path=path, records_done=data["records_done"], source=fingerprint)
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"records_done": self.records_done, "source": self.source}, f)
+        os.replace(tmp_path, self.path)
+
+
+# --- Database side ---
+
+STAGING_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS stg_products (
+    id uuid, dg_product_id bigint, dg_variant_id bigint, name text, selling_price bigint, brand text,
+    has_categories boolean, has_attributes boolean, has_images boolean
+) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE IF NOT EXISTS stg_categories (dg_variant_id bigint, category_id integer) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE IF NOT EXISTS stg_attributes (dg_variant_id bigint, attribute text, value text) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE IF NOT EXISTS stg_images (dg_variant_id bigint, position integer, url text) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE IF NOT EXISTS stg_attribute_values (dg_variant_id bigint, attribute_value_id integer)
+    ON COMMIT DELETE ROWS;
+"""
+
+UPSERT_BRANDS = """
+INSERT INTO brands (name)
+SELECT DISTINCT brand FROM stg_products WHERE brand IS NOT NULL
+ON CONFLICT (name) DO NOTHING
+"""
+
+UPSERT_ATTRIBUTES = """
+INSERT INTO attributes (name)
+SELECT DISTINCT attribute FROM stg_attributes
+ON CONFLICT (name) DO NOTHING
+"""
+
+UPSERT_ATTRIBUTE_VALUES = """
+INSERT INTO attribute_values (attribute_id, value)
+SELECT DISTINCT a.id, s.value FROM stg_attributes s JOIN attributes a ON a.name = s.attribute
+ON CONFLICT ON CONSTRAINT _attribute_value_uc DO NOTHING
+"""
+
+# Unchanged rows are skipped by the WHERE clause, so updated_at only moves for real changes.
+# `previous` reads the rows as they were before this statement (all parts of a statement share
+# one snapshot), which is how price changes are detected without a second round trip. It is
+# joined once to the upserted rows rather than probed per returned row.
+UPSERT_PRODUCTS = """
+WITH previous AS (
+    SELECT p.id, p.selling_price FROM products p JOIN stg_products s ON s.dg_variant_id = p.dg_variant_id
+),
+upserted AS (
+    INSERT INTO products AS p (id, name, dg_product_id, dg_variant_id, selling_price, brand_id, seller_id)
+    SELECT s.id, s.name, s.dg_product_id, s.dg_variant_id, s.selling_price, b.id, $1
+    FROM stg_products s LEFT JOIN brands b ON b.name = s.brand
+    ON CONFLICT (dg_variant_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        dg_product_id = EXCLUDED.dg_product_id,
+        selling_price = EXCLUDED.selling_price,
+        brand_id = EXCLUDED.brand_id,
+        updated_at = now()
+    WHERE (p.name, p.dg_product_id, p.selling_price, p.brand_id)
+        IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.dg_product_id, EXCLUDED.selling_price, EXCLUDED.brand_id)
+    RETURNING p.id, (xmax = 0) AS inserted, p.selling_price
+)
+SELECT u.id, u.inserted, u.selling_price, previous.selling_price AS previous_price
+FROM upserted u LEFT JOIN previous USING (id)
+"""
+
+# Fanned out to the users who pinned the product by the price-alerts worker
+INSERT_PRICE_CHANGES = """
+INSERT INTO price_change_events (product_id, old_price, new_price)
+SELECT * FROM unnest($1::uuid[], $2::bigint[], $3::bigint[])
+"""
+
+SYNC_CATEGORIES = """
+DELETE FROM product_category_association a
+USING products p, stg_products s
+WHERE a.product_id = p.id AND p.dg_variant_id = s.dg_variant_id AND s.has_categories
+  AND NOT EXISTS (
+    SELECT 1 FROM stg_categories c WHERE c.dg_variant_id = s.dg_variant_id AND c.category_id = a.category_id
+  );
+INSERT INTO product_category_association (product_id, category_id)
+SELECT DISTINCT p.id, c.category_id FROM stg_categories c JOIN products p ON p.dg_variant_id = c.dg_variant_id
+ON CONFLICT DO NOTHING;
+"""
+
+SYNC_ATTRIBUTES = """
+INSERT INTO stg_attribute_values
+SELECT s.dg_variant_id, av.id
+FROM stg_attributes s
+JOIN attributes a ON a.name = s.attribute
+JOIN attribute_values av ON av.attribute_id = a.id AND av.value = s.value;
+DELETE FROM product_attribute_association a
+USING products p, stg_products s
+WHERE a.product_id = p.id AND p.dg_variant_id = s.dg_variant_id AND s.has_attributes
+  AND NOT EXISTS (
+    SELECT 1 FROM stg_attribute_values v
+    WHERE v.dg_variant_id = s.dg_variant_id AND v.attribute_value_id = a.attribute_value_id
+  );
+INSERT INTO product_attribute_association (product_id, attribute_value_id)
+SELECT DISTINCT p.id, v.attribute_value_id
+FROM stg_attribute_values v JOIN products p ON p.dg_variant_id = v.dg_variant_id
+ON CONFLICT DO NOTHING;
+"""
+
+SYNC_IMAGES = """
+DELETE FROM product_images i
+USING products p, stg_products s
+WHERE i.product_id = p.id AND p.dg_variant_id = s.dg_variant_id AND s.has_images
+  AND NOT EXISTS (SELECT 1 FROM stg_images si WHERE si.dg_variant_id = s.dg_variant_id AND si.url = i.url);
+INSERT INTO product_images (url, product_id)
+SELECT si.url, p.id
+FROM (SELECT DISTINCT ON (dg_variant_id, url) * FROM stg_images ORDER BY dg_variant_id, url, position) si
+JOIN products p ON p.dg_variant_id = si.dg_variant_id
+WHERE NOT EXISTS (SELECT 1 FROM product_images i WHERE i.product_id = p.id AND i.url = si.url)
+ORDER BY p.id, si.position;
+"""
+
+
+class CategoryResolver:
+    """
+    Maps category paths to ids. The category tree is small, so it is cached in memory;
+    missing paths are created one tree level at a time with a single INSERT per level.
+    """
+
+    def __init__(self):
+        self.ids: Dict[Tuple[str, ...], int] = {}
+
+    async def load(self, conn: asyncpg.Connection) -> None:
+        rows = await conn.fetch("SELECT id, name, parent_id FROM categories")
+        by_id = {row["id"]: row for row in rows}
+
+        def path_of(category_id: int) -> Tuple[str, ...]:
+            path: List[str] = []
+            while category_id is not None:
+                row = by_id[category_id]
+                path.append(row["name"])
+                category_id = row["parent_id"]
+            return tuple(reversed(path))
+
+        self.ids = {path_of(row["id"]): row["id"] for row in rows}
+
+    async def resolve(self, conn: asyncpg.Connection, paths: Iterable[Tuple[str, ...]]) -> int:
+        """Makes sure every path (and its prefixes) exists. Returns the number of categories created."""
+        created = 0
+        missing = {path[:depth] for path in paths for depth in range(1, len(path) + 1)} - self.ids.keys()
+        for depth in sorted({len(path) for path in missing}):
+            level = sorted(path for path in missing if len(path) == depth)
+            names = [path[-1] for path in level]
+            parent_ids = [self.ids[path[:-1]] if depth > 1 else None for path in level]
+            # Roots have a NULL parent, which the unique constraint does not cover, hence the NOT EXISTS.
+            status = await conn.execute(
+                """
+                INSERT INTO categories (name, parent_id)
+                SELECT n.name, n.parent_id FROM unnest($1::text[], $2::integer[]) AS n(name, parent_id)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM categories c WHERE c.name = n.name AND c.parent_id IS NOT DISTINCT FROM n.parent_id
+                )
+                ON CONFLICT ON CONSTRAINT _parent_name_uc DO NOTHING
+                """,
+                names, parent_ids,
+            )
+            created += int(status.split()[-1])
+            rows = await conn.fetch(
+                """
+                SELECT c.id, c.name, c.parent_id FROM categories c
+                JOIN unnest($1::text[], $2::integer[]) AS n(name, parent_id)
+                  ON c.name = n.name AND c.parent_id IS NOT DISTINCT FROM n.parent_id
+                """,
+                names, parent_ids,
+            )
+            resolved = {(row["name"], row["parent_id"]): row["id"] for row in rows}
+            for path, name, parent_id in zip(level, names, parent_ids):
+                self.ids[path] = resolved[(name, parent_id)]
+        return created
+
+
+@dataclass
+class ChunkStats:
+    records: int = 0
+    inserted: int = 0
+    updated: int = 0
+    # Categories created for this chunk; in-memory category trees need a rebuild
+    new_categories: int = 0
+    # Products whose row changed; cached copies of them are stale
+    updated_ids: List[uuid.UUID] = field(default_factory=list)
+    price_changes: int = 0
+
+
+class CatalogIngestor:
+    def __init__(self, conn: asyncpg.Connection, seller_id: uuid.UUID, id_factory=uuid7):
+        self.conn = conn
+        self.seller_id = seller_id
+        self.id_factory = id_factory
+        self.categories = CategoryResolver()
+
+    async def prepare(self) -> None:
+        await self.conn.execute(STAGING_DDL)
+        await self.categories.load(self.conn)
+
+    async def ingest_chunk(self, records: Sequence[CatalogRecord]) -> ChunkStats:
+        # The same variant twice in one chunk would make the upsert touch a row twice; last one wins.
+        records = list({record.dg_variant_id: record for record in records}.values())
+
+        async with self.conn.transaction():
+            new_categories = await self.categories.resolve(
+                self.conn, (path for r in records for path in r.categories or []))
+
+        product_rows = [
+            (self.id_factory(), r.dg_product_id, r.dg_variant_id, r.name, r.selling_price, r.brand,
+             r.categories is not None, r.attributes is not None, r.images is not None)
+            for r in records
+        ]
+        category_rows = {
+            (r.dg_variant_id, self.categories.ids[path]) for r in records for path in r.categories or []
+        }
+        attribute_rows = {(r.dg_variant_id, name, value) for r in records for name, value in r.attributes or []}
+        image_rows = [
+            (r.dg_variant_id, position, url) for r in records for position, url in enumerate(r.images or [])
+        ]
+
+        async with self.conn.transaction():
+            await self.conn.copy_records_to_table("stg_products", records=product_rows)
+            await self.conn.copy_records_to_table("stg_categories", records=list(category_rows))
+            await self.conn.copy_records_to_table("stg_attributes", records=list(attribute_rows))
+            await self.conn.copy_records_to_table("stg_images", records=image_rows)
+
+            await self.conn.execute(UPSERT_BRANDS)
+            await self.conn.execute(UPSERT_ATTRIBUTES)
+            await self.conn.execute(UPSERT_ATTRIBUTE_VALUES)
+            upserted = await self.conn.fetch(UPSERT_PRODUCTS, self.seller_id)
+            # Recorded in the same transaction, so a committed price is never missed or announced twice
+            price_changes = [
+                row for row in upserted
+                if not row["inserted"] and row["previous_price"] != row["selling_price"]
+            ]
+            if price_changes:
+                await self.conn.execute(
+                    INSERT_PRICE_CHANGES,
+                    [row["id"] for row in price_changes],
+                    [row["previous_price"] for row in price_changes],
+                    [row["selling_price"] for row in price_changes],
+                )
+            await self.conn.execute(SYNC_CATEGORIES)
+            await self.conn.execute(SYNC_ATTRIBUTES)
+            await self.conn.execute(SYNC_IMAGES)
+
+        inserted = sum(1 for row in upserted if row["inserted"])
+        return ChunkStats(
+            records=len(records),
+            inserted=inserted,
+            updated=len(upserted) - inserted,
+            new_categories=new_categories,
+            updated_ids=[row["id"] for row in upserted if not row["inserted"]],
+            price_changes=len(price_changes),
+        )
@@ -0,0 +1,119 @@
+# File: app/ingest/fake_source.py
+# Usage: python -m app.ingest.fake_source [--products 10000] [--port 8900] [--mutate-interval 5]
+
+import argparse
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+
+# Local stand-in for the upstream catalog, speaking the protocol used by app.ingest.sync.
+# The catalog is generated from a seed; mutate() reprices a few products and bumps the
+# global version, so a sync client sees a realistic trickle of changes. Point the sync at
+# it with CATALOG_SYNC_SOURCE_URL=http://localhost:8900 or mount it in-process with
+# httpx.ASGITransport(app=create_app(FakeCatalog(...))).
+
+BRANDS = ["Acme", "Northwind", "Contoso", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay"]
+CATEGORIES = [["Men", "Shoes"], ["Men", "Shirts"], ["Women", "Dresses"], ["Women", "Shoes"], ["Kids", "Toys"]]
+COLORS = ["Black", "White", "Red", "Blue", "Green"]
+
+
+class FakeCatalog:
+    def __init__(self, products: int = 10000, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.version = 0
+        self.docs: Dict[int, dict] = {}
+        self.versions: Dict[int, int] = {}
+        for offset in range(products):
+            dg_product_id = 1_000_000 + offset
+            self.version += 1
+            self.docs[dg_product_id] = {
+                "dg_product_id": dg_product_id,
+                "name": f"{self.rng.choice(BRANDS)} item {dg_product_id}",
+                "brand": self.rng.choice(BRANDS),
+                "categories": [self.rng.choice(CATEGORIES)],
+                "attributes": {"Color": self.rng.choice(COLORS)},
+                "images": [f"https://img.example.com/{dg_product_id}.jpg"],
+                # products.dg_product_id is unique, so every product has a single variant here
+                "variants": [
+                    {"dg_variant_id": 5_000_000 + offset, "selling_price": self.rng.randrange(10, 5000) * 1000},
+                ],
+            }
+            self.versions[dg_product_id] = self.version
+
+    def mutate(self, count: int = 10) -> None:
+        for dg_product_id in self.rng.sample(list(self.docs), min(count, len(self.docs))):
+            variant = self.docs[dg_product_id]["variants"][0]
+            variant["selling_price"] = max(1000, variant["selling_price"] + self.rng.randrange(-50, 51) * 1000)
+            self.version += 1
+            self.versions[dg_product_id] = self.version
+
+    def changes(self, since: int, limit: int) -> List[dict]:
+        changed = sorted(
+            (version, dg_product_id) for dg_product_id, version in self.versions.items() if version > since
+        )
+        return [{"dg_product_id": dg_product_id, "version": version} for version, dg_product_id in changed[:limit]]
+
+
+def create_app(catalog: FakeCatalog, mutate_interval: Optional[float] = None, mutate_count: int = 10) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        task = None
+        if mutate_interval:
+            async def mutate_forever():
+                while True:
+                    await asyncio.sleep(mutate_interval)
+                    catalog.mutate(mutate_count)
+            task = asyncio.create_task(mutate_forever())
+        yield
+        if task:
+            task.cancel()
+
+    app = FastAPI(title="Fake catalog source", lifespan=lifespan)
+
+    @app.get("/changes")
+    async def get_changes(
+            response: Response,
+            since: int = Query(0, ge=0),
+            limit: int = Query(500, ge=1, le=5000),
+            if_none_match: Optional[str] = Header(None),
+    ):
+        etag = f'"{catalog.version}"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        items = catalog.changes(since, limit)
+        next_since = items[-1]["version"] if items else since
+        response.headers["ETag"] = etag
+        return {"items": items, "next_since": next_since, "has_more": next_since < catalog.version}
+
+    @app.get("/products/{dg_product_id}")
+    async def get_product(dg_product_id: int, response: Response, if_none_match: Optional[str] = Header(None)):
+        if dg_product_id not in catalog.docs:
+            raise HTTPException(status_code=404, detail="Product not found")
+        etag = f'"{dg_product_id}-{catalog.versions[dg_product_id]}"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return catalog.docs[dg_product_id]
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a generated catalog with the upstream sync protocol.")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--mutate-interval", type=float, default=5.0, help="Seconds between price changes (0: never).")
+    parser.add_argument("--mutate-count", type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app(FakeCatalog(args.products, args.seed), args.mutate_interval, args.mutate_count)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
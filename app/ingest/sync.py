@@ -0,0 +1,176 @@
+# File: app/ingest/sync.py
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+import httpx
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.ingest.catalog import CatalogIngestor, CatalogRecord, parse_json_record
+from app.services import category_tree, product_cards
+
+logger = logging.getLogger(__name__)
+
+# Incremental catalog sync. The source exposes a change feed ordered by a monotonically
+# increasing version and one document per dg_product_id:
+#
+#   GET /changes?since=<version>&limit=<n>  -> {"items": [{"dg_product_id", "version"}], "next_since", "has_more"}
+#   GET /products/<dg_product_id>           -> {"dg_product_id", "name", "brand", "variants": [...]}
+#
+# Both carry an ETag. The last committed version (high-water mark) and the ETag of every
+# synced product live in Redis: an unchanged feed answers 304 without a body, and products
+# listed again after a crash (the mark only moves after the database commit) answer 304
+# unless they changed once more. Changed documents are merged with the bulk-ingest upsert,
+# which leaves identical rows untouched.
+
+CURSOR_KEY = "catalog_sync:since"
+ETAGS_KEY = "catalog_sync:etags"
+
+
+def parse_source_product(doc: dict) -> List[CatalogRecord]:
+    """One record per variant; product-level fields are shared by all variants."""
+    shared = {key: value for key, value in doc.items() if key != "variants"}
+    return [parse_json_record({**shared, **variant}) for variant in doc.get("variants", [])]
+
+
+class CatalogSource:
+    """
+    Client for the upstream catalog. Requests share one pooled connection set whose size
+    matches the concurrency limit. Pass transport=httpx.ASGITransport(app=...) to talk to
+    app.ingest.fake_source in-process.
+    """
+
+    def __init__(self, base_url: str, concurrency: int = 16, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport or httpx.AsyncHTTPTransport(retries=2),
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def get_changes(self, since: int, limit: int, etag: Optional[str] = None) -> Optional[dict]:
+        """A page of the change feed, or None when nothing changed since the ETag."""
+        headers = {"If-None-Match": etag} if etag else {}
+        response = await self.client.get("/changes", params={"since": since, "limit": limit}, headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def get_product(
+            self,
+            dg_product_id: int,
+            etag: Optional[str] = None,
+    ) -> Tuple[int, Optional[str], Optional[dict]]:
+        """(status, etag, document). The document is None for 304 Not Modified and 404 Not Found."""
+        headers = {"If-None-Match": etag} if etag else {}
+        async with self.semaphore:
+            response = await self.client.get(f"/products/{dg_product_id}", headers=headers)
+        if response.status_code in (304, 404):
+            return response.status_code, etag, None
+        response.raise_for_status()
+        return response.status_code, response.headers.get("ETag"), response.json()
+
+
+@dataclass
+class SyncStats:
+    pages: int = 0
+    listed: int = 0
+    fetched: int = 0
+    not_modified: int = 0
+    inserted: int = 0
+    updated: int = 0
+    price_changes: int = 0
+    since: int = 0
+    updated_ids: List[uuid.UUID] = field(default_factory=list)
+
+
+class CatalogSync:
+    def __init__(self, source: CatalogSource, conn: asyncpg.Connection, redis_client: Redis, seller_id: uuid.UUID):
+        self.source = source
+        self.redis = redis_client
+        self.ingestor = CatalogIngestor(conn, seller_id=seller_id)
+
+    async def _fetch_changed(self, dg_product_ids: List[int], stats: SyncStats) -> Tuple[List[dict], Dict[str, str]]:
+        known = await self.redis.hmget(ETAGS_KEY, [str(dg_product_id) for dg_product_id in dg_product_ids])
+        results = await asyncio.gather(*(
+            self.source.get_product(dg_product_id, etag) for dg_product_id, etag in zip(dg_product_ids, known)
+        ))
+
+        docs: List[dict] = []
+        etags: Dict[str, str] = {}
+        for dg_product_id, (status, etag, doc) in zip(dg_product_ids, results):
+            if status == 304:
+                stats.not_modified += 1
+            elif status == 404:
+                logger.warning(f"Product {dg_product_id} is listed in the change feed but gone at the source.")
+            else:
+                docs.append(doc)
+                if etag:
+                    etags[str(dg_product_id)] = etag
+        stats.fetched += len(docs)
+        return docs, etags
+
+    async def run_once(self, page_size: int = 500) -> SyncStats:
+        """Applies every change published since the stored high-water mark."""
+        await self.ingestor.prepare()
+        since = int(await self.redis.get(CURSOR_KEY) or 0)
+        stats = SyncStats(since=since)
+
+        while True:
+            # The feed ETag is the latest version it contains, so an idle source answers 304
+            etag = f'"{since}"' if stats.pages == 0 else None
+            page = await self.source.get_changes(since, page_size, etag=etag)
+            if page is None:
+                break
+            stats.pages += 1
+
+            dg_product_ids = list(dict.fromkeys(item["dg_product_id"] for item in page["items"]))
+            stats.listed += len(dg_product_ids)
+            docs, etags = await self._fetch_changed(dg_product_ids, stats)
+
+            records = [record for doc in docs for record in parse_source_product(doc)]
+            if records:
+                chunk = await self.ingestor.ingest_chunk(records)
+                stats.inserted += chunk.inserted
+                stats.updated += chunk.updated
+                stats.price_changes += chunk.price_changes
+                stats.updated_ids.extend(chunk.updated_ids)
+                await product_cards.invalidate(self.redis, chunk.updated_ids)
+                if chunk.new_categories:
+                    await category_tree.bump_version(self.redis)
+
+            # Committed: remember what we have and move the mark
+            since = page["next_since"]
+            pipe = self.redis.pipeline()
+            if etags:
+                pipe.hset(ETAGS_KEY, mapping=etags)
+            pipe.set(CURSOR_KEY, since)
+            await pipe.execute()
+            stats.since = since
+            if not page["has_more"]:
+                break
+        return stats
+
+
+async def sync_catalog(
+        redis_client: Redis,
+        conn: asyncpg.Connection,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> SyncStats:
+    """One sync run against CATALOG_SYNC_SOURCE_URL."""
+    source = CatalogSource(settings.CATALOG_SYNC_SOURCE_URL, settings.CATALOG_SYNC_CONCURRENCY, transport=transport)
+    try:
+        sync = CatalogSync(source, conn, redis_client, uuid.UUID(settings.CATALOG_SYNC_SELLER_ID))
+        return await sync.run_once(settings.CATALOG_SYNC_PAGE_SIZE)
+    finally:
+        await source.close()
@@ -1,5 +1,8 @@
 from .user import User, Seller, RefreshToken, OtpRequest
-from .product import Product, Attribute, AttributeValue, Category, ProductImage, Brand
+from .product import Product, Attribute, AttributeValue, Category, ProductImage, Brand, ProductTombstone
 from .collection import Collection
 from .interaction import ProductInteraction
+from .impression import ProductImpressionStats
+from .analytics import EngagementEvent, ProductDailyStats, SellerDailyStats, RollupState
+from .notification import PriceChangeEvent, NotificationOutbox
 from ..db.base import Base
\ No newline at end of file
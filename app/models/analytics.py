@@ -0,0 +1,61 @@
+import uuid
+from datetime import date
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class EngagementEvent(Base):
+    """
+    Likes, pins and impressions as signed deltas, written by triggers and consumed by the
+    seller stats rollup. txid is the writing transaction's id, which the rollup's high-water mark follows.
+    """
+    __tablename__ = "engagement_events"
+
+    id: Mapped[int] = mapped_column(sa.BigInteger, sa.Identity(), primary_key=True)
+    txid: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, index=True,
+                                      server_default=sa.text("pg_current_xact_id()::text::bigint"))
+    product_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    seller_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    day: Mapped[date] = mapped_column(sa.Date, nullable=False)
+    likes: Mapped[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    favorites: Mapped[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    views: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+
+
+class ProductDailyStats(Base):
+    """Net likes and favorites gained and impressions per product and day."""
+    __tablename__ = "product_daily_stats"
+
+    product_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    seller_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    likes: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+    favorites: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+    views: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        sa.Index('ix_product_daily_stats_seller_id_day', 'seller_id', 'day'),
+    )
+
+
+class SellerDailyStats(Base):
+    """ProductDailyStats summed over each seller's products."""
+    __tablename__ = "seller_daily_stats"
+
+    seller_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    likes: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+    favorites: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+    views: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+
+
+class RollupState(Base):
+    """High-water mark of each incremental rollup: every transaction id below it has been applied."""
+    __tablename__ = "rollup_state"
+
+    name: Mapped[str] = mapped_column(sa.String(50), primary_key=True)
+    high_water_mark: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
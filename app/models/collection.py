@@ -1,11 +1,14 @@
 import uuid
+from datetime import datetime
 from typing import List, TYPE_CHECKING
 import sqlalchemy as sa
-from sqlalchemy import String, Boolean, ForeignKey, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Boolean, ForeignKey, UniqueConstraint, DateTime, Integer, Text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 from sqlalchemy.sql.schema import Table, Column, Index
 
+from app.core.ids import uuid7
 from app.db.base import Base
 
 if TYPE_CHECKING:
@@ -17,24 +20,37 @@ collection_pins_table = Table(
     "collection_pins", Base.metadata,
     Column("collection_id", UUID(as_uuid=True), ForeignKey("collections.id"), primary_key=True),
     Column("product_id", UUID(as_uuid=True), ForeignKey("products.id"), primary_key=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    # Reverse lookup (who pinned a product), also keyset-paged by collection_id
+    Index("ix_collection_pins_product_id_collection_id", "product_id", "collection_id"),
+    # Keyset order of a collection's pins, newest first; also picks the cover images
+    Index("ix_collection_pins_collection_id_created_at", "collection_id", sa.text("created_at DESC"),
+          sa.text("product_id DESC")),
 )
 
 class Collection(Base):
     __tablename__ = "collections"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     is_public: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     is_default_favorites: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Maintained by database triggers on collection_pins (see migration c4cc9ac1cfd5), so the
+    # collection grid never loads the pins themselves
+    pin_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    cover_image_urls: Mapped[List[str]] = mapped_column(ARRAY(Text), default=list, server_default="{}",
+                                                        nullable=False)
 
     user: Mapped["User"] = relationship(back_populates="collections")
     products: Mapped[List["Product"]] = relationship(secondary=collection_pins_table, cascade="all, delete")
-    ble_args__ = (
+    __table_args__ = (
         Index(
             '_user_default_favorites_uc',
             'user_id',
             unique=True,
             postgresql_where=sa.text('is_default_favorites = true')
         ),
+        Index('ix_collections_user_id_created_at', 'user_id', 'created_at'),
     )
\ No newline at end of file
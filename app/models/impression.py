@@ -0,0 +1,19 @@
+import uuid
+from datetime import date
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ProductImpressionStats(Base):
+    """Daily impression aggregates flushed from the Redis impression stream."""
+    __tablename__ = "product_impression_stats"
+
+    product_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), sa.ForeignKey("products.id"),
+                                                  primary_key=True)
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    impressions: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+    unique_viewers: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
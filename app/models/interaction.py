@@ -24,6 +24,11 @@ class ProductInteraction(Base):
     user: Mapped["User"] = relationship()
     product: Mapped["Product"] = relationship()
 
+    # Hash-partitioned by user_id (INTERACTION_PARTITIONS partitions, created by the migration).
+    # Every query should filter on user_id so it only touches one partition.
     __table_args__ = (
-        sa.UniqueConstraint('user_id', 'product_id', name='_user_product_uc'),
+        # Keyset order of GET /me/interactions; the type is included so pages are index-only scans
+        sa.Index('ix_product_interactions_user_id_created_at', 'user_id', sa.text('created_at DESC'),
+                 sa.text('product_id DESC'), postgresql_include=['interaction_type']),
+        {'postgresql_partition_by': 'HASH (user_id)'},
     )
\ No newline at end of file
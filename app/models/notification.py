@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class PriceChangeEvent(Base):
+    """A selling price changed by the catalog ingest/sync, waiting to be fanned out to the product's fans."""
+    __tablename__ = "price_change_events"
+
+    id: Mapped[int] = mapped_column(sa.BigInteger, sa.Identity(), primary_key=True)
+    product_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
+    old_price: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
+    new_price: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(sa.DateTime(timezone=True), server_default=func.now(),
+                                                 nullable=False)
+    # Last collection_pins.collection_id handed to the outbox; fan-out resumes after it
+    fanout_cursor: Mapped[Optional[uuid.UUID]] = mapped_column(PG_UUID(as_uuid=True))
+    fanned_out_at: Mapped[Optional[datetime]] = mapped_column(sa.DateTime(timezone=True))
+
+    __table_args__ = (
+        sa.Index('ix_price_change_events_pending', 'id', postgresql_where=sa.text('fanned_out_at IS NULL')),
+    )
+
+
+class NotificationOutbox(Base):
+    """Notifications waiting for delivery. (kind, source_id, user_id) is unique, so re-running a fan-out is harmless."""
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(sa.BigInteger, sa.Identity(), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"),
+                                               nullable=False)
+    kind: Mapped[str] = mapped_column(sa.String(32), nullable=False)
+    # Id of the event that caused the notification, e.g. price_change_events.id
+    source_id: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(sa.DateTime(timezone=True), server_default=func.now(),
+                                                 nullable=False)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(sa.DateTime(timezone=True))
+
+    __table_args__ = (
+        sa.UniqueConstraint('kind', 'source_id', 'user_id', name='uq_notification_outbox_source_user'),
+        sa.Index('ix_notification_outbox_unsent', 'id', postgresql_where=sa.text('sent_at IS NULL')),
+    )
@@ -2,19 +2,20 @@ import uuid
 from typing import List, Optional
 
 from sqlalchemy import (
-    String, DateTime, Integer, UniqueConstraint, Table, Column, ForeignKey, BigInteger
+    String, DateTime, Integer, UniqueConstraint, Table, Column, ForeignKey, BigInteger, Index
 )
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import Text
 
+from app.core.ids import uuid7
 from app.db.base import Base
 
 product_category_association = Table(
     'product_category_association', Base.metadata,
     Column('product_id', PG_UUID(as_uuid=True), ForeignKey('products.id'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True, index=True)
 )
 
 product_attribute_association = Table(
@@ -33,7 +34,7 @@ class Brand(Base):
 
 class Product(Base):
     __tablename__ = "products"
-    id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid7)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     dg_product_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True, nullable=True)
     dg_variant_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True)
@@ -45,6 +46,8 @@ class Product(Base):
     updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(),
                                                  onupdate=func.now())
     images: Mapped[List["ProductImage"]] = relationship(back_populates="product", cascade="all, delete-orphan")
+    # Maintained by database triggers from the name, brand and attribute values (see migration 5e1d9a04c7b2)
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR, deferred=True)
 
     @property
     def primary_image(self):
@@ -58,12 +61,27 @@ class Product(Base):
                                                               back_populates="products", lazy="selectin")
     seller: Mapped["Seller"] = relationship(back_populates="products")
 
+    __table_args__ = (
+        # Keyset order of GET /products/changes
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
+
+class ProductTombstone(Base):
+    """Deleted product ids, written by a database trigger, so client caches can drop them."""
+    __tablename__ = "product_tombstones"
+    product_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    deleted_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    __table_args__ = (Index("ix_product_tombstones_deleted_at_product_id", "deleted_at", "product_id"),)
+
 
 class ProductImage(Base):
     __tablename__ = "product_images"
     id: Mapped[int] = mapped_column(primary_key=True)
     url: Mapped[str] = mapped_column(String(1024), nullable=False)
-    product_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("products.id"))
+    product_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("products.id"), index=True)
     product: Mapped["Product"] = relationship(back_populates="images", lazy="selectin")
 
 
@@ -72,8 +90,9 @@ class Category(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("categories.id"))
-    parent: Mapped[Optional["Category"]] = relationship(back_populates="children", remote_side=[id], lazy="selectin")
-    children: Mapped[List["Category"]] = relationship(back_populates="parent", lazy="selectin")
+    # Use app.services.category_tree for hierarchy lookups; eager loading here pulled in whole subtrees
+    parent: Mapped[Optional["Category"]] = relationship(back_populates="children", remote_side=[id], lazy="raise")
+    children: Mapped[List["Category"]] = relationship(back_populates="parent", lazy="raise")
     products: Mapped[List["Product"]] = relationship(secondary=product_category_association,
                                                      back_populates="categories")
     __table_args__ = (UniqueConstraint('parent_id', 'name', name='_parent_name_uc'),)
@@ -1,9 +1,9 @@
 import uuid
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 from .product import ProductImageSchema
-from .user import UserMinimal
 
 class CollectionBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=100)
@@ -19,7 +19,12 @@ class CollectionUpdate(BaseModel):
 class CollectionRead(CollectionBase):
     model_config = ConfigDict(from_attributes=True)
     id: uuid.UUID
-    user: UserMinimal
+    user_id: uuid.UUID
+    is_default_favorites: bool
+    created_at: datetime
+    pin_count: int
+    # First image of the most recently pinned products, newest first (up to 4)
+    cover_image_urls: List[str]
 
 class ProductFavoriteItemSchema(CollectionBase):
     product_id: uuid.UUID
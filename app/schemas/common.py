@@ -1,6 +1,16 @@
+from typing import Generic, List, Optional, TypeVar
+
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
 
 class HealthStatus(BaseModel):
     status: str
     detail: str | None = None
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -0,0 +1,9 @@
+import uuid
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class ImpressionBatch(BaseModel):
+    product_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=100)
+    source: str = Field("feed", max_length=32, description="Feed the items were shown in, e.g. 'personalized'")
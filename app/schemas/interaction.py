@@ -1,4 +1,5 @@
 import uuid
+from typing import List
 from pydantic import BaseModel, Field
 from app.models.interaction import InteractionType
 from app.schemas.product import ProductFeedItemSchema
@@ -11,6 +12,17 @@ class InteractionBase(BaseModel):
 class InteractionCreate(InteractionBase):
     pass
 
+class InteractionBulkCreate(BaseModel):
+    # Applied in order; a later entry for the same product wins
+    interactions: List[InteractionCreate] = Field(..., min_length=1, max_length=500)
+
+class InteractionBulkResult(BaseModel):
+    changed: int
+    unchanged: int
+    unknown_product_ids: List[uuid.UUID]
+    # Write-behind mode: accepted but not applied yet
+    queued: int = 0
+
 class InteractionRead(InteractionBase):
     user_id: uuid.UUID
 
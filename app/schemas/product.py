@@ -1,7 +1,9 @@
 from pydantic import BaseModel, HttpUrl, field_validator
 import uuid
+from datetime import datetime
 from typing import Optional, List
 
+from app.schemas.common import CursorPage
 from app.schemas.user import UserMinimal
 
 
@@ -17,12 +19,19 @@ class BrandSchema(BaseModel):
     class Config:
         orm_mode = True
 
+# Per-viewer fields of ProductFeedItemSchema; never part of a cached product card
+VIEWER_FLAGS = {"liked", "disliked", "favorited"}
+
 class ProductFeedItemSchema(BaseModel):
     id: uuid.UUID
     name: str
     selling_price: int
     brand: BrandSchema
     primary_image: Optional[ProductImageSchema] = None
+    # Signed-in viewers only; None for guests
+    liked: Optional[bool] = None
+    disliked: Optional[bool] = None
+    favorited: Optional[bool] = None
 
     class Config:
         orm_mode = True
@@ -56,4 +65,49 @@ class ProductDetailSchema(BaseModel):
         return None
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class FacetValueSchema(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class AttributeFacetSchema(BaseModel):
+    attribute_id: int
+    name: str
+    values: List[FacetValueSchema]
+
+
+class PriceRangeSchema(BaseModel):
+    min: Optional[int] = None
+    max: Optional[int] = None
+
+
+class FacetsSchema(BaseModel):
+    brands: List[FacetValueSchema] = []
+    attributes: List[AttributeFacetSchema] = []
+    price: PriceRangeSchema = PriceRangeSchema()
+
+
+class FacetedProductPage(CursorPage[ProductFeedItemSchema]):
+    total: int
+    facets: FacetsSchema
+
+
+class ProductChangeSchema(BaseModel):
+    id: uuid.UUID
+    deleted: bool
+    updated_at: datetime
+    # Absent for deletions
+    name: Optional[str] = None
+    selling_price: Optional[int] = None
+    brand: Optional[str] = None
+    image_url: Optional[str] = None
+
+
+class ProductChangesPage(BaseModel):
+    changes: List[ProductChangeSchema]
+    # Always set: store it and pass it as ?since= on the next sync
+    next_cursor: str
+    has_more: bool
@@ -0,0 +1,30 @@
+import uuid
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class EngagementCounts(BaseModel):
+    # Net likes and favorites gained (removals subtract) and impressions
+    likes: int = 0
+    favorites: int = 0
+    views: int = 0
+
+
+class SellerDayStats(EngagementCounts):
+    day: date
+
+
+class SellerProductStats(EngagementCounts):
+    product_id: uuid.UUID
+    # None once the product has been deleted
+    name: Optional[str] = None
+
+
+class SellerStatsSchema(BaseModel):
+    start: date
+    end: date
+    totals: EngagementCounts
+    days: List[SellerDayStats]
+    top_products: List[SellerProductStats]
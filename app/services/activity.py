@@ -0,0 +1,149 @@
+# File: app/services/activity.py
+
+import logging
+import uuid
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.interaction import InteractionType
+from app.services import popularity, seen_filter, taste_profile
+
+logger = logging.getLogger(__name__)
+
+# These hooks run after the database write has been committed. They only maintain
+# derived Redis state, so a Redis failure is logged and never fails the request.
+
+
+def _like_signal(
+        product_id: uuid.UUID,
+        interaction_type: Optional[InteractionType],
+        created_at: Optional[datetime],
+        previous_type: Optional[InteractionType],
+        previous_at: Optional[datetime],
+) -> Optional[Tuple[uuid.UUID, float, Optional[datetime]]]:
+    """The taste signal of a like given or taken back, or None if the change does not touch a like."""
+    # Signals are dated like the rows they come from, so a later removal takes back exactly what was added
+    if previous_type == InteractionType.LIKE and interaction_type != InteractionType.LIKE:
+        return product_id, -taste_profile.LIKE_WEIGHT, previous_at
+    if interaction_type == InteractionType.LIKE and previous_type != InteractionType.LIKE:
+        return product_id, taste_profile.LIKE_WEIGHT, created_at
+    return None
+
+
+async def _apply_like_signals(
+        redis_client: Redis,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        signals: Sequence[Tuple[uuid.UUID, float, Optional[datetime]]],
+) -> None:
+    """Profile counters and popularity of new likes, with one features query and one round trip."""
+    if not signals:
+        return
+    pipe = redis_client.pipeline()
+    popularity.queue(pipe, [product_id for product_id, weight, _ in signals if weight > 0], popularity.LIKE)
+    await taste_profile.record_product_signals(redis_client, db, user_id, signals, pipe=pipe)
+
+
+async def interaction_recorded(
+        redis_client: Redis,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        product_id: uuid.UUID,
+        interaction_type: InteractionType,
+        previous_type: Optional[InteractionType] = None,
+        previous_at: Optional[datetime] = None,
+        created_at: Optional[datetime] = None,
+) -> None:
+    """Called after a like/dislike has been created or changed."""
+    try:
+        if previous_type is None:
+            await seen_filter.add(redis_client, user_id, [product_id])
+        signal = _like_signal(product_id, interaction_type, created_at, previous_type, previous_at)
+        await _apply_like_signals(redis_client, db, user_id, [signal] if signal else [])
+    except RedisError as e:
+        logger.warning(f"Failed to update activity state for user {user_id}: {e}")
+
+
+async def interactions_recorded(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID, rows: Sequence) -> None:
+    """
+    Bulk form of interaction_recorded for the changed rows of interaction_crud.upsert_interactions
+    (product_id, interaction_type, created_at, previous_type, previous_at). Rows with no
+    interaction_type are deletions, as merged by the write-behind worker.
+    """
+    try:
+        new_ids = [row.product_id for row in rows if row.previous_type is None]
+        if new_ids:
+            await seen_filter.add(redis_client, user_id, new_ids)
+        signals = [
+            _like_signal(row.product_id, row.interaction_type, row.created_at, row.previous_type, row.previous_at)
+            for row in rows
+        ]
+        await _apply_like_signals(redis_client, db, user_id, [signal for signal in signals if signal])
+    except RedisError as e:
+        logger.warning(f"Failed to update activity state for user {user_id}: {e}")
+
+
+async def interaction_removed(
+        redis_client: Redis,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        product_id: uuid.UUID,
+        interaction_type: InteractionType,
+        created_at: Optional[datetime] = None,
+) -> None:
+    """Called after a like/dislike has been deleted."""
+    try:
+        if interaction_type == InteractionType.LIKE:
+            await taste_profile.record_product_signal(redis_client, db, user_id, product_id,
+                                                      -taste_profile.LIKE_WEIGHT, at=created_at)
+    except RedisError as e:
+        logger.warning(f"Failed to update activity state for user {user_id}: {e}")
+
+
+async def favorite_added(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID) -> None:
+    """Called after a product has been added to the user's favorites."""
+    try:
+        await seen_filter.add(redis_client, user_id, [product_id])
+        await taste_profile.record_product_signal(redis_client, db, user_id, product_id,
+                                                  taste_profile.FAVORITE_WEIGHT)
+        await popularity.record(redis_client, product_id, popularity.FAVORITE)
+    except RedisError as e:
+        logger.warning(f"Failed to update activity state for user {user_id}: {e}")
+
+
+async def favorite_removed(
+        redis_client: Redis,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        product_id: uuid.UUID,
+        created_at: Optional[datetime] = None,
+) -> None:
+    """Called after a product has been removed from the user's favorites; created_at is the pin's."""
+    try:
+        await taste_profile.record_product_signal(redis_client, db, user_id, product_id,
+                                                  -taste_profile.FAVORITE_WEIGHT, at=created_at)
+    except RedisError as e:
+        logger.warning(f"Failed to update activity state for user {user_id}: {e}")
+
+
+async def favorites_removed(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID, pins: Sequence) -> None:
+    """Bulk form of favorite_removed for the (product_id, created_at) rows of removed pins."""
+    try:
+        await taste_profile.record_product_signals(
+            redis_client, db, user_id,
+            [(pin.product_id, -taste_profile.FAVORITE_WEIGHT, pin.created_at) for pin in pins],
+        )
+    except RedisError as e:
+        logger.warning(f"Failed to update activity state for user {user_id}: {e}")
+
+
+async def product_viewed(redis_client: Redis, product_id: uuid.UUID) -> None:
+    """Called after a product detail page has been served."""
+    try:
+        await popularity.record(redis_client, product_id, popularity.VIEW)
+    except RedisError as e:
+        logger.warning(f"Failed to record view of product {product_id}: {e}")
@@ -0,0 +1,146 @@
+# File: app/services/catalog_changes.py
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+import asyncpg
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.crud import product as product_crud
+from app.db.session import async_session, get_asyncpg_dsn
+from app.services import category_tree, product_cards
+
+logger = logging.getLogger(__name__)
+
+# Catalog writes that bypass the app (ingestion jobs, admin SQL) are published by database
+# triggers on the catalog_changes channel. Every app process keeps one dedicated asyncpg
+# connection LISTENing there and turns the notifications into cache invalidations: product
+# cards are dropped from Redis, the local category tree is reloaded and the catalog snapshot
+# is flagged for an early rebuild. All of it is idempotent, so several processes receiving
+# the same notification is harmless. Notifications sent while the connection is down are
+# lost, so after reconnecting the listener scans the change feed (updated_at and tombstones)
+# from the last moment it was known to be connected.
+
+CHANNEL = "catalog_changes"
+PRODUCTS = "p"
+CATEGORIES = "c"
+# Read by the catalog-snapshot worker
+SNAPSHOT_DIRTY_KEY = "catalog_snapshot:dirty"
+CATCH_UP_PAGE_SIZE = 1000
+# Notifications arriving within this window are applied together
+DEBOUNCE_SECONDS = 0.05
+
+
+def parse_payload(payload: str) -> Tuple[str, List[uuid.UUID]]:
+    """'p:<id>,<id>' -> ('p', [ids]); 'c:' -> ('c', []). Malformed ids are skipped."""
+    kind, _, body = payload.partition(":")
+    ids = []
+    for value in filter(None, body.split(",")):
+        try:
+            ids.append(uuid.UUID(value))
+        except ValueError:
+            logger.warning(f"Ignoring malformed id {value!r} on {CHANNEL}.")
+    return kind, ids
+
+
+async def apply_changes(redis_client: Redis, product_ids: Set[uuid.UUID], categories_changed: bool) -> None:
+    if categories_changed:
+        category_tree.invalidate()
+    if not product_ids:
+        return
+    try:
+        await product_cards.invalidate(redis_client, product_ids)
+        await redis_client.set(SNAPSHOT_DIRTY_KEY, "1")
+    except RedisError as e:
+        # The cards still expire after PRODUCT_CARD_TTL_SECONDS
+        logger.warning(f"Could not invalidate {len(product_ids)} changed products: {e}")
+
+
+class CatalogChangeListener:
+    def __init__(self, redis_client: Redis, dsn: Optional[str] = None):
+        self.redis = redis_client
+        self.dsn = dsn or get_asyncpg_dsn()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        # Database time of the last moment the connection was known to be listening
+        self._alive_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._apply())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _on_notification(self, _conn, _pid, _channel, payload: str) -> None:
+        self._queue.put_nowait(payload)
+
+    async def _listen(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                await conn.add_listener(CHANNEL, self._on_notification)
+                listening_since = await conn.fetchval("SELECT now()")
+                logger.info(f"Listening for catalog changes on {CHANNEL}.")
+                if self._alive_at is not None:
+                    await self._catch_up(self._alive_at)
+                self._alive_at = listening_since
+                # A dropped connection is only noticed when something is sent on it
+                while True:
+                    await asyncio.sleep(settings.CATALOG_CHANGES_KEEPALIVE_SECONDS)
+                    self._alive_at = await conn.fetchval("SELECT now()")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Catalog change listener disconnected: {e}")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(settings.CATALOG_CHANGES_RECONNECT_SECONDS)
+
+    async def _catch_up(self, since: datetime) -> None:
+        """Invalidates everything changed or deleted since `since`, minus the longest write transaction."""
+        after = (since - timedelta(seconds=settings.PRODUCT_CHANGES_SETTLE_SECONDS), uuid.UUID(int=0))
+        total = 0
+        async with async_session() as db:
+            while True:
+                rows = await product_crud.get_product_changes(db, after, 0, CATCH_UP_PAGE_SIZE)
+                if rows:
+                    await apply_changes(self.redis, {row.id for row in rows}, False)
+                    total += len(rows)
+                    after = (rows[-1].ts, rows[-1].id)
+                if len(rows) < CATCH_UP_PAGE_SIZE:
+                    break
+        # Category changes are not tracked per row; reloading the tree is cheap
+        category_tree.invalidate()
+        logger.info(f"Catalog change catch-up since {since.isoformat()} invalidated {total} products.")
+
+    async def _apply(self) -> None:
+        while True:
+            payloads = [await self._queue.get()]
+            await asyncio.sleep(DEBOUNCE_SECONDS)
+            while not self._queue.empty():
+                payloads.append(self._queue.get_nowait())
+
+            product_ids: Set[uuid.UUID] = set()
+            categories_changed = False
+            for payload in payloads:
+                kind, ids = parse_payload(payload)
+                if kind == PRODUCTS:
+                    product_ids.update(ids)
+                elif kind == CATEGORIES:
+                    categories_changed = True
+            try:
+                await apply_changes(self.redis, product_ids, categories_changed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Could not apply {len(payloads)} catalog change notifications: {e}")
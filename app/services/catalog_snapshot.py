@@ -0,0 +1,359 @@
+# File: app/services/catalog_snapshot.py
+
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.product import AttributeValue, Product, product_attribute_association, product_category_association
+
+logger = logging.getLogger(__name__)
+
+# Read-only columnar snapshot of the catalog metadata used for candidate filtering.
+# Every uvicorn worker maps the same file with mmap, so the pages are shared between
+# processes and the arrays are numpy views with no copy. Product ordinal i is the i-th
+# product in UUID order. Category and attribute ids are CSR-encoded:
+# the ids of product i are ids[indptr[i]:indptr[i + 1]].
+#
+# Facet indexes: attribute_of_value maps an attribute value id to its attribute id, and the
+# brand/attribute postings are the inverse CSR lists (id -> sorted ordinals of its products),
+# so filters cost O(matching products) instead of a scan over every row.
+#
+# Layout: MAGIC | uint32 header length | JSON header | arrays, each 64-byte aligned.
+# A new snapshot is written to a temporary file and published with os.replace(),
+# so readers either see the old file or the complete new one.
+
+MAGIC = b"SYCAT001"
+ALIGNMENT = 64
+BUILD_CHUNK_SIZE = 10000
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, end) for every pair, without a Python loop."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return shifts + np.arange(total)
+
+
+class CatalogSnapshot:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.file_id = os.fstat(f.fileno()).st_ino
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_length,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._mmap[start:start + header_length])
+        self.count: int = self.header["count"]
+
+        arrays = {}
+        for name, spec in self.header["arrays"].items():
+            arrays[name] = np.frombuffer(self._mmap, dtype=spec["dtype"], count=spec["length"], offset=spec["offset"])
+        self.ids: np.ndarray = arrays["ids"].reshape(-1, 16)
+        self.price: np.ndarray = arrays["price"]
+        self.brand_id: np.ndarray = arrays["brand_id"]
+        self.created_at: np.ndarray = arrays["created_at"]
+        self.category_indptr: np.ndarray = arrays["category_indptr"]
+        self.category_ids: np.ndarray = arrays["category_ids"]
+        self.attribute_indptr: np.ndarray = arrays["attribute_indptr"]
+        self.attribute_ids: np.ndarray = arrays["attribute_ids"]
+        # Facet indexes; missing from snapshots written before faceted browsing existed
+        self.attribute_of_value: Optional[np.ndarray] = arrays.get("attribute_of_value")
+        self.brand_postings_indptr: Optional[np.ndarray] = arrays.get("brand_postings_indptr")
+        self.brand_postings: Optional[np.ndarray] = arrays.get("brand_postings")
+        self.attribute_postings_indptr: Optional[np.ndarray] = arrays.get("attribute_postings_indptr")
+        self.attribute_postings: Optional[np.ndarray] = arrays.get("attribute_postings")
+        self._all_brand_counts: Optional[np.ndarray] = None
+        self._all_value_counts: Optional[np.ndarray] = None
+
+    @property
+    def has_facet_index(self) -> bool:
+        return self.attribute_of_value is not None and self.brand_postings is not None
+
+    def _csr_mask(self, indptr: np.ndarray, values: np.ndarray, wanted: Sequence[int]) -> np.ndarray:
+        """Rows having at least one of the wanted ids."""
+        mask = np.zeros(self.count, dtype=bool)
+        hits = np.flatnonzero(np.isin(values, np.asarray(wanted, dtype=values.dtype)))
+        if hits.size:
+            mask[np.searchsorted(indptr, hits, side="right") - 1] = True
+        return mask
+
+    def mask(
+            self,
+            brand_ids: Optional[Sequence[int]] = None,
+            category_ids: Optional[Sequence[int]] = None,
+            min_price: Optional[int] = None,
+            max_price: Optional[int] = None,
+            match_any: bool = False,
+    ) -> np.ndarray:
+        """
+        Vectorized filter over all products. Brand and category filters are AND-ed
+        (or OR-ed with match_any=True); price bounds always apply.
+        """
+        taste_masks = []
+        if brand_ids is not None:
+            taste_masks.append(np.isin(self.brand_id, np.asarray(brand_ids, dtype=self.brand_id.dtype)))
+        if category_ids is not None:
+            taste_masks.append(self._csr_mask(self.category_indptr, self.category_ids, category_ids))
+
+        if taste_masks:
+            mask = np.logical_or.reduce(taste_masks) if match_any else np.logical_and.reduce(taste_masks)
+        else:
+            mask = np.ones(self.count, dtype=bool)
+        if min_price is not None:
+            mask &= self.price >= min_price
+        if max_price is not None:
+            mask &= self.price <= max_price
+        return mask
+
+    def _postings_mask(self, indptr: np.ndarray, postings: np.ndarray, wanted: Sequence[int]) -> np.ndarray:
+        mask = np.zeros(self.count, dtype=bool)
+        wanted = np.asarray([key for key in wanted if 0 <= key < len(indptr) - 1], dtype=np.int64)
+        if wanted.size:
+            mask[postings[_ranges(indptr[wanted], indptr[wanted + 1])]] = True
+        return mask
+
+    def brand_mask(self, brand_ids: Sequence[int]) -> np.ndarray:
+        return self._postings_mask(self.brand_postings_indptr, self.brand_postings, brand_ids)
+
+    def attribute_mask(self, attribute_value_ids: Sequence[int]) -> np.ndarray:
+        """Products having at least one of the values."""
+        return self._postings_mask(self.attribute_postings_indptr, self.attribute_postings, attribute_value_ids)
+
+    def category_mask(self, category_ids: Sequence[int]) -> np.ndarray:
+        return self._csr_mask(self.category_indptr, self.category_ids, category_ids)
+
+    def brand_counts(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Number of products per brand id among the rows selected by mask (all rows for None). Read-only."""
+        size = len(self.brand_postings_indptr) - 1
+        if mask is None:
+            if self._all_brand_counts is None:
+                self._all_brand_counts = np.bincount(self.brand_id, minlength=size)
+            return self._all_brand_counts
+        return np.bincount(self.brand_id[mask], minlength=size)
+
+    def attribute_value_counts(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Number of products per attribute value id among the rows selected by mask (all rows for None). Read-only."""
+        size = len(self.attribute_of_value)
+        if mask is None:
+            if self._all_value_counts is None:
+                self._all_value_counts = np.bincount(self.attribute_ids, minlength=size)
+            return self._all_value_counts
+        rows = np.flatnonzero(mask)
+        entries = _ranges(self.attribute_indptr[rows], self.attribute_indptr[rows + 1])
+        return np.bincount(self.attribute_ids[entries], minlength=size)
+
+    def price_range(self, mask: Optional[np.ndarray] = None) -> Tuple[Optional[int], Optional[int]]:
+        prices = self.price if mask is None else self.price[mask]
+        if not prices.size:
+            return None, None
+        return int(prices.min()), int(prices.max())
+
+    def newest(self, mask: np.ndarray, limit: int, after: Optional[Tuple[int, uuid.UUID]] = None) -> np.ndarray:
+        """
+        Ordinals of the newest selected products, ordered by (created_at DESC, id ASC),
+        starting strictly after the (created_at, id) key of the previous page.
+        """
+        rows = np.flatnonzero(mask)
+        created = self.created_at[rows]
+        if after is not None:
+            after_created, after_id = after
+            # Ordinals follow UUID order, so the id tie-break is an ordinal comparison
+            keys = self.ids.view("S16").ravel()
+            first_after = np.searchsorted(keys, np.array([after_id.bytes], dtype="S16"), side="right")[0]
+            keep = (created < after_created) | ((created == after_created) & (rows >= first_after))
+            rows, created = rows[keep], created[keep]
+        if rows.size > limit:
+            # Keep the top `limit` timestamps (and everything tied with the last one) before sorting
+            threshold = np.partition(created, rows.size - limit)[rows.size - limit]
+            keep = created >= threshold
+            rows, created = rows[keep], created[keep]
+        order = np.lexsort((rows, -created))
+        return rows[order[:limit]]
+
+    def sample(self, mask: np.ndarray, limit: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Random ordinals among the rows selected by mask."""
+        ordinals = np.flatnonzero(mask)
+        if ordinals.size <= limit:
+            return ordinals
+        return (rng or np.random.default_rng()).choice(ordinals, size=limit, replace=False)
+
+    def product_ids(self, ordinals: Sequence[int]) -> List[uuid.UUID]:
+        return [uuid.UUID(bytes=bytes(self.ids[ordinal])) for ordinal in ordinals]
+
+    def ordinals(self, product_ids: Sequence[uuid.UUID]) -> np.ndarray:
+        """Ordinals of the given products; -1 for products not in the snapshot."""
+        keys = self.ids.view("S16").ravel()
+        wanted = np.array([product_id.bytes for product_id in product_ids], dtype="S16")
+        positions = np.searchsorted(keys, wanted)
+        positions = np.minimum(positions, max(self.count - 1, 0))
+        found = (keys[positions] == wanted) if self.count else np.zeros(len(wanted), dtype=bool)
+        return np.where(found, positions, -1)
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_checked_at = 0.0
+
+
+def get_snapshot() -> Optional[CatalogSnapshot]:
+    """
+    Returns this process's view of the latest published snapshot, or None if none exists.
+    The file is re-checked at most every CATALOG_SNAPSHOT_CHECK_SECONDS and re-mapped
+    when a new one has been published.
+    """
+    global _snapshot, _checked_at
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < settings.CATALOG_SNAPSHOT_CHECK_SECONDS:
+        return _snapshot
+    _checked_at = now
+
+    path = settings.CATALOG_SNAPSHOT_PATH
+    try:
+        file_id = os.stat(path).st_ino
+    except FileNotFoundError:
+        return _snapshot
+    if _snapshot is None or _snapshot.file_id != file_id:
+        try:
+            _snapshot = CatalogSnapshot(path)
+            logger.info(f"Mapped catalog snapshot with {_snapshot.count} products "
+                        f"built at {_snapshot.header['built_at']}.")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not open catalog snapshot {path}: {e}")
+    return _snapshot
+
+
+# --- Builder ---
+
+async def _load_csr(db: AsyncSession, table, column, ordinal_of: Dict[uuid.UUID, int], count: int):
+    rows_per_product = np.zeros(count, dtype=np.int64)
+    pairs_ordinal: List[np.ndarray] = []
+    pairs_value: List[np.ndarray] = []
+
+    stmt = select(table.c.product_id, column).execution_options(yield_per=BUILD_CHUNK_SIZE)
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        ordinals = np.fromiter((ordinal_of.get(product_id, -1) for product_id, _ in partition), dtype=np.int64)
+        values = np.fromiter((value for _, value in partition), dtype=np.int32)
+        keep = ordinals >= 0
+        pairs_ordinal.append(ordinals[keep])
+        pairs_value.append(values[keep])
+
+    ordinals = np.concatenate(pairs_ordinal) if pairs_ordinal else np.zeros(0, dtype=np.int64)
+    values = np.concatenate(pairs_value) if pairs_value else np.zeros(0, dtype=np.int32)
+    order = np.argsort(ordinals, kind="stable")
+    np.add.at(rows_per_product, ordinals, 1)
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(rows_per_product, out=indptr[1:])
+    return indptr, values[order]
+
+
+def _invert(rows: np.ndarray, keys: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse CSR: for each key, the rows holding it, in ascending order."""
+    order = np.argsort(keys, kind="stable")
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=indptr[1:])
+    return indptr, np.asarray(rows, dtype=np.int32)[order]
+
+
+async def build_snapshot(db: AsyncSession, path: Optional[str] = None) -> int:
+    """Builds a snapshot from the database and publishes it atomically. Returns the product count."""
+    path = path or settings.CATALOG_SNAPSHOT_PATH
+    ids, prices, brands, created = [], [], [], []
+
+    stmt = (
+        select(Product.id, Product.selling_price, Product.brand_id, Product.created_at)
+        .order_by(Product.id)
+        .execution_options(yield_per=BUILD_CHUNK_SIZE)
+    )
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        for product_id, price, brand_id, created_at in partition:
+            ids.append(product_id.bytes)
+            prices.append(price)
+            brands.append(brand_id or 0)
+            created.append(int(created_at.timestamp() * 1_000_000) if created_at else 0)
+
+    count = len(ids)
+    ordinal_of = {uuid.UUID(bytes=raw): ordinal for ordinal, raw in enumerate(ids)}
+    category_indptr, category_ids = await _load_csr(
+        db, product_category_association, product_category_association.c.category_id, ordinal_of, count)
+    attribute_indptr, attribute_ids = await _load_csr(
+        db, product_attribute_association, product_attribute_association.c.attribute_value_id, ordinal_of, count)
+
+    value_rows = (await db.execute(select(AttributeValue.id, AttributeValue.attribute_id))).all()
+    value_size = max([value_id for value_id, _ in value_rows] + [int(attribute_ids.max(initial=0))]) + 1
+    attribute_of_value = np.full(value_size, -1, dtype=np.int32)
+    for value_id, attribute_id in value_rows:
+        attribute_of_value[value_id] = attribute_id
+
+    brand_id = np.asarray(brands, dtype=np.int32)
+    brand_postings_indptr, brand_postings = _invert(
+        np.arange(count), brand_id, int(brand_id.max(initial=0)) + 1)
+    attribute_rows = np.repeat(np.arange(count), np.diff(attribute_indptr))
+    attribute_postings_indptr, attribute_postings = _invert(attribute_rows, attribute_ids, value_size)
+
+    arrays = {
+        "ids": np.frombuffer(b"".join(ids), dtype=np.uint8).reshape(count, 16),
+        "price": np.asarray(prices, dtype=np.int64),
+        "brand_id": brand_id,
+        "created_at": np.asarray(created, dtype=np.int64),
+        "category_indptr": category_indptr,
+        "category_ids": category_ids.astype(np.int32),
+        "attribute_indptr": attribute_indptr,
+        "attribute_ids": attribute_ids.astype(np.int32),
+        "attribute_of_value": attribute_of_value,
+        "brand_postings_indptr": brand_postings_indptr,
+        "brand_postings": brand_postings,
+        "attribute_postings_indptr": attribute_postings_indptr,
+        "attribute_postings": attribute_postings,
+    }
+    write_snapshot(path, arrays, count)
+    return count
+
+
+def write_snapshot(path: str, arrays: Dict[str, np.ndarray], count: int) -> None:
+    """Serializes the arrays and atomically replaces the file at path."""
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        specs[name] = {"dtype": array.dtype.str, "length": int(array.size), "offset": offset}
+        offset += array.nbytes
+
+    header = {"count": count, "built_at": datetime.now(timezone.utc).isoformat(), "arrays": specs}
+    header_bytes = json.dumps(header).encode()
+    # Offsets grow once data_start is added, so leave room for the longer header
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes) + 256) // ALIGNMENT) * ALIGNMENT
+    for spec in specs.values():
+        spec["offset"] += data_start
+    header_bytes = json.dumps(header).encode()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(specs[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        # Empty trailing arrays still need their offset inside the file
+        f.truncate(max(spec["offset"] + arrays[name].nbytes for name, spec in specs.items()))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,123 @@
+# File: app/services/category_tree.py
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import product as product_crud
+
+logger = logging.getLogger(__name__)
+
+# The category tree is small and read on every category feed, so each process keeps it in
+# memory with the ancestors and descendants of every node precomputed. Whatever changes the
+# categories table bumps a version counter in Redis; processes compare it at most every
+# CATEGORY_TREE_CHECK_SECONDS and rebuild the tree from the database when it moved.
+
+VERSION_KEY = "category_tree:version"
+
+
+@dataclass(frozen=True)
+class CategoryTree:
+    version: Optional[str]
+    parent_of: Dict[int, Optional[int]]
+    # Root first, without the category itself
+    ancestors: Dict[int, Tuple[int, ...]]
+    # The category itself first, then its whole subtree
+    descendants: Dict[int, Tuple[int, ...]]
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[int, Optional[int]]], version: Optional[str]) -> "CategoryTree":
+        parent_of = dict(rows)
+        children: Dict[Optional[int], List[int]] = {}
+        for category_id, parent_id in parent_of.items():
+            # Orphans (dangling parent ids) are treated as roots
+            children.setdefault(parent_id if parent_id in parent_of else None, []).append(category_id)
+
+        ancestors: Dict[int, Tuple[int, ...]] = {}
+        order: List[int] = []
+        stack = [(root, ()) for root in children.get(None, [])]
+        while stack:
+            category_id, path = stack.pop()
+            if category_id in ancestors:
+                continue
+            ancestors[category_id] = path
+            order.append(category_id)
+            stack.extend((child, path + (category_id,)) for child in children.get(category_id, []))
+
+        descendants: Dict[int, Tuple[int, ...]] = {}
+        # Children are visited after their parent, so walking backwards sees every subtree complete
+        for category_id in reversed(order):
+            subtree = [category_id]
+            for child in children.get(category_id, []):
+                subtree.extend(descendants.get(child, ()))
+            descendants[category_id] = tuple(subtree)
+
+        if len(order) != len(parent_of):
+            logger.warning(f"{len(parent_of) - len(order)} categories are part of a parent cycle and were skipped.")
+        return cls(version=version, parent_of=parent_of, ancestors=ancestors, descendants=descendants)
+
+    def __contains__(self, category_id: int) -> bool:
+        return category_id in self.descendants
+
+    def get_descendants(self, category_id: int) -> Tuple[int, ...]:
+        """The category and all of its subcategories; empty for unknown ids."""
+        return self.descendants.get(category_id, ())
+
+    def get_ancestors(self, category_id: int) -> Tuple[int, ...]:
+        return self.ancestors.get(category_id, ())
+
+
+_tree: Optional[CategoryTree] = None
+_checked_at = 0.0
+_reload = False
+_lock = asyncio.Lock()
+
+
+async def get_tree(redis_client: Redis, db: AsyncSession) -> CategoryTree:
+    """
+    Returns this process's copy of the category tree, rebuilding it when the published
+    version changed. Without Redis the current copy is kept until the version is readable again.
+    """
+    global _tree, _checked_at, _reload
+    if _tree is not None and not _reload and time.monotonic() - _checked_at < settings.CATEGORY_TREE_CHECK_SECONDS:
+        return _tree
+
+    async with _lock:
+        if _tree is not None and not _reload and time.monotonic() - _checked_at < settings.CATEGORY_TREE_CHECK_SECONDS:
+            return _tree
+        try:
+            version = await redis_client.get(VERSION_KEY) or "0"
+        except RedisError as e:
+            logger.warning(f"Could not read the category tree version: {e}")
+            version = None
+
+        if _tree is None or _reload or (version is not None and version != _tree.version):
+            # Cleared before loading, so an invalidation that arrives during the load is not lost
+            reload, _reload = _reload, False
+            try:
+                rows = await product_crud.get_category_parents(db)
+            except Exception:
+                _reload = _reload or reload
+                raise
+            _tree = CategoryTree.build(rows, version)
+            logger.info(f"Loaded category tree version {version} with {len(_tree.parent_of)} categories.")
+        _checked_at = time.monotonic()
+    return _tree
+
+
+def invalidate() -> None:
+    """Makes the next get_tree in this process reload from the database, whatever the version says."""
+    global _reload
+    _reload = True
+
+
+async def bump_version(redis_client: Redis) -> None:
+    """Marks every process's copy of the tree as stale. Call after changing the categories table."""
+    await redis_client.incr(VERSION_KEY)
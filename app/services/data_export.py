@@ -0,0 +1,92 @@
+# File: app/services/data_export.py
+
+import asyncio
+import json
+import logging
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+from app.core.config import settings
+from app.crud import collection as collection_crud
+from app.crud import interaction as interaction_crud
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+# A user's data export as NDJSON, one record per line: every interaction, then every
+# collection, then every pin. Rows come from server-side cursors EXPORT_BATCH_SIZE at a time
+# and go out in chunks of about CHUNK_BYTES, optionally gzip-compressed as they are produced,
+# so memory stays flat however long the history is. Each running export holds one pooled
+# connection for its whole duration, so at most EXPORT_MAX_CONCURRENT run per process.
+
+CHUNK_BYTES = 64 * 1024
+
+_slots = asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENT)
+
+
+def is_busy() -> bool:
+    """True while every export slot is taken; a new export would have to wait."""
+    return _slots.locked()
+
+
+def _json_default(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":"), default=_json_default).encode() + b"\n"
+
+
+async def _records(user_id: uuid.UUID) -> AsyncIterator[bytes]:
+    batch_size = settings.EXPORT_BATCH_SIZE
+    async with async_session() as db:
+        interactions = await interaction_crud.stream_interactions_by_user(db, user_id, batch_size)
+        async for interaction in interactions:
+            yield _line({
+                "type": "interaction", "product_id": interaction.product_id,
+                "interaction_type": interaction.interaction_type.value, "created_at": interaction.created_at,
+            })
+
+        for collection in await collection_crud.get_user_collections(db, user_id):
+            yield _line({
+                "type": "collection", "id": collection.id, "name": collection.name,
+                "is_public": collection.is_public, "is_default_favorites": collection.is_default_favorites,
+                "created_at": collection.created_at,
+            })
+
+        pins = await collection_crud.stream_user_pins(db, user_id, batch_size)
+        async for pin in pins:
+            yield _line({
+                "type": "pin", "collection_id": pin.collection_id, "product_id": pin.product_id,
+                "created_at": pin.created_at,
+            })
+
+
+async def export_user_data(user_id: uuid.UUID, compress: bool = False) -> AsyncIterator[bytes]:
+    """The user's export as a stream of byte chunks; waits for a free export slot first."""
+    async with _slots:
+        compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+        buffer: List[bytes] = []
+        size = 0
+        try:
+            async for line in _records(user_id):
+                buffer.append(line)
+                size += len(line)
+                if size >= CHUNK_BYTES:
+                    chunk = b"".join(buffer)
+                    buffer, size = [], 0
+                    if compressor:
+                        chunk = compressor.compress(chunk)
+                    if chunk:
+                        yield chunk
+        except Exception as e:
+            # Headers are already sent, so the client only sees a truncated file
+            logger.exception(f"Data export of user {user_id} failed: {e}")
+            raise
+        chunk = b"".join(buffer)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
@@ -0,0 +1,147 @@
+# File: app/services/facets.py
+
+import uuid
+from dataclasses import dataclass, field
+from functools import reduce
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud import product as product_crud
+from app.services import catalog_snapshot
+
+# Faceted browsing over the shared catalog snapshot. Filters are resolved through the
+# snapshot's brand/attribute postings lists and facet counts are vectorized bincounts over
+# the matching rows, so no GROUP BY runs per request. Values of the same attribute are
+# OR-ed, everything else is AND-ed, and each facet is counted with every filter except
+# its own (multi-select faceting), so the UI can show what selecting another value gives.
+
+
+class CatalogIndexNotReady(Exception):
+    """No snapshot with facet indexes has been published yet."""
+
+
+@dataclass
+class BrowseFilters:
+    brand_ids: List[int] = field(default_factory=list)
+    attribute_value_ids: List[int] = field(default_factory=list)
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    # A category and its descendants
+    category_ids: Optional[Sequence[int]] = None
+
+
+@dataclass
+class BrowseResult:
+    product_ids: List[uuid.UUID]
+    next_cursor: Optional[str]
+    total: int
+    facets: dict
+
+
+def _combine(masks: Dict[Hashable, np.ndarray], exclude: Optional[Hashable] = None) -> Optional[np.ndarray]:
+    """AND of every filter mask except `exclude`; None means no filter (all products)."""
+    selected = [mask for key, mask in masks.items() if key != exclude]
+    return reduce(np.logical_and, selected) if selected else None
+
+
+def _top(counts: np.ndarray, limit: int, always: Sequence[int] = ()) -> List[int]:
+    """Ids with the highest non-zero counts, plus the ids in `always` (selected values)."""
+    nonzero = np.flatnonzero(counts)
+    best = nonzero[np.argsort(-counts[nonzero], kind="stable")[:limit]].tolist()
+    return best + [value for value in always if value not in best and 0 <= value < len(counts)]
+
+
+async def browse(
+        db: AsyncSession,
+        filters: BrowseFilters,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        facet_limit: int = 10,
+) -> BrowseResult:
+    """
+    One page of the newest matching products plus brand, attribute and price facets.
+    Raises ValueError for a malformed cursor and CatalogIndexNotReady without a snapshot.
+    """
+    snapshot = catalog_snapshot.get_snapshot()
+    if snapshot is None or not snapshot.has_facet_index:
+        raise CatalogIndexNotReady()
+
+    after = None
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            after = (int(values[0]), uuid.UUID(str(values[1])))
+        except (IndexError, TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
+    masks: Dict[Hashable, np.ndarray] = {}
+    if filters.brand_ids:
+        masks["brand"] = snapshot.brand_mask(filters.brand_ids)
+    groups: Dict[int, List[int]] = {}
+    for value_id in filters.attribute_value_ids:
+        if 0 <= value_id < len(snapshot.attribute_of_value):
+            groups.setdefault(int(snapshot.attribute_of_value[value_id]), []).append(value_id)
+        else:
+            groups.setdefault(-1, []).append(value_id)
+    for attribute_id, value_ids in groups.items():
+        masks[("attribute", attribute_id)] = snapshot.attribute_mask(value_ids)
+    if filters.min_price is not None or filters.max_price is not None:
+        masks["price"] = snapshot.mask(min_price=filters.min_price, max_price=filters.max_price)
+    if filters.category_ids is not None:
+        masks["category"] = snapshot.category_mask(filters.category_ids)
+
+    matched = _combine(masks)
+    if matched is None:
+        matched = np.ones(snapshot.count, dtype=bool)
+    ordinals = snapshot.newest(matched, limit, after)
+    product_ids = snapshot.product_ids(ordinals)
+    next_cursor = None
+    if len(ordinals) == limit:
+        last = ordinals[-1]
+        next_cursor = encode_cursor([int(snapshot.created_at[last]), str(product_ids[-1])])
+
+    # Facet counts, each without its own filter
+    brand_counts = snapshot.brand_counts(_combine(masks, "brand")).copy()
+    brand_counts[0] = 0  # products without a brand
+    value_counts = snapshot.attribute_value_counts(_combine(masks)).copy()
+    for attribute_id in groups:
+        own_values = snapshot.attribute_of_value == attribute_id
+        own_counts = snapshot.attribute_value_counts(_combine(masks, ("attribute", attribute_id)))
+        value_counts[own_values] = own_counts[own_values]
+    price_min, price_max = snapshot.price_range(_combine(masks, "price"))
+
+    brand_ids = _top(brand_counts, facet_limit, filters.brand_ids)
+    # Cap the values per attribute rather than overall, so one large attribute cannot hide the others
+    values_by_attribute: Dict[int, List[int]] = {}
+    for value_id in _top(value_counts, len(value_counts), filters.attribute_value_ids):
+        attribute_values = values_by_attribute.setdefault(int(snapshot.attribute_of_value[value_id]), [])
+        if len(attribute_values) < facet_limit or value_id in filters.attribute_value_ids:
+            attribute_values.append(value_id)
+    attribute_order = sorted(values_by_attribute, key=lambda a: -int(value_counts[values_by_attribute[a]].sum()))
+    values_by_attribute = {a: values_by_attribute[a] for a in attribute_order[:facet_limit] if a >= 0}
+
+    brand_names = await product_crud.get_brand_names(db, brand_ids)
+    labels = await product_crud.get_attribute_value_labels(
+        db, [value_id for value_ids in values_by_attribute.values() for value_id in value_ids])
+
+    attributes = []
+    for attribute_id, value_ids in values_by_attribute.items():
+        known = [value_id for value_id in value_ids if value_id in labels]
+        if not known:
+            continue
+        attributes.append({
+            "attribute_id": attribute_id,
+            "name": labels[known[0]][1],
+            "values": [{"id": v, "name": labels[v][2], "count": int(value_counts[v])} for v in known],
+        })
+    facets = {
+        "brands": [
+            {"id": b, "name": brand_names[b], "count": int(brand_counts[b])} for b in brand_ids if b in brand_names
+        ],
+        "attributes": attributes,
+        "price": {"min": price_min, "max": price_max},
+    }
+    return BrowseResult(product_ids=product_ids, next_cursor=next_cursor, total=int(matched.sum()), facets=facets)
@@ -0,0 +1,37 @@
+# File: app/services/favorites.py
+
+import logging
+import uuid
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import collection as collection_crud
+
+logger = logging.getLogger(__name__)
+
+# The id of a user's favorites collection never changes once created, so it is cached in
+# Redis and favoriting a product is a single pin insert or delete.
+FAVORITES_ID_TTL_SECONDS = 30 * 86400
+
+
+def _key(user_id: uuid.UUID) -> str:
+    return f"favorites_id:{user_id}"
+
+
+async def get_collection_id(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID) -> uuid.UUID:
+    """The user's favorites collection id, created on first use. Falls back to Postgres if Redis is down."""
+    try:
+        cached = await redis_client.get(_key(user_id))
+        if cached:
+            return uuid.UUID(cached)
+    except RedisError as e:
+        logger.warning(f"Could not read the favorites collection id of user {user_id}: {e}")
+
+    collection_id = await collection_crud.get_or_create_favorites_collection_id(db, user_id)
+    try:
+        await redis_client.set(_key(user_id), str(collection_id), ex=FAVORITES_ID_TTL_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Could not cache the favorites collection id of user {user_id}: {e}")
+    return collection_id
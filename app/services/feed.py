@@ -0,0 +1,89 @@
+# File: app/services/feed.py
+
+import logging
+import uuid
+from typing import List, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import product as product_crud
+from app.models import Product, User
+from app.services import catalog_snapshot, impressions, seen_filter, taste_profile
+
+logger = logging.getLogger(__name__)
+
+
+async def _sample_candidates(
+        db: AsyncSession,
+        limit: int,
+        taste: Optional[taste_profile.TasteProfile] = None,
+) -> List[uuid.UUID]:
+    """
+    Random candidate ids matching the taste profile (any product when taste is None).
+    Uses vectorized masks over the shared catalog snapshot when one is published,
+    otherwise queries the database.
+    """
+    snapshot = catalog_snapshot.get_snapshot()
+    if snapshot is not None:
+        if taste is None:
+            mask = snapshot.mask()
+        else:
+            mask = snapshot.mask(brand_ids=taste.brand_ids, category_ids=taste.category_ids, match_any=True)
+        return snapshot.product_ids(snapshot.sample(mask, limit))
+
+    if taste is None:
+        return await product_crud.get_random_product_ids(db, limit)
+    return await product_crud.get_taste_candidate_ids(db, taste.brand_ids, taste.category_ids, limit)
+
+
+async def get_personalized_feed_ids(
+        db: AsyncSession,
+        redis_client: Redis,
+        user_id: uuid.UUID,
+        limit: int = 20,
+) -> Optional[List[uuid.UUID]]:
+    """
+    Ranks unseen product ids from the cached taste profile and seen-item filter, skipping
+    products shown to the user recently (impressions and served feed pages).
+    Candidates are oversampled without any NOT IN list and post-filtered in memory,
+    so the cost does not depend on how long the user's history is.
+    Returns an empty list when there is nothing to personalize and None when Redis is unavailable.
+    """
+    taste = await taste_profile.get_taste_profile(redis_client, db, user_id)
+    if taste is None:
+        return None
+    if not taste.brand_ids and not taste.category_ids:
+        return []
+
+    sample_size = limit * settings.FEED_CANDIDATE_OVERSAMPLE
+    try:
+        candidates = await _sample_candidates(db, sample_size, taste)
+        unseen = await seen_filter.filter_unseen(redis_client, db, user_id, candidates)
+        unseen = await impressions.filter_not_shown(redis_client, user_id, unseen)
+        if not unseen:
+            # Fallback: If no recommendations found, return some random unseen items
+            candidates = await _sample_candidates(db, sample_size)
+            unseen = await seen_filter.filter_unseen(redis_client, db, user_id, candidates)
+            unseen = await impressions.filter_not_shown(redis_client, user_id, unseen)
+    except RedisError as e:
+        logger.warning(f"Seen filter unavailable for user {user_id}: {e}")
+        return None
+
+    return unseen[:limit]
+
+
+async def get_personalized_feed(db: AsyncSession, redis_client: Redis, user: User, limit: int = 20) -> List[Product]:
+    """
+    Computes a personalized feed synchronously.
+    Falls back to the guest feed for users without a taste profile and to the
+    database-only feed when Redis is unavailable.
+    """
+    product_ids = await get_personalized_feed_ids(db, redis_client, user.id, limit)
+    if product_ids is None:
+        return await product_crud.get_personalized_feed_for_user(db, user=user, limit=limit)
+    if not product_ids:
+        return await product_crud.get_guest_feed_products(db, limit)
+    return await product_crud.get_products_by_ids(db, product_ids)
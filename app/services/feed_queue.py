@@ -0,0 +1,101 @@
+# File: app/services/feed_queue.py
+
+import logging
+import time
+import uuid
+from typing import Any, Dict, List
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services import feed, impressions, product_cards, seen_filter
+
+logger = logging.getLogger(__name__)
+
+# Each recently active user gets a Redis list holding the next ranked product ids.
+# The personalized feed endpoint pops pages from it; the feed-queue worker keeps it
+# above the low-water mark. Recently active users are tracked in a sorted set scored
+# by their last feed request.
+
+ACTIVE_USERS_KEY = "feedq:active"
+REFILL_LOCK_SECONDS = 60
+
+
+def _key(user_id: uuid.UUID) -> str:
+    return f"feedq:{user_id}"
+
+
+def _lock_key(user_id: uuid.UUID) -> str:
+    return f"feedq:lock:{user_id}"
+
+
+async def pop_page(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID, count: int) -> List[Dict[str, Any]]:
+    """
+    Pops the next page of the user's queue and hydrates it from cached product cards.
+    Returns an empty list when the queue is empty or Redis is unavailable,
+    in which case the caller computes the feed synchronously.
+    """
+    try:
+        pipe = redis_client.pipeline()
+        pipe.zadd(ACTIVE_USERS_KEY, {str(user_id): time.time()})
+        pipe.lpop(_key(user_id), count)
+        _, raw_ids = await pipe.execute()
+        if not raw_ids:
+            return []
+
+        # Items may have been liked or saved since they were queued
+        product_ids = await seen_filter.filter_unseen(redis_client, db, user_id, [uuid.UUID(i) for i in raw_ids])
+        # Served means shown, so a refill does not queue them again before the client's impressions arrive
+        await impressions.record_shown(redis_client, user_id, product_ids)
+        return await product_cards.get_cards(redis_client, db, product_ids)
+    except RedisError as e:
+        logger.warning(f"Feed queue unavailable for user {user_id}: {e}")
+        return []
+
+
+async def get_users_needing_refill(redis_client: Redis) -> List[uuid.UUID]:
+    """Returns recently active users whose queue is below the low-water mark."""
+    cutoff = time.time() - settings.FEED_QUEUE_ACTIVE_WINDOW_MINUTES * 60
+    await redis_client.zremrangebyscore(ACTIVE_USERS_KEY, "-inf", cutoff)
+    user_ids = [uuid.UUID(user_id) for user_id in await redis_client.zrange(ACTIVE_USERS_KEY, 0, -1)]
+    if not user_ids:
+        return []
+
+    pipe = redis_client.pipeline()
+    for user_id in user_ids:
+        pipe.llen(_key(user_id))
+    lengths = await pipe.execute()
+    return [user_id for user_id, length in zip(user_ids, lengths) if length < settings.FEED_QUEUE_LOW_WATER]
+
+
+async def refill(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID) -> int:
+    """
+    Tops the user's queue up to FEED_QUEUE_SIZE ranked product ids.
+    A short-lived lock keeps several worker processes from refilling the same queue.
+    Returns the number of ids pushed.
+    """
+    if not await redis_client.set(_lock_key(user_id), 1, nx=True, ex=REFILL_LOCK_SECONDS):
+        return 0
+    try:
+        key = _key(user_id)
+        queued = set(await redis_client.lrange(key, 0, -1))
+        wanted = settings.FEED_QUEUE_SIZE - len(queued)
+        if wanted <= 0:
+            return 0
+
+        # Recently shown products are already left out by the ranking
+        ranked = await feed.get_personalized_feed_ids(db, redis_client, user_id, limit=wanted)
+        new_ids = [str(product_id) for product_id in ranked or [] if str(product_id) not in queued]
+        if not new_ids:
+            return 0
+
+        pipe = redis_client.pipeline()
+        pipe.rpush(key, *new_ids)
+        pipe.ltrim(key, 0, settings.FEED_QUEUE_SIZE - 1)
+        pipe.expire(key, settings.FEED_QUEUE_ACTIVE_WINDOW_MINUTES * 60)
+        await pipe.execute()
+        return len(new_ids)
+    finally:
+        await redis_client.delete(_lock_key(user_id))
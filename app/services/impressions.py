@@ -0,0 +1,120 @@
+# File: app/services/impressions.py
+
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Dict, List, Sequence, Tuple
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ResponseError
+
+from app.core.config import settings
+from app.services import seen_filter
+
+# Impressions are appended to a Redis stream on the request path (one entry per batch).
+# The impression worker consumes the stream through a consumer group, maintains per-product
+# HyperLogLog unique-viewer counts and per-user recently-shown sets in Redis, and periodically
+# flushes daily aggregates to Postgres before acknowledging the entries (at-least-once).
+# The personalized feed and the feed queue skip recently shown products.
+
+STREAM_KEY = "impressions"
+CONSUMER_GROUP = "impressions-aggregator"
+VIEWERS_TTL_SECONDS = 3 * 86400
+
+
+def _viewers_key(product_id: str, day: date) -> str:
+    return f"pviewers:{product_id}:{day.isoformat()}"
+
+
+def _shown_key(user_id: str) -> str:
+    return f"shown:{user_id}"
+
+
+def _queue_shown(pipe: Pipeline, user_id: str, items: Dict[str, float]) -> None:
+    key = _shown_key(user_id)
+    pipe.zadd(key, items)
+    pipe.zremrangebyrank(key, 0, -(settings.RECENTLY_SHOWN_SIZE + 1))
+    pipe.expire(key, settings.RECENTLY_SHOWN_TTL_HOURS * 3600)
+
+
+async def record_shown(redis_client: Redis, user_id: uuid.UUID, product_ids: Sequence[uuid.UUID]) -> None:
+    """Marks products as just shown to the user, without waiting for the client's impressions."""
+    if not product_ids:
+        return
+    now = time.time()
+    pipe = redis_client.pipeline()
+    _queue_shown(pipe, str(user_id), {str(product_id): now for product_id in product_ids})
+    await pipe.execute()
+
+
+async def filter_not_shown(
+        redis_client: Redis, user_id: uuid.UUID, product_ids: Sequence[uuid.UUID],
+) -> List[uuid.UUID]:
+    """Drops the products in the user's recently-shown set, preserving order."""
+    if not product_ids:
+        return []
+    scores = await redis_client.zmscore(_shown_key(str(user_id)), [str(product_id) for product_id in product_ids])
+    return [product_id for product_id, score in zip(product_ids, scores) if score is None]
+
+
+async def append(redis_client: Redis, user_id: uuid.UUID, product_ids: Sequence[uuid.UUID], source: str) -> None:
+    """Queues one batch of impressions. Never touches Postgres."""
+    await redis_client.xadd(
+        STREAM_KEY,
+        {
+            "user_id": str(user_id),
+            "product_ids": ",".join(str(product_id) for product_id in product_ids),
+            "source": source,
+            "ts": f"{time.time():.3f}",
+        },
+        maxlen=settings.IMPRESSION_STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+async def ensure_consumer_group(redis_client: Redis) -> None:
+    try:
+        await redis_client.xgroup_create(STREAM_KEY, CONSUMER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def apply_entries(redis_client: Redis, entries: List[Tuple[str, Dict[str, str]]]) -> Counter:
+    """
+    Updates the Redis-side state for a batch of stream entries and returns the impression
+    counts per (product_id, day) still to be flushed to Postgres.
+    """
+    counts: Counter = Counter()
+    shown: Dict[str, Dict[str, float]] = {}
+    pipe = redis_client.pipeline()
+    for _, fields in entries:
+        user_id = fields["user_id"]
+        ts = float(fields["ts"])
+        day = datetime.fromtimestamp(ts, timezone.utc).date()
+        product_ids = [product_id for product_id in fields["product_ids"].split(",") if product_id]
+        for product_id in product_ids:
+            counts[(product_id, day)] += 1
+            viewers_key = _viewers_key(product_id, day)
+            pipe.pfadd(viewers_key, user_id)
+            pipe.expire(viewers_key, VIEWERS_TTL_SECONDS)
+        shown.setdefault(user_id, {}).update({product_id: ts for product_id in product_ids})
+
+    for user_id, items in shown.items():
+        _queue_shown(pipe, user_id, items)
+    await pipe.execute()
+
+    for user_id, items in shown.items():
+        await seen_filter.add(redis_client, uuid.UUID(user_id), [uuid.UUID(product_id) for product_id in items])
+    return counts
+
+
+async def count_unique_viewers(redis_client: Redis, keys: Sequence[Tuple[str, date]]) -> List[int]:
+    """HyperLogLog estimates of unique viewers for each (product_id, day)."""
+    pipe = redis_client.pipeline()
+    for product_id, day in keys:
+        pipe.pfcount(_viewers_key(product_id, day))
+    return await pipe.execute()
+
@@ -0,0 +1,201 @@
+# File: app/services/interaction_buffer.py
+
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import asyncpg
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from app.core.config import settings
+from app.models.interaction import InteractionType
+
+# Write-behind mode for likes/dislikes (INTERACTION_WRITE_BEHIND). The request path appends
+# each write to a Redis stream and records it in a per-user pending hash, in one MULTI, and
+# returns without touching Postgres. The interactions worker reads the stream through a
+# consumer group, keeps only the last write per (user_id, product_id), and periodically
+# COPYs the result into a staging table and merges it into product_interactions in one
+# transaction before acknowledging the entries (at-least-once; replaying a merge is harmless
+# because it only sets final states). The pending hash gives the user read-your-writes until
+# the flush, after which an entry is removed unless a newer write replaced it meanwhile.
+#
+# A single consumer must run: writes of one user are then applied in stream order, even when
+# the worker restarts and replays its unacknowledged entries first.
+
+STREAM_KEY = "interactions:pending"
+CONSUMER_GROUP = "interactions-writer"
+CONSUMER_NAME = "writer"
+# Marks a buffered delete in the stream and the pending hash
+DELETED = ""
+
+# Removes flushed pending entries unless a newer write replaced them meanwhile
+_CLEAR_PENDING = """
+for i = 1, #ARGV, 2 do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return 0
+"""
+
+
+class BufferedWrite(NamedTuple):
+    # None for a delete
+    interaction_type: Optional[InteractionType]
+    at: float
+    # Stored in the pending hash; identifies this exact write
+    token: str
+
+
+class MergedChange(NamedTuple):
+    user_id: uuid.UUID
+    product_id: uuid.UUID
+    # None when the interaction was deleted
+    interaction_type: Optional[InteractionType]
+    created_at: Optional[datetime]
+    previous_type: Optional[InteractionType]
+    previous_at: Optional[datetime]
+
+
+def _pending_key(user_id: uuid.UUID) -> str:
+    return f"ibuf:{user_id}"
+
+
+def _parse_value(value: str) -> Tuple[Optional[InteractionType], float]:
+    type_name, _, at = value.partition("|")
+    return (InteractionType[type_name] if type_name else None), float(at)
+
+
+async def append(
+        redis_client: Redis, user_id: uuid.UUID, writes: Sequence[Tuple[uuid.UUID, Optional[InteractionType]]],
+) -> None:
+    """Queues (product_id, interaction_type or None to delete) writes of one user. Never touches Postgres."""
+    at = f"{time.time():.6f}"
+    pending_key = _pending_key(user_id)
+    pipe = redis_client.pipeline(transaction=True)
+    for product_id, interaction_type in writes:
+        type_name = interaction_type.name if interaction_type else DELETED
+        # No MAXLEN: trimming would drop writes that were never flushed. The worker trims after acknowledging.
+        pipe.xadd(STREAM_KEY, {"user_id": str(user_id), "product_id": str(product_id), "type": type_name, "at": at})
+        pipe.hset(pending_key, str(product_id), f"{type_name}|{at}")
+    pipe.expire(pending_key, settings.INTERACTION_PENDING_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def get_pending(
+        redis_client: Redis, user_id: uuid.UUID,
+) -> Dict[uuid.UUID, Tuple[Optional[InteractionType], float]]:
+    """The user's writes that may not be in Postgres yet: product_id -> (type or None if deleted, time)."""
+    pending = await redis_client.hgetall(_pending_key(user_id))
+    return {uuid.UUID(product_id): _parse_value(value) for product_id, value in pending.items()}
+
+
+async def ensure_consumer_group(redis_client: Redis) -> None:
+    try:
+        await redis_client.xgroup_create(STREAM_KEY, CONSUMER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def coalesce(entries: List[Tuple[str, Dict[str, str]]], into: Dict[Tuple[uuid.UUID, uuid.UUID], BufferedWrite]) -> None:
+    """Folds stream entries into the last write per (user_id, product_id); entries must be in stream order."""
+    for _, fields in entries:
+        type_name = fields["type"]
+        into[(uuid.UUID(fields["user_id"]), uuid.UUID(fields["product_id"]))] = BufferedWrite(
+            interaction_type=InteractionType[type_name] if type_name else None,
+            at=float(fields["at"]),
+            token=f"{type_name}|{fields['at']}",
+        )
+
+
+STAGING_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS stg_interactions (
+    user_id uuid NOT NULL,
+    product_id uuid NOT NULL,
+    interaction_type text,
+    created_at timestamptz NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+# One statement, so `previous` is the state before the merge. Staged keys are unique, so a
+# key is either deleted or upserted. Writes for products that no longer exist are dropped.
+# A changed type restarts created_at, as in interaction_crud.upsert_interactions.
+MERGE_STAGED = """
+WITH previous AS (
+    SELECT pi.user_id, pi.product_id, pi.interaction_type, pi.created_at
+    FROM product_interactions pi
+    JOIN stg_interactions s ON s.user_id = pi.user_id AND s.product_id = pi.product_id
+),
+deleted AS (
+    DELETE FROM product_interactions pi USING stg_interactions s
+    WHERE s.interaction_type IS NULL AND pi.user_id = s.user_id AND pi.product_id = s.product_id
+    RETURNING pi.user_id, pi.product_id
+),
+upserted AS (
+    INSERT INTO product_interactions AS pi (user_id, product_id, interaction_type, created_at)
+    SELECT s.user_id, s.product_id, s.interaction_type::interactiontype, s.created_at
+    FROM stg_interactions s JOIN products p ON p.id = s.product_id
+    WHERE s.interaction_type IS NOT NULL
+    ON CONFLICT (user_id, product_id) DO UPDATE
+    SET interaction_type = EXCLUDED.interaction_type, created_at = EXCLUDED.created_at
+    WHERE pi.interaction_type <> EXCLUDED.interaction_type
+    RETURNING pi.user_id, pi.product_id, pi.interaction_type, pi.created_at
+)
+SELECT u.user_id, u.product_id, u.interaction_type::text AS interaction_type, u.created_at,
+       pr.interaction_type::text AS previous_type, pr.created_at AS previous_at
+FROM upserted u
+LEFT JOIN previous pr ON pr.user_id = u.user_id AND pr.product_id = u.product_id
+UNION ALL
+SELECT d.user_id, d.product_id, NULL, NULL, pr.interaction_type::text, pr.created_at
+FROM deleted d
+JOIN previous pr ON pr.user_id = d.user_id AND pr.product_id = d.product_id
+"""
+
+
+async def merge(
+        conn: asyncpg.Connection, writes: Dict[Tuple[uuid.UUID, uuid.UUID], BufferedWrite],
+) -> List[MergedChange]:
+    """Applies coalesced writes to product_interactions in one transaction; returns what actually changed."""
+    records = [
+        (user_id, product_id, write.interaction_type.name if write.interaction_type else None,
+         datetime.fromtimestamp(write.at, timezone.utc))
+        for (user_id, product_id), write in writes.items()
+    ]
+    async with conn.transaction():
+        await conn.execute(STAGING_DDL)
+        await conn.copy_records_to_table("stg_interactions", records=records)
+        rows = await conn.fetch(MERGE_STAGED)
+    return [
+        MergedChange(
+            user_id=row["user_id"],
+            product_id=row["product_id"],
+            interaction_type=InteractionType[row["interaction_type"]] if row["interaction_type"] else None,
+            created_at=row["created_at"],
+            previous_type=InteractionType[row["previous_type"]] if row["previous_type"] else None,
+            previous_at=row["previous_at"],
+        )
+        for row in rows
+    ]
+
+
+async def acknowledge(redis_client: Redis, entry_ids: List[str]) -> None:
+    """Acknowledges flushed entries and trims everything before the oldest entry still pending."""
+    await redis_client.xack(STREAM_KEY, CONSUMER_GROUP, *entry_ids)
+    summary = await redis_client.xpending(STREAM_KEY, CONSUMER_GROUP)
+    oldest = summary["min"] if summary["pending"] else entry_ids[-1]
+    await redis_client.xtrim(STREAM_KEY, minid=oldest)
+
+
+async def clear_pending(redis_client: Redis, writes: Dict[Tuple[uuid.UUID, uuid.UUID], BufferedWrite]) -> None:
+    """Drops flushed writes from the pending hashes; newer writes to the same products are kept."""
+    by_user: Dict[uuid.UUID, List[str]] = {}
+    for (user_id, product_id), write in writes.items():
+        by_user.setdefault(user_id, []).extend((str(product_id), write.token))
+    clear = redis_client.register_script(_CLEAR_PENDING)
+    pipe = redis_client.pipeline(transaction=False)
+    for user_id, args in by_user.items():
+        await clear(keys=[_pending_key(user_id)], args=args, client=pipe)
+    await pipe.execute()
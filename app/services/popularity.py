@@ -0,0 +1,86 @@
+# File: app/services/popularity.py
+
+import math
+import time
+import uuid
+from typing import Iterable, List
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from app.core.config import settings
+
+# Events increment per-product counters in one sorted set per time bucket.
+# A periodic job folds the recent buckets into the "trending" sorted set, weighting
+# each bucket by exp(-ln 2 * age / half_life), and the trending feed pages straight
+# from that set.
+
+VIEW = "view"
+LIKE = "like"
+FAVORITE = "favorite"
+EVENT_WEIGHTS = {VIEW: 1.0, LIKE: 3.0, FAVORITE: 5.0}
+
+TRENDING_KEY = "trending"
+
+
+def _bucket(ts: float) -> int:
+    return int(ts // settings.TRENDING_BUCKET_SECONDS)
+
+
+def _bucket_key(bucket: int) -> str:
+    return f"pop:{bucket}"
+
+
+def queue(pipe: Pipeline, product_ids: Iterable[uuid.UUID], event: str) -> None:
+    """Queues the same event for several products on a pipeline the caller executes."""
+    key = _bucket_key(_bucket(time.time()))
+    queued = False
+    for product_id in product_ids:
+        pipe.zincrby(key, EVENT_WEIGHTS[event], str(product_id))
+        queued = True
+    if queued:
+        pipe.expire(key, settings.TRENDING_BUCKET_SECONDS * (settings.TRENDING_WINDOW_BUCKETS + 1))
+
+
+async def record(redis_client: Redis, product_id: uuid.UUID, event: str) -> None:
+    """Counts a view, like or favorite towards the product's popularity in the current bucket."""
+    pipe = redis_client.pipeline()
+    queue(pipe, [product_id], event)
+    await pipe.execute()
+
+
+async def recompute_trending(redis_client: Redis) -> int:
+    """
+    Rebuilds the trending set from the last TRENDING_WINDOW_BUCKETS buckets and swaps it in
+    atomically. Returns the number of trending products.
+    """
+    now = time.time()
+    current = _bucket(now)
+    half_life_seconds = settings.TRENDING_HALF_LIFE_HOURS * 3600
+
+    weights = {}
+    for age in range(settings.TRENDING_WINDOW_BUCKETS):
+        bucket = current - age
+        # Age measured from the middle of the bucket
+        bucket_age = now - (bucket + 0.5) * settings.TRENDING_BUCKET_SECONDS
+        weights[_bucket_key(bucket)] = math.exp(-math.log(2) * max(bucket_age, 0.0) / half_life_seconds)
+
+    staging_key = f"{TRENDING_KEY}:staging"
+    pipe = redis_client.pipeline()
+    pipe.zunionstore(staging_key, weights, aggregate="SUM")
+    # Keep only the top TRENDING_MAX_ITEMS products
+    pipe.zremrangebyrank(staging_key, 0, -(settings.TRENDING_MAX_ITEMS + 1))
+    pipe.zcard(staging_key)
+    count = (await pipe.execute())[-1]
+
+    if count:
+        await redis_client.rename(staging_key, TRENDING_KEY)
+    else:
+        await redis_client.delete(TRENDING_KEY)
+    return count
+
+
+async def get_trending_ids(redis_client: Redis, offset: int, limit: int) -> List[uuid.UUID]:
+    """Returns a page of the trending feed, most popular first."""
+    raw_ids = await redis_client.zrevrange(TRENDING_KEY, offset, offset + limit - 1)
+    return [uuid.UUID(product_id) for product_id in raw_ids]
@@ -0,0 +1,52 @@
+# File: app/services/product_cards.py
+
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Sequence
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import product as product_crud
+from app.schemas.product import VIEWER_FLAGS, ProductFeedItemSchema
+
+# Feed-ready product cards (the ProductFeedItemSchema payload) cached as JSON strings,
+# so feeds that already know their product ids can be served without touching Postgres.
+
+
+def _key(product_id: uuid.UUID) -> str:
+    return f"product_card:{product_id}"
+
+
+async def get_cards(redis_client: Redis, db: AsyncSession, product_ids: Sequence[uuid.UUID]) -> List[Dict[str, Any]]:
+    """
+    Returns cards for the given ids in order, skipping products that no longer exist.
+    Cache misses are loaded with one batched query and written back.
+    """
+    if not product_ids:
+        return []
+
+    cached = await redis_client.mget([_key(product_id) for product_id in product_ids])
+    cards = {product_id: json.loads(raw) for product_id, raw in zip(product_ids, cached) if raw}
+
+    missing = [product_id for product_id in product_ids if product_id not in cards]
+    if missing:
+        products = await product_crud.get_products_by_ids(db, missing)
+        pipe = redis_client.pipeline()
+        for product in products:
+            card = ProductFeedItemSchema.model_validate(product, from_attributes=True).model_dump(
+                mode="json", exclude=VIEWER_FLAGS
+            )
+            cards[product.id] = card
+            pipe.set(_key(product.id), json.dumps(card), ex=settings.PRODUCT_CARD_TTL_SECONDS)
+        await pipe.execute()
+
+    return [cards[product_id] for product_id in product_ids if product_id in cards]
+
+
+async def invalidate(redis_client: Redis, product_ids: Iterable[uuid.UUID]) -> None:
+    """Drops cached cards so the next read reloads them from the database."""
+    keys = [_key(product_id) for product_id in product_ids]
+    if keys:
+        await redis_client.delete(*keys)
@@ -0,0 +1,62 @@
+# File: app/services/product_search.py
+
+import re
+import uuid
+from typing import List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud import product as product_crud
+
+# Ranked full-text search over name, brand and attribute values. The last word of the query
+# is matched as a prefix so results show up while typing. When the full-text query finds
+# nothing, the search falls back to trigram word similarity on names to absorb typos.
+# Both modes page with a keyset cursor on (score, id), which stays fast on deep pages.
+
+FULL_TEXT = "fts"
+FUZZY = "trgm"
+MAX_TERMS = 8
+
+
+def build_tsquery(text: str) -> Optional[str]:
+    """'red nik' -> 'red & nik:*'. Only word characters survive, so the result is always valid tsquery syntax."""
+    terms = re.findall(r"\w+", text.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+
+async def search(
+        db: AsyncSession,
+        text: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+) -> Tuple[List[uuid.UUID], Optional[str]]:
+    """
+    Returns one page of matching product ids and the cursor of the next page (None when exhausted).
+    Raises ValueError for a malformed cursor.
+    """
+    mode, after = FULL_TEXT, None
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 3 or values[0] not in (FULL_TEXT, FUZZY):
+            raise ValueError("Invalid cursor")
+        try:
+            mode, after = values[0], (float(values[1]), uuid.UUID(str(values[2])))
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
+    rows = []
+    tsquery = build_tsquery(text)
+    if mode == FULL_TEXT and tsquery:
+        rows = await product_crud.search_product_ids(db, tsquery, limit, after)
+    if mode == FUZZY or (not rows and after is None):
+        mode = FUZZY
+        rows = await product_crud.search_product_ids_fuzzy(db, text.strip(), limit, after)
+
+    next_cursor = None
+    if len(rows) == limit:
+        last_id, last_score = rows[-1]
+        next_cursor = encode_cursor([mode, last_score, str(last_id)])
+    return [product_id for product_id, _ in rows], next_cursor
@@ -0,0 +1,85 @@
+# File: app/services/seen_filter.py
+
+import hashlib
+import uuid
+from typing import Iterable, List, Sequence
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import product as product_crud
+
+# A per-user Bloom filter stored as a plain Redis bitmap (no Redis modules required).
+# Its size is fixed, so exclusion cost does not grow with the user's history.
+# False positives only hide a few unseen products; seen products are never re-served.
+# Items cannot be removed, so un-liking a product does not make it eligible again.
+#
+# The bit right after the filter is a sentinel meaning "seeded from the database".
+
+
+def _key(user_id: uuid.UUID) -> str:
+    return f"seen:{user_id}"
+
+
+def _positions(product_id: uuid.UUID) -> List[int]:
+    """Double hashing (Kirsch-Mitzenmacher): k positions derived from one 128-bit digest."""
+    digest = hashlib.blake2b(product_id.bytes, digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    bits = settings.SEEN_FILTER_BITS
+    return [(h1 + i * h2) % bits for i in range(settings.SEEN_FILTER_HASHES)]
+
+
+async def add(redis_client: Redis, user_id: uuid.UUID, product_ids: Iterable[uuid.UUID]) -> None:
+    """Marks products as seen by the user."""
+    args: List = []
+    for product_id in product_ids:
+        for position in _positions(product_id):
+            args.extend(("SET", "u1", position, 1))
+    if not args:
+        return
+    key = _key(user_id)
+    pipe = redis_client.pipeline()
+    pipe.execute_command("BITFIELD", key, *args)
+    pipe.expire(key, settings.SEEN_FILTER_TTL_DAYS * 86400)
+    await pipe.execute()
+
+
+async def _seed(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID) -> None:
+    """One-time load of the user's history; bits are OR-ed in so concurrent adds are kept."""
+    await add(redis_client, user_id, await product_crud.get_seen_product_ids(db, user_id))
+    key = _key(user_id)
+    pipe = redis_client.pipeline()
+    pipe.setbit(key, settings.SEEN_FILTER_BITS, 1)
+    pipe.expire(key, settings.SEEN_FILTER_TTL_DAYS * 86400)
+    await pipe.execute()
+
+
+async def filter_unseen(
+        redis_client: Redis,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        product_ids: Sequence[uuid.UUID],
+) -> List[uuid.UUID]:
+    """
+    Returns the product ids the user has (probably) not seen yet, preserving order.
+    Membership for the whole candidate list is checked with a single BITFIELD call.
+    """
+    key = _key(user_id)
+    if not await redis_client.getbit(key, settings.SEEN_FILTER_BITS):
+        await _seed(redis_client, db, user_id)
+    if not product_ids:
+        return []
+
+    k = settings.SEEN_FILTER_HASHES
+    args: List = []
+    for product_id in product_ids:
+        for position in _positions(product_id):
+            args.extend(("GET", "u1", position))
+    bits = await redis_client.execute_command("BITFIELD", key, *args)
+
+    return [
+        product_id for index, product_id in enumerate(product_ids)
+        if not all(bits[index * k:(index + 1) * k])
+    ]
@@ -0,0 +1,196 @@
+# File: app/services/taste_profile.py
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import product as product_crud
+
+logger = logging.getLogger(__name__)
+
+# Signal weights. Dislikes carry no weight, matching the original feed which only
+# learned from liked and saved products.
+LIKE_WEIGHT = 1.0
+FAVORITE_WEIGHT = 2.0
+
+# Forward decay: every increment is scaled by 2 ** ((t - LANDMARK) / half_life), so newer
+# signals outweigh older ones without ever rewriting the stored counters.
+# Only the relative order of counters inside one profile matters.
+LANDMARK = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+SEEDED_FIELD = "v"
+BRAND_PREFIX = "b:"
+CATEGORY_PREFIX = "c:"
+
+
+@dataclass
+class TasteProfile:
+    brand_ids: List[int] = field(default_factory=list)
+    category_ids: List[int] = field(default_factory=list)
+
+
+def _key(user_id: uuid.UUID) -> str:
+    return f"taste:{user_id}"
+
+
+def _fields(brand_id: Optional[int], category_ids: Sequence[int]) -> List[str]:
+    fields = [f"{CATEGORY_PREFIX}{category_id}" for category_id in category_ids]
+    if brand_id:
+        fields.append(f"{BRAND_PREFIX}{brand_id}")
+    return fields
+
+
+def _decay_factor(at: Optional[datetime] = None) -> float:
+    at = at or datetime.now(timezone.utc)
+    half_life_seconds = settings.TASTE_PROFILE_HALF_LIFE_DAYS * 86400
+    return 2 ** ((at - LANDMARK).total_seconds() / half_life_seconds)
+
+
+async def apply_signal(
+        redis_client: Redis,
+        user_id: uuid.UUID,
+        brand_id: Optional[int],
+        category_ids: Sequence[int],
+        weight: float,
+        at: Optional[datetime] = None,
+) -> None:
+    """
+    Adds (or, with a negative weight, removes) a weighted signal to the user's brand and
+    category counters. Removals should pass the time the signal was originally recorded.
+    Counters that drop to zero are deleted.
+    """
+    key = _key(user_id)
+    fields = _fields(brand_id, category_ids)
+    if not fields:
+        return
+
+    amount = weight * _decay_factor(at)
+    pipe = redis_client.pipeline()
+    for name in fields:
+        pipe.hincrbyfloat(key, name, amount)
+    pipe.expire(key, settings.TASTE_PROFILE_TTL_DAYS * 86400)
+    results = await pipe.execute()
+
+    if weight < 0:
+        exhausted = [name for name, value in zip(fields, results) if float(value) <= abs(amount) * 1e-6]
+        if exhausted:
+            await redis_client.hdel(key, *exhausted)
+
+
+async def record_product_signal(
+        redis_client: Redis,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        product_id: uuid.UUID,
+        weight: float,
+        at: Optional[datetime] = None,
+) -> None:
+    """Looks up the product's brand and categories and applies the signal to the profile."""
+    features = await product_crud.get_product_features(db, product_id)
+    if features is None:
+        return
+    brand_id, category_ids = features
+    await apply_signal(redis_client, user_id, brand_id, category_ids, weight, at)
+
+
+async def record_product_signals(
+        redis_client: Redis,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        signals: Sequence[Tuple[uuid.UUID, float, Optional[datetime]]],
+        pipe: Optional[Pipeline] = None,
+) -> None:
+    """
+    Batch form of record_product_signal for (product_id, weight, at) signals: one query for
+    the products' features and one round trip for all counters. Commands already queued on
+    `pipe` are sent in the same round trip.
+    """
+    features = await product_crud.get_products_features(db, [product_id for product_id, _, _ in signals])
+    amounts: Dict[str, float] = {}
+    for product_id, weight, at in signals:
+        if product_id not in features:
+            continue
+        amount = weight * _decay_factor(at)
+        for name in _fields(*features[product_id]):
+            amounts[name] = amounts.get(name, 0.0) + amount
+    amounts = {name: amount for name, amount in amounts.items() if amount}
+
+    pipe = pipe if pipe is not None else redis_client.pipeline()
+    start = len(pipe)
+    key = _key(user_id)
+    for name, amount in amounts.items():
+        pipe.hincrbyfloat(key, name, amount)
+    if amounts:
+        pipe.expire(key, settings.TASTE_PROFILE_TTL_DAYS * 86400)
+    if not len(pipe):
+        return
+    results = await pipe.execute()
+
+    exhausted = [
+        name for (name, amount), value in zip(amounts.items(), results[start:])
+        if amount < 0 and float(value) <= abs(amount) * 1e-6
+    ]
+    if exhausted:
+        await redis_client.hdel(key, *exhausted)
+
+
+async def rebuild(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID) -> Dict[str, float]:
+    """
+    Seeds the profile from the user's full history. This is the only place that scans
+    liked and saved products; afterwards the profile is maintained incrementally.
+    """
+    # Each like and pin is weighted by its own created_at, as the incremental updates are
+    liked_brands, liked_categories, saved_brands, saved_categories = await product_crud.get_taste_weights(
+        db, user_id, LANDMARK, settings.TASTE_PROFILE_HALF_LIFE_DAYS * 86400
+    )
+
+    counters: Dict[str, float] = {SEEDED_FIELD: 1}
+    for prefix, liked, saved in (
+            (BRAND_PREFIX, liked_brands, saved_brands),
+            (CATEGORY_PREFIX, liked_categories, saved_categories),
+    ):
+        for item_id in set(liked) | set(saved):
+            score = liked.get(item_id, 0.0) * LIKE_WEIGHT + saved.get(item_id, 0.0) * FAVORITE_WEIGHT
+            counters[f"{prefix}{item_id}"] = score
+
+    key = _key(user_id)
+    pipe = redis_client.pipeline()
+    pipe.delete(key)
+    pipe.hset(key, mapping=counters)
+    pipe.expire(key, settings.TASTE_PROFILE_TTL_DAYS * 86400)
+    await pipe.execute()
+    return counters
+
+
+def _top(counters: Dict[str, float], prefix: str, limit: int) -> List[int]:
+    scored = [(float(value), int(name[len(prefix):])) for name, value in counters.items() if name.startswith(prefix)]
+    scored.sort(reverse=True)
+    return [item_id for _, item_id in scored[:limit]]
+
+
+async def get_taste_profile(redis_client: Redis, db: AsyncSession, user_id: uuid.UUID) -> Optional[TasteProfile]:
+    """
+    Returns the user's top brands and categories, seeding the profile on first use.
+    Returns None if Redis is unavailable so callers can fall back to the database.
+    """
+    try:
+        counters = await redis_client.hgetall(_key(user_id))
+        if SEEDED_FIELD not in counters:
+            counters = await rebuild(redis_client, db, user_id)
+    except RedisError as e:
+        logger.warning(f"Taste profile unavailable for user {user_id}: {e}")
+        return None
+
+    limit = settings.TASTE_PROFILE_TOP_N
+    return TasteProfile(
+        brand_ids=_top(counters, BRAND_PREFIX, limit),
+        category_ids=_top(counters, CATEGORY_PREFIX, limit),
+    )
@@ -0,0 +1,63 @@
+# File: app/services/viewer_state.py
+
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import interaction as interaction_crud
+from app.models.interaction import InteractionType
+from app.schemas.product import ProductFeedItemSchema
+from app.services import interaction_buffer
+
+logger = logging.getLogger(__name__)
+
+# liked / disliked / favorited flags on a page of feed items for the signed-in viewer,
+# resolved with one query for the whole page. Product cards stay viewer-independent (and
+# cacheable); the flags are only added to the response.
+
+FAVORITE = "FAVORITE"
+
+
+async def with_viewer_flags(
+        redis_client: Redis, db: AsyncSession, user_id: Optional[uuid.UUID], items: Sequence[Any],
+) -> List[Any]:
+    """
+    Returns the items (product cards or Product rows) as feed items with the viewer's flags set.
+    Guests get the items back unchanged, so their flags stay unset.
+    """
+    if user_id is None or not items:
+        return list(items)
+
+    page = [ProductFeedItemSchema.model_validate(item, from_attributes=True) for item in items]
+    interactions: Dict[uuid.UUID, str] = {}
+    favorited: Set[uuid.UUID] = set()
+    for row in await interaction_crud.get_viewer_states(db, user_id, [item.id for item in page]):
+        if row.state == FAVORITE:
+            favorited.add(row.product_id)
+        else:
+            interactions[row.product_id] = row.state
+
+    if settings.INTERACTION_WRITE_BEHIND:
+        # Likes/dislikes not merged into Postgres yet win over what is there
+        try:
+            pending = await interaction_buffer.get_pending(redis_client, user_id)
+        except RedisError as e:
+            logger.warning(f"Could not read pending interactions of user {user_id}: {e}")
+            pending = {}
+        for product_id, (interaction_type, _) in pending.items():
+            if interaction_type is None:
+                interactions.pop(product_id, None)
+            else:
+                interactions[product_id] = interaction_type.name
+
+    for item in page:
+        state = interactions.get(item.id)
+        item.liked = state == InteractionType.LIKE.name
+        item.disliked = state == InteractionType.DISLIKE.name
+        item.favorited = item.id in favorited
+    return page
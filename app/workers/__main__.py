@@ -0,0 +1,40 @@
+# File: app/workers/__main__.py
+# Usage: python -m app.workers <worker-name>
+
+import argparse
+import asyncio
+import logging
+
+from app.core.logging_config import configure_logging
+from app.workers import (
+    catalog_snapshot, catalog_sync, feed_queue, impressions, interactions, price_alerts, seller_stats, tombstones,
+    trending,
+)
+
+WORKERS = {
+    "catalog-snapshot": catalog_snapshot.run,
+    "catalog-sync": catalog_sync.run,
+    "feed-queue": feed_queue.run,
+    "impressions": impressions.run,
+    "interactions": interactions.run,
+    "price-alerts": price_alerts.run,
+    "seller-stats": seller_stats.run,
+    "tombstones": tombstones.run,
+    "trending": trending.run,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a background worker.")
+    parser.add_argument("worker", choices=sorted(WORKERS))
+    args = parser.parse_args()
+
+    configure_logging()
+    try:
+        asyncio.run(WORKERS[args.worker]())
+    except KeyboardInterrupt:
+        logging.getLogger(__name__).info(f"Worker {args.worker} stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# File: app/workers/base.py
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(name: str, interval_seconds: float, job: Callable[[], Awaitable[None]]) -> None:
+    """
+    Runs job forever, at most once per interval. A failing run is logged and retried
+    on the next tick instead of killing the worker.
+    """
+    logger.info(f"Worker {name} started (interval {interval_seconds}s).")
+    while True:
+        started = time.monotonic()
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Worker {name} run failed: {e}")
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(max(0.0, interval_seconds - elapsed))
@@ -0,0 +1,51 @@
+# File: app/workers/catalog_snapshot.py
+
+import logging
+import time
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.db.redis_session import redis_pool
+from app.db.session import async_session
+from app.services import catalog_snapshot
+from app.services.catalog_changes import SNAPSHOT_DIRTY_KEY
+from app.workers.base import run_periodically
+
+logger = logging.getLogger(__name__)
+
+_published_at = None
+
+
+async def publish_snapshot() -> None:
+    """Rebuilds the catalog snapshot and atomically swaps it in for all app workers."""
+    started = time.monotonic()
+    async with async_session() as db:
+        count = await catalog_snapshot.build_snapshot(db)
+    logger.info(f"Published catalog snapshot with {count} products in {time.monotonic() - started:.1f}s.")
+
+
+async def publish_if_due() -> None:
+    """
+    Rebuilds every CATALOG_SNAPSHOT_INTERVAL_SECONDS, or on the next tick when catalog change
+    notifications flagged the snapshot as stale.
+    """
+    global _published_at
+    due = _published_at is None or time.monotonic() - _published_at >= settings.CATALOG_SNAPSHOT_INTERVAL_SECONDS
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    try:
+        # Cleared before building, so changes made during the build flag the next one
+        dirty = await redis_client.delete(SNAPSHOT_DIRTY_KEY)
+    except RedisError as e:
+        logger.warning(f"Could not read the catalog snapshot dirty flag: {e}")
+        dirty = 0
+    finally:
+        await redis_client.close()
+    if due or dirty:
+        await publish_snapshot()
+        _published_at = time.monotonic()
+
+
+async def run() -> None:
+    await run_periodically("catalog-snapshot", settings.CATALOG_SNAPSHOT_MIN_INTERVAL_SECONDS, publish_if_due)
@@ -0,0 +1,38 @@
+# File: app/workers/catalog_sync.py
+
+import logging
+import time
+
+import asyncpg
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.db.redis_session import redis_pool
+from app.db.session import get_asyncpg_dsn
+from app.ingest.sync import sync_catalog
+from app.workers.base import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+async def sync_once() -> None:
+    """Pulls the changes published by the upstream catalog since the last run."""
+    started = time.monotonic()
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    try:
+        stats = await sync_catalog(redis_client, conn)
+    finally:
+        await conn.close()
+        await redis_client.close()
+    if stats.pages:
+        logger.info(f"Catalog sync up to version {stats.since} in {time.monotonic() - started:.1f}s: "
+                    f"{stats.listed} listed, {stats.fetched} fetched, {stats.not_modified} not modified, "
+                    f"{stats.inserted} inserted, {stats.updated} updated, {stats.price_changes} price changes.")
+
+
+async def run() -> None:
+    if not settings.CATALOG_SYNC_SOURCE_URL or not settings.CATALOG_SYNC_SELLER_ID:
+        logger.error("CATALOG_SYNC_SOURCE_URL and CATALOG_SYNC_SELLER_ID must be set to run the catalog sync.")
+        return
+    await run_periodically("catalog-sync", settings.CATALOG_SYNC_INTERVAL_SECONDS, sync_once)
@@ -0,0 +1,38 @@
+# File: app/workers/feed_queue.py
+
+import asyncio
+import logging
+import uuid
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.db.redis_session import redis_pool
+from app.db.session import async_session
+from app.services import feed_queue
+from app.workers.base import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+async def refill_queues() -> None:
+    """Refills the feed queue of every recently active user below the low-water mark."""
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    semaphore = asyncio.Semaphore(settings.FEED_QUEUE_REFILL_CONCURRENCY)
+
+    async def _refill(user_id: uuid.UUID) -> int:
+        async with semaphore, async_session() as db:
+            return await feed_queue.refill(redis_client, db, user_id)
+
+    try:
+        user_ids = await feed_queue.get_users_needing_refill(redis_client)
+        if not user_ids:
+            return
+        pushed = await asyncio.gather(*(_refill(user_id) for user_id in user_ids))
+        logger.info(f"Refilled {sum(1 for count in pushed if count)} feed queues ({sum(pushed)} items).")
+    finally:
+        await redis_client.close()
+
+
+async def run() -> None:
+    await run_periodically("feed-queue", settings.FEED_QUEUE_REFILL_INTERVAL_SECONDS, refill_queues)
@@ -0,0 +1,87 @@
+# File: app/workers/impressions.py
+
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import Counter
+from typing import List
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.crud import impression as impression_crud
+from app.db.redis_session import redis_pool
+from app.db.session import async_session
+from app.services import impressions
+
+logger = logging.getLogger(__name__)
+
+FLUSH_CHUNK_SIZE = 5000
+
+
+async def flush(redis_client: redis.Redis, counts: Counter, entry_ids: List[str]) -> None:
+    """
+    Writes the pending aggregates to Postgres, then acknowledges the stream entries.
+    A crash before the ack makes the entries be redelivered (at-least-once): impression
+    counts may then be slightly over-counted, unique viewers are not.
+    """
+    if counts:
+        keys = list(counts)
+        viewers = await impressions.count_unique_viewers(redis_client, keys)
+        rows = [
+            (uuid.UUID(product_id), day, counts[(product_id, day)], unique_viewers)
+            for (product_id, day), unique_viewers in zip(keys, viewers)
+        ]
+        async with async_session() as db:
+            for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                await impression_crud.upsert_daily_stats(db, rows[start:start + FLUSH_CHUNK_SIZE])
+    if entry_ids:
+        await redis_client.xack(impressions.STREAM_KEY, impressions.CONSUMER_GROUP, *entry_ids)
+    logger.info(f"Flushed {len(counts)} impression aggregates ({len(entry_ids)} stream entries).")
+
+
+async def run() -> None:
+    """Consumes the impression stream until cancelled."""
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    await impressions.ensure_consumer_group(redis_client)
+
+    counts: Counter = Counter()
+    entry_ids: List[str] = []
+    last_flush = time.monotonic()
+    # Start with entries delivered to this consumer name but never acknowledged
+    stream_id = "0"
+    logger.info(f"Impression consumer {consumer} started.")
+    try:
+        while True:
+            response = await redis_client.xreadgroup(
+                impressions.CONSUMER_GROUP, consumer, {impressions.STREAM_KEY: stream_id},
+                count=settings.IMPRESSION_READ_COUNT, block=1000,
+            )
+            entries = response[0][1] if response else []
+            if stream_id != ">":
+                # Walk through our pending history, then switch to new entries
+                stream_id = entries[-1][0] if entries else ">"
+
+            if entries:
+                # Pending entries trimmed from the stream (MAXLEN) come back without fields.
+                # Nothing is left to count, so they are only acknowledged.
+                live = [(entry_id, fields) for entry_id, fields in entries if fields]
+                if len(live) < len(entries):
+                    logger.warning(f"Skipping {len(entries) - len(live)} trimmed impression entries.")
+                if live:
+                    counts.update(await impressions.apply_entries(redis_client, live))
+                entry_ids.extend(entry_id for entry_id, _ in entries)
+
+            if entry_ids and time.monotonic() - last_flush >= settings.IMPRESSION_FLUSH_INTERVAL_SECONDS:
+                try:
+                    await flush(redis_client, counts, entry_ids)
+                    counts, entry_ids = Counter(), []
+                except Exception as e:
+                    # Keep the aggregates and retry on the next interval
+                    logger.exception(f"Impression flush failed: {e}")
+                last_flush = time.monotonic()
+    finally:
+        await redis_client.close()
@@ -0,0 +1,104 @@
+# File: app/workers/interactions.py
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.db.redis_session import redis_pool
+from app.db.session import async_session, get_asyncpg_dsn
+from app.services import activity, interaction_buffer
+from app.services.interaction_buffer import BufferedWrite
+
+logger = logging.getLogger(__name__)
+
+
+async def run_hooks(redis_client: redis.Redis, changes: List[interaction_buffer.MergedChange]) -> None:
+    """Activity hooks for merged writes. They only maintain derived Redis state, so they run after the ack."""
+    recorded: Dict[uuid.UUID, List[interaction_buffer.MergedChange]] = {}
+    for change in changes:
+        recorded.setdefault(change.user_id, []).append(change)
+    async with async_session() as db:
+        for user_id, user_changes in recorded.items():
+            await activity.interactions_recorded(redis_client, db, user_id, user_changes)
+
+
+async def finish_flush(
+        redis_client: redis.Redis,
+        writes: Dict[Tuple[uuid.UUID, uuid.UUID], BufferedWrite],
+        entry_ids: List[str],
+        changes: List[interaction_buffer.MergedChange],
+) -> None:
+    """
+    Everything after a committed merge: acknowledges the stream entries, drops the writes from
+    the pending hashes and runs the hooks. A crash before the ack redelivers the entries and
+    the merge is applied again, which is harmless for the table.
+    """
+    await interaction_buffer.acknowledge(redis_client, entry_ids)
+    await interaction_buffer.clear_pending(redis_client, writes)
+    await run_hooks(redis_client, changes)
+    logger.info(f"Flushed {len(writes)} buffered interactions ({len(entry_ids)} stream entries, "
+                f"{len(changes)} changed).")
+
+
+async def run() -> None:
+    """Consumes the write-behind interaction stream until cancelled."""
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    await interaction_buffer.ensure_consumer_group(redis_client)
+    conn = None
+
+    writes: Dict[Tuple[uuid.UUID, uuid.UUID], BufferedWrite] = {}
+    entry_ids: List[str] = []
+    # Result of a merge whose ack or hooks failed. Merging again would report nothing as
+    # changed, so the retry starts from here instead.
+    changes: Optional[List[interaction_buffer.MergedChange]] = None
+    last_flush = retry_at = time.monotonic()
+    # Start with entries delivered before a restart but never acknowledged, so writes stay in order
+    stream_id = "0"
+    logger.info("Interaction writer started.")
+    try:
+        while True:
+            entries = []
+            if changes is None and len(entry_ids) < settings.INTERACTION_FLUSH_MAX_ENTRIES:
+                response = await redis_client.xreadgroup(
+                    interaction_buffer.CONSUMER_GROUP, interaction_buffer.CONSUMER_NAME,
+                    {interaction_buffer.STREAM_KEY: stream_id},
+                    count=settings.INTERACTION_READ_COUNT, block=200,
+                )
+                entries = response[0][1] if response else []
+                if stream_id != ">":
+                    stream_id = entries[-1][0] if entries else ">"
+            else:
+                # Backpressure: nothing more is read until the pending flush has gone through
+                await asyncio.sleep(max(retry_at - time.monotonic(), 0))
+
+            if entries:
+                interaction_buffer.coalesce(entries, writes)
+                entry_ids.extend(entry_id for entry_id, _ in entries)
+
+            now = time.monotonic()
+            due = now - last_flush >= settings.INTERACTION_FLUSH_INTERVAL_SECONDS
+            full = len(entry_ids) >= settings.INTERACTION_FLUSH_MAX_ENTRIES
+            if entry_ids and now >= retry_at and (due or full or changes is not None):
+                try:
+                    if changes is None and writes:
+                        if conn is None or conn.is_closed():
+                            conn = await asyncpg.connect(get_asyncpg_dsn())
+                        changes = await interaction_buffer.merge(conn, writes)
+                    await finish_flush(redis_client, writes, entry_ids, changes or [])
+                    writes, entry_ids, changes = {}, [], None
+                except Exception as e:
+                    # Keep the writes (and the merge result, if the merge went through) and retry
+                    # after an interval; acknowledging the same entries again is harmless
+                    logger.exception(f"Interaction flush failed: {e}")
+                    retry_at = now + settings.INTERACTION_FLUSH_INTERVAL_SECONDS
+                last_flush = now
+    finally:
+        if conn is not None:
+            await conn.close()
+        await redis_client.close()
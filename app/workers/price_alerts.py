@@ -0,0 +1,31 @@
+# File: app/workers/price_alerts.py
+
+import logging
+import time
+
+from app.core.config import settings
+from app.crud import notification as notification_crud
+from app.db.session import async_session
+from app.workers.base import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+async def fan_out() -> None:
+    """Hands every pending price change to the notification outbox, page by page."""
+    started = time.monotonic()
+    pages = pins = 0
+    async with async_session() as db:
+        while True:
+            read = await notification_crud.fan_out_price_change(db, settings.PRICE_ALERT_PAGE_SIZE)
+            if read is None:
+                break
+            pages += 1
+            pins += read
+    if pages:
+        logger.info(f"Fanned out price changes to {pins} pins in {pages} pages "
+                    f"({time.monotonic() - started:.1f}s).")
+
+
+async def run() -> None:
+    await run_periodically("price-alerts", settings.PRICE_ALERT_INTERVAL_SECONDS, fan_out)
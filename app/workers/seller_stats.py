@@ -0,0 +1,29 @@
+# File: app/workers/seller_stats.py
+
+import logging
+import time
+
+from app.core.config import settings
+from app.crud import analytics as analytics_crud
+from app.db.session import async_session
+from app.workers.base import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+async def rollup() -> None:
+    """Applies engagement events to the daily seller and product stats until caught up."""
+    started = time.monotonic()
+    total = 0
+    async with async_session() as db:
+        while True:
+            applied = await analytics_crud.rollup_engagement(db, settings.SELLER_STATS_ROLLUP_BATCH_SIZE)
+            if not applied:
+                break
+            total += applied
+    if total:
+        logger.info(f"Rolled up {total} engagement events in {time.monotonic() - started:.1f}s.")
+
+
+async def run() -> None:
+    await run_periodically("seller-stats", settings.SELLER_STATS_ROLLUP_INTERVAL_SECONDS, rollup)
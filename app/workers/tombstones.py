@@ -0,0 +1,24 @@
+# File: app/workers/tombstones.py
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.crud import product as product_crud
+from app.db.session import async_session
+from app.workers.base import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+async def prune_tombstones() -> None:
+    """Drops tombstones past the retention; clients with older cursors are told to resync."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.PRODUCT_TOMBSTONE_RETENTION_DAYS)
+    async with async_session() as db:
+        deleted = await product_crud.delete_tombstones_before(db, cutoff)
+    if deleted:
+        logger.info(f"Pruned {deleted} product tombstones older than {cutoff.isoformat()}.")
+
+
+async def run() -> None:
+    await run_periodically("tombstones", settings.PRODUCT_TOMBSTONE_PRUNE_INTERVAL_SECONDS, prune_tombstones)
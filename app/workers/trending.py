@@ -0,0 +1,26 @@
+# File: app/workers/trending.py
+
+import logging
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.db.redis_session import redis_pool
+from app.services import popularity
+from app.workers.base import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_trending() -> None:
+    """Recomputes the decayed trending scores from the popularity buckets."""
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    try:
+        count = await popularity.recompute_trending(redis_client)
+        logger.info(f"Trending feed rebuilt with {count} products.")
+    finally:
+        await redis_client.close()
+
+
+async def run() -> None:
+    await run_periodically("trending", settings.TRENDING_REFRESH_INTERVAL_SECONDS, refresh_trending)
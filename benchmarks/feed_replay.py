@@ -0,0 +1,303 @@
+# File: benchmarks/feed_replay.py
+"""
+Offline replay benchmark for personalized feed strategies.
+
+    # 1. Export the time-ordered event log from a seeded local database
+    python -m benchmarks.feed_replay export --out events.jsonl
+
+    # 2. Replay it: train on the first 80% of events, evaluate on the rest
+    python -m benchmarks.feed_replay run --events events.jsonl --report report.json
+
+The replay replaces product_interactions and collection_pins with the training events
+inside a single transaction and rolls it back at the end, so the database is left
+untouched. It must only ever be pointed at a local database, never production.
+Strategies that need Redis are skipped unless --redis-url is given; their per-user
+keys are deleted first so profiles are rebuilt from the training events only.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import redis.asyncio as redis
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import product as product_crud
+from app.db.session import async_session, engine
+from app.models import Collection, Product, ProductInteraction, User
+from app.models.collection import collection_pins_table
+from app.models.interaction import InteractionType
+from app.services import feed
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_KINDS = {"like", "favorite"}
+
+
+@dataclass
+class ReplayContext:
+    db: AsyncSession
+    redis_client: Optional[redis.Redis] = None
+
+
+Strategy = Callable[[ReplayContext, uuid.UUID, int], Awaitable[List[uuid.UUID]]]
+
+
+# --- Built-in strategies ---
+
+async def db_personalized(ctx: ReplayContext, user_id: uuid.UUID, k: int) -> List[uuid.UUID]:
+    """The original database-only feed."""
+    user = await ctx.db.get(User, user_id)
+    products = await product_crud.get_personalized_feed_for_user(ctx.db, user=user, limit=k)
+    return [product.id for product in products]
+
+
+async def cached_personalized(ctx: ReplayContext, user_id: uuid.UUID, k: int) -> List[uuid.UUID]:
+    """Taste profile + seen filter feed (requires Redis)."""
+    product_ids = await feed.get_personalized_feed_ids(ctx.db, ctx.redis_client, user_id, k)
+    if product_ids:
+        return product_ids
+    return [product.id for product in await product_crud.get_guest_feed_products(ctx.db, k)]
+
+
+async def guest(ctx: ReplayContext, user_id: uuid.UUID, k: int) -> List[uuid.UUID]:
+    """Newest products, identical for every user."""
+    return [product.id for product in await product_crud.get_guest_feed_products(ctx.db, k)]
+
+
+async def random_products(ctx: ReplayContext, user_id: uuid.UUID, k: int) -> List[uuid.UUID]:
+    """Uniformly random products; a lower bound for recall."""
+    return await product_crud.get_random_product_ids(ctx.db, k)
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "db-personalized": db_personalized,
+    "cached-personalized": cached_personalized,
+    "guest": guest,
+    "random": random_products,
+}
+REDIS_STRATEGIES = {"cached-personalized"}
+
+
+def load_strategy(name: str) -> Strategy:
+    """Resolves a built-in strategy name or a 'package.module:function' path."""
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module_name, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+# --- Export ---
+
+async def export_events(out_path: str) -> int:
+    """Writes every interaction and pin as one JSON event per line, ordered by time."""
+    interactions_stmt = select(
+        ProductInteraction.created_at, ProductInteraction.user_id, ProductInteraction.product_id,
+        ProductInteraction.interaction_type,
+    )
+    pins_stmt = (
+        select(
+            collection_pins_table.c.created_at, Collection.user_id, collection_pins_table.c.product_id,
+            collection_pins_table.c.collection_id,
+        )
+        .join(Collection, Collection.id == collection_pins_table.c.collection_id)
+    )
+    events = []
+    async with async_session() as db:
+        for ts, user_id, product_id, interaction_type in await db.execute(interactions_stmt):
+            events.append({"ts": ts.isoformat(timespec="microseconds"), "user_id": str(user_id),
+                           "product_id": str(product_id), "kind": interaction_type.value})
+        for ts, user_id, product_id, collection_id in await db.execute(pins_stmt):
+            events.append({"ts": ts.isoformat(timespec="microseconds"), "user_id": str(user_id),
+                           "product_id": str(product_id), "kind": "favorite",
+                           "collection_id": str(collection_id)})
+    events.sort(key=lambda event: event["ts"])
+
+    with open(out_path, "w", encoding="utf-8") as out:
+        for event in events:
+            out.write(json.dumps(event) + "\n")
+    return len(events)
+
+
+# --- Replay ---
+
+def load_events(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    events.sort(key=lambda event: event["ts"])
+    return events
+
+
+def temporal_split(events: List[dict], train_fraction: float):
+    """Splits at the timestamp of the train_fraction quantile; no event leaks backwards in time."""
+    if not events:
+        return [], []
+    cutoff = events[min(len(events) - 1, int(len(events) * train_fraction))]["ts"]
+    train = [event for event in events if event["ts"] < cutoff]
+    test = [event for event in events if event["ts"] >= cutoff]
+    return train, test
+
+
+async def seed_training_state(db: AsyncSession, train: List[dict]) -> None:
+    """Replaces interactions and pins with the training events (inside the replay transaction)."""
+    await db.execute(delete(ProductInteraction))
+    await db.execute(delete(collection_pins_table))
+
+    interactions = {}
+    pins = {}
+    for event in train:
+        if event["kind"] == "favorite":
+            pins[(event["collection_id"], event["product_id"])] = {
+                "collection_id": uuid.UUID(event["collection_id"]),
+                "product_id": uuid.UUID(event["product_id"]),
+                "created_at": datetime.fromisoformat(event["ts"]),
+            }
+        else:
+            # Later events for the same pair overwrite earlier ones, as the upsert does.
+            interactions[(event["user_id"], event["product_id"])] = {
+                "user_id": uuid.UUID(event["user_id"]),
+                "product_id": uuid.UUID(event["product_id"]),
+                "interaction_type": InteractionType(event["kind"]),
+                "created_at": datetime.fromisoformat(event["ts"]),
+            }
+    if interactions:
+        await db.execute(insert(ProductInteraction), list(interactions.values()))
+    if pins:
+        await db.execute(insert(collection_pins_table), list(pins.values()))
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def evaluate(
+        ctx: ReplayContext,
+        name: str,
+        strategy: Strategy,
+        test_positives: Dict[uuid.UUID, Set[uuid.UUID]],
+        k: int,
+        catalog_size: int,
+) -> dict:
+    recalls: List[float] = []
+    latencies_ms: List[float] = []
+    recommended: Set[uuid.UUID] = set()
+
+    for user_id, positives in test_positives.items():
+        started = time.perf_counter()
+        product_ids = (await strategy(ctx, user_id, k))[:k]
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+        recommended.update(product_ids)
+        recalls.append(len(positives.intersection(product_ids)) / len(positives))
+
+    return {
+        "strategy": name,
+        "users": len(recalls),
+        f"recall@{k}": statistics.fmean(recalls) if recalls else 0.0,
+        "coverage": len(recommended) / catalog_size if catalog_size else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 0.50),
+            "p99": percentile(latencies_ms, 0.99),
+            "mean": statistics.fmean(latencies_ms) if latencies_ms else 0.0,
+        },
+    }
+
+
+async def run_replay(args: argparse.Namespace) -> dict:
+    events = load_events(args.events)
+    train, test = temporal_split(events, args.train_fraction)
+
+    test_positives: Dict[uuid.UUID, Set[uuid.UUID]] = {}
+    for event in test:
+        if event["kind"] in POSITIVE_KINDS:
+            test_positives.setdefault(uuid.UUID(event["user_id"]), set()).add(uuid.UUID(event["product_id"]))
+    if args.max_users:
+        test_positives = dict(sorted(test_positives.items())[:args.max_users])
+
+    redis_client = redis.from_url(args.redis_url, decode_responses=True) if args.redis_url else None
+    results = []
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+            await seed_training_state(db, train)
+            catalog_size = await db.scalar(select(func.count()).select_from(Product))
+
+            if redis_client:
+                for prefix in ("taste", "seen", "feedq"):
+                    keys = [f"{prefix}:{user_id}" for user_id in test_positives]
+                    if keys:
+                        await redis_client.delete(*keys)
+            ctx = ReplayContext(db=db, redis_client=redis_client)
+
+            for name in args.strategy:
+                if name in REDIS_STRATEGIES and redis_client is None:
+                    logger.warning(f"Skipping {name}: it needs --redis-url.")
+                    continue
+                # Identical random sequence for every strategy
+                await db.execute(text("SELECT setseed(:seed)"), {"seed": args.seed})
+                logger.info(f"Evaluating {name} on {len(test_positives)} users...")
+                results.append(await evaluate(ctx, name, load_strategy(name), test_positives, args.k, catalog_size))
+        finally:
+            await transaction.rollback()
+            if redis_client:
+                await redis_client.close()
+
+    return {
+        "events": len(events),
+        "train_events": len(train),
+        "test_events": len(test),
+        "split_at": test[0]["ts"] if test else None,
+        "k": args.k,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline replay benchmark for feed strategies.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="Export interactions and pins as time-ordered JSONL.")
+    export_parser.add_argument("--out", required=True)
+
+    run_parser = sub.add_parser("run", help="Replay an export and score each strategy.")
+    run_parser.add_argument("--events", required=True)
+    run_parser.add_argument("--report", help="Write the JSON report here instead of stdout.")
+    run_parser.add_argument("--strategy", action="append",
+                            help="Built-in name or module:function; repeatable (default: all built-ins).")
+    run_parser.add_argument("--k", type=int, default=20)
+    run_parser.add_argument("--train-fraction", type=float, default=0.8)
+    run_parser.add_argument("--max-users", type=int, default=0)
+    run_parser.add_argument("--seed", type=float, default=0.42)
+    run_parser.add_argument("--redis-url", help="Scratch Redis for strategies that need it.")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.command == "export":
+        count = asyncio.run(export_events(args.out))
+        logger.info(f"Exported {count} events to {args.out}.")
+        return
+
+    args.strategy = args.strategy or list(STRATEGIES)
+    report = json.dumps(asyncio.run(run_replay(args)), indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# File: benchmarks/interaction_upsert.py
+"""
+Throughput benchmark for recording likes/dislikes.
+
+    python -m benchmarks.interaction_upsert --interactions 5000 --batch 100 --report interactions.json
+
+Compares three write paths on the same products, each with its own synthetic user:
+  orm     get + update or add, commit, refresh through the ORM, as the endpoint used to do
+  upsert  interaction_crud.upsert_interaction, one INSERT ... ON CONFLICT ... RETURNING
+  bulk    interaction_crud.upsert_interactions with --batch interactions per statement
+Every path runs twice: a pass of new interactions (inserts), then a pass flipping each
+one to the other type (updates). Every call commits, as the endpoints do, so the run gets
+a scratch schema built from the models (without the triggers and partitioning that the
+migrations add) and drops it at the end. It must only ever be pointed at a local database,
+never production.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+import uuid
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.crud import interaction as interaction_crud
+from app.db.session import DATABASE_URL, engine
+from app.models import Base
+from app.models.interaction import InteractionType, ProductInteraction
+from benchmarks.feed_replay import percentile
+
+logger = logging.getLogger(__name__)
+
+Interactions = Sequence[Tuple[uuid.UUID, InteractionType]]
+
+
+async def create_user(db: AsyncSession) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    await db.execute(text("INSERT INTO users (id, phone_number) VALUES (:id, :phone)"),
+                     {"id": user_id, "phone": f"bench-{user_id.hex[:12]}"})
+    return user_id
+
+
+async def create_products(db: AsyncSession, count: int) -> List[uuid.UUID]:
+    user_id, seller_id = await create_user(db), uuid.uuid4()
+    await db.execute(text("INSERT INTO sellers (id, user_id, is_verified) VALUES (:id, :user_id, false)"),
+                     {"id": seller_id, "user_id": user_id})
+    result = await db.execute(text(
+        """
+        INSERT INTO products (id, name, dg_variant_id, selling_price, seller_id, created_at, updated_at)
+        SELECT gen_random_uuid(), 'bench product ' || i, -i, 1000, :seller_id, now(), now()
+        FROM generate_series(1, :count) i
+        RETURNING id
+        """
+    ), {"seller_id": seller_id, "count": count})
+    return list(result.scalars().all())
+
+
+async def run_orm(db: AsyncSession, user_id: uuid.UUID, interactions: Interactions, _batch: int) -> List[float]:
+    latencies = []
+    for product_id, interaction_type in interactions:
+        started = time.perf_counter()
+        interaction = await interaction_crud.get_interaction(db, user_id=user_id, product_id=product_id)
+        if interaction is None:
+            interaction = ProductInteraction(user_id=user_id, product_id=product_id)
+        interaction.interaction_type = interaction_type
+        db.add(interaction)
+        await db.commit()
+        await db.refresh(interaction)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def run_upsert(db: AsyncSession, user_id: uuid.UUID, interactions: Interactions, _batch: int) -> List[float]:
+    latencies = []
+    for product_id, interaction_type in interactions:
+        started = time.perf_counter()
+        await interaction_crud.upsert_interaction(db, user_id, product_id, interaction_type)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def run_bulk(db: AsyncSession, user_id: uuid.UUID, interactions: Interactions, batch: int) -> List[float]:
+    latencies = []
+    for start in range(0, len(interactions), batch):
+        started = time.perf_counter()
+        await interaction_crud.upsert_interactions(db, user_id, interactions[start:start + batch])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+PATHS = {"orm": run_orm, "upsert": run_upsert, "bulk": run_bulk}
+
+
+def summarize(latencies: List[float], interactions: int) -> dict:
+    total_seconds = sum(latencies) / 1000
+    return {
+        "interactions_per_second": interactions / total_seconds if total_seconds else 0.0,
+        "calls": len(latencies),
+        "call_p50_ms": percentile(latencies, 0.50),
+        "call_p99_ms": percentile(latencies, 0.99),
+        "call_mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    flipped = {InteractionType.LIKE: InteractionType.DISLIKE, InteractionType.DISLIKE: InteractionType.LIKE}
+
+    schema = f"bench_{uuid.uuid4().hex[:12]}"
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    # public stays on the path for extensions (pg_trgm) and existing enum types
+    scratch = create_async_engine(DATABASE_URL, connect_args={"server_settings": {"search_path": f"{schema}, public"}})
+
+    results: Dict[str, dict] = {}
+    try:
+        async with scratch.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with AsyncSession(scratch, expire_on_commit=False) as db:
+            product_ids = await create_products(db, args.interactions)
+            await db.commit()
+            inserts = [(product_id, rng.choice(list(InteractionType))) for product_id in product_ids]
+            updates = [(product_id, flipped[interaction_type]) for product_id, interaction_type in inserts]
+
+            for name in args.paths:
+                user_id = await create_user(db)
+                await db.commit()
+                results[name] = {}
+                for phase, interactions in (("insert", inserts), ("update", updates)):
+                    latencies = await PATHS[name](db, user_id, interactions, args.batch)
+                    results[name][phase] = summarize(latencies, len(interactions))
+                    logger.info(f"{name}/{phase}: {results[name][phase]['interactions_per_second']:.0f} "
+                                f"interactions/s")
+    finally:
+        await scratch.dispose()
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+
+    return {"interactions": args.interactions, "batch": args.batch, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Like/dislike write throughput: ORM vs upsert vs bulk upsert.")
+    parser.add_argument("--interactions", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=100, help="Interactions per statement on the bulk path.")
+    parser.add_argument("--paths", nargs="+", choices=sorted(PATHS), default=list(PATHS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    report = json.dumps(asyncio.run(run_benchmark(args)), indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# File: benchmarks/search_latency.py
+"""
+Latency benchmark for GET /products/search on a synthetic catalog.
+
+    python -m benchmarks.search_latency --products 1000000 --queries 500 --report search.json
+
+Generates the catalog server-side (generate_series) inside a single transaction, so the
+search_vector triggers and the GIN/trigram indexes do the same work they do in production,
+then runs a mix of single-term, multi-term, prefix and misspelled queries through
+app.services.product_search, following the cursor for a few pages. Everything is rolled
+back at the end. It must only ever be pointed at a local database, never production.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import engine
+from app.services import product_search
+from benchmarks.feed_replay import percentile
+
+logger = logging.getLogger(__name__)
+
+# Real product words first; sampling is skewed towards the head of the list, like real queries.
+HEAD_WORDS = [
+    "shoe", "shirt", "dress", "jacket", "watch", "bag", "phone", "case", "cable", "charger", "laptop", "mouse",
+    "keyboard", "lamp", "chair", "table", "bottle", "cup", "pan", "knife", "towel", "pillow", "blanket", "toy",
+    "ball", "book", "pen", "wallet", "belt", "hat", "scarf", "glove", "sock", "boot", "sandal", "ring",
+]
+SYLLABLES = ["ka", "lo", "mi", "ra", "te", "su", "no", "vi", "de", "pa", "zo", "ri", "an", "el", "or", "us"]
+COLORS = ["black", "white", "red", "blue", "green", "yellow", "pink", "grey", "brown", "navy", "beige", "orange"]
+
+
+def build_vocabulary(size: int, rng: random.Random) -> List[str]:
+    words = list(HEAD_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+async def generate_catalog(db: AsyncSession, products: int, vocabulary: List[str], seed: float) -> None:
+    user_id, seller_id = uuid.uuid4(), uuid.uuid4()
+    await db.execute(text("SELECT setseed(:seed)"), {"seed": seed})
+    await db.execute(text("INSERT INTO users (id, phone_number) VALUES (:id, :phone)"),
+                     {"id": user_id, "phone": f"bench-{user_id.hex[:12]}"})
+    await db.execute(text("INSERT INTO sellers (id, user_id, is_verified) VALUES (:id, :user_id, false)"),
+                     {"id": seller_id, "user_id": user_id})
+    await db.execute(text(
+        "INSERT INTO brands (name) SELECT 'benchbrand' || i FROM generate_series(1, 500) i ON CONFLICT DO NOTHING"
+    ))
+    await db.execute(text("INSERT INTO attributes (name) VALUES ('benchcolor') ON CONFLICT DO NOTHING"))
+    await db.execute(text(
+        """
+        INSERT INTO attribute_values (attribute_id, value)
+        SELECT a.id, c FROM attributes a, unnest(CAST(:colors AS text[])) c WHERE a.name = 'benchcolor'
+        ON CONFLICT DO NOTHING
+        """
+    ), {"colors": COLORS})
+
+    started = time.perf_counter()
+    await db.execute(text(
+        """
+        INSERT INTO products (id, name, dg_variant_id, selling_price, brand_id, seller_id, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               w[1 + floor(power(random(), 2) * n)::int] || ' ' || w[1 + floor(power(random(), 2) * n)::int]
+                   || ' ' || w[1 + floor(random() * n)::int] || ' ' || i,
+               -i, 1000 * (1 + floor(random() * 5000)::int), b[1 + floor(random() * array_length(b, 1))::int],
+               :seller_id, now(), now()
+        FROM generate_series(1, :products) i,
+             (SELECT CAST(:words AS text[]) AS w, cardinality(CAST(:words AS text[])) AS n) words,
+             (SELECT array_agg(id) AS b FROM brands WHERE name LIKE 'benchbrand%') brand_ids
+        """
+    ), {"seller_id": seller_id, "products": products, "words": vocabulary})
+    await db.execute(text(
+        """
+        INSERT INTO product_attribute_association (product_id, attribute_value_id)
+        SELECT p.id, v[1 + floor(random() * array_length(v, 1))::int]
+        FROM products p,
+             (SELECT array_agg(av.id) AS v FROM attribute_values av
+              JOIN attributes a ON a.id = av.attribute_id WHERE a.name = 'benchcolor') color_ids
+        WHERE p.seller_id = :seller_id
+        """
+    ), {"seller_id": seller_id})
+    await db.execute(text("ANALYZE products"))
+    logger.info(f"Generated {products} products in {time.perf_counter() - started:.1f}s.")
+
+
+def build_queries(count: int, vocabulary: List[str], rng: random.Random) -> List[Dict[str, str]]:
+    def pick() -> str:
+        return vocabulary[int((rng.random() ** 2) * len(vocabulary))]
+
+    def misspell(word: str) -> str:
+        position = rng.randrange(len(word))
+        return word[:position] + rng.choice("aeioukt") + word[position + 1:]
+
+    kinds = {
+        "single": lambda: pick(),
+        "two-terms": lambda: f"{pick()} {pick()}",
+        "term-color": lambda: f"{pick()} {rng.choice(COLORS)}",
+        "prefix": lambda: pick()[:3],
+        "misspelled": lambda: misspell(pick()),
+    }
+    names = list(kinds)
+    return [{"kind": names[i % len(names)], "q": kinds[names[i % len(names)]]()} for i in range(count)]
+
+
+def summarize(samples: List[float]) -> dict:
+    return {
+        "samples": len(samples),
+        "p50": percentile(samples, 0.50),
+        "p99": percentile(samples, 0.99),
+        "mean": statistics.fmean(samples) if samples else 0.0,
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    vocabulary = build_vocabulary(args.vocabulary, rng)
+    queries = build_queries(args.queries, vocabulary, rng)
+
+    latencies: Dict[str, List[float]] = {}
+    empty: Dict[str, int] = {}
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+            await generate_catalog(db, args.products, vocabulary, args.seed)
+
+            for query in queries:
+                cursor = None
+                for page in range(1, args.pages + 1):
+                    started = time.perf_counter()
+                    product_ids, cursor = await product_search.search(db, query["q"], args.limit, cursor)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    latencies.setdefault(f"{query['kind']}/page{page}", []).append(elapsed_ms)
+                    if page == 1 and not product_ids:
+                        empty[query["kind"]] = empty.get(query["kind"], 0) + 1
+                    if cursor is None:
+                        break
+        finally:
+            await transaction.rollback()
+
+    return {
+        "products": args.products,
+        "queries": len(queries),
+        "limit": args.limit,
+        "latency_ms": {key: summarize(samples) for key, samples in sorted(latencies.items())},
+        "empty_first_pages": empty,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Product search latency on a synthetic catalog.")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=3, help="Pages to follow per query through the cursor.")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=float, default=0.42)
+    parser.add_argument("--report", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    report = json.dumps(asyncio.run(run_benchmark(args)), indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
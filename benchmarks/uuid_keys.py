@@ -0,0 +1,122 @@
+# File: benchmarks/uuid_keys.py
+"""
+Insert benchmark for random (v4) versus time-ordered (v7) UUID keys.
+
+    python -m benchmarks.uuid_keys --rows 2000000 --batch 5000 --report uuid_keys.json
+
+For each generator it creates two scratch tables, one keyed by id (like products) and one
+with a composite (collection_id, product_id) key (like collection pins), inserts the rows in
+batches and reports the insert rate, the primary key index size and how many index pages
+the inserts dirtied (from pg_statio). The tables are dropped afterwards. It must only ever be
+pointed at a local database, never production.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from typing import Callable, Dict
+
+import asyncpg
+
+from app.core.ids import uuid7
+from app.db.session import get_asyncpg_dsn
+
+logger = logging.getLogger(__name__)
+
+GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+async def _index_stats(conn: asyncpg.Connection, table: str) -> dict:
+    row = await conn.fetchrow(
+        """
+        SELECT pg_relation_size(i.indexrelid) AS bytes,
+               s.idx_blks_read + s.idx_blks_hit AS blocks_touched
+        FROM pg_index i
+        JOIN pg_statio_user_indexes s ON s.indexrelid = i.indexrelid
+        WHERE i.indrelid = $1::regclass AND i.indisprimary
+        """,
+        table,
+    )
+    return {"index_bytes": row["bytes"], "index_blocks_touched": row["blocks_touched"]}
+
+
+async def bench_single_key(conn: asyncpg.Connection, name: str, make_id, rows: int, batch: int) -> dict:
+    table = f"bench_keys_{name}"
+    await conn.execute(f"CREATE UNLOGGED TABLE {table} (id uuid PRIMARY KEY, payload integer NOT NULL)")
+    try:
+        started = time.perf_counter()
+        for offset in range(0, rows, batch):
+            size = min(batch, rows - offset)
+            await conn.execute(
+                f"INSERT INTO {table} (id, payload) SELECT * FROM unnest($1::uuid[], $2::integer[])",
+                [make_id() for _ in range(size)], list(range(offset, offset + size)),
+            )
+        elapsed = time.perf_counter() - started
+        return {"rows_per_second": rows / elapsed, "seconds": elapsed, **await _index_stats(conn, table)}
+    finally:
+        await conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+async def bench_composite_key(
+        conn: asyncpg.Connection, name: str, make_id, rows: int, batch: int, collections: int, rng: random.Random,
+) -> dict:
+    table = f"bench_pins_{name}"
+    await conn.execute(
+        f"CREATE UNLOGGED TABLE {table} (collection_id uuid NOT NULL, product_id uuid NOT NULL, "
+        f"PRIMARY KEY (collection_id, product_id))"
+    )
+    try:
+        collection_ids = [make_id() for _ in range(collections)]
+        started = time.perf_counter()
+        for offset in range(0, rows, batch):
+            size = min(batch, rows - offset)
+            await conn.execute(
+                f"INSERT INTO {table} (collection_id, product_id) SELECT * FROM unnest($1::uuid[], $2::uuid[])",
+                [rng.choice(collection_ids) for _ in range(size)], [make_id() for _ in range(size)],
+            )
+        elapsed = time.perf_counter() - started
+        return {"rows_per_second": rows / elapsed, "seconds": elapsed, **await _index_stats(conn, table)}
+    finally:
+        await conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    results = {}
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    try:
+        for name, make_id in GENERATORS.items():
+            rng = random.Random(args.seed)
+            single = await bench_single_key(conn, name, make_id, args.rows, args.batch)
+            composite = await bench_composite_key(conn, name, make_id, args.rows, args.batch, args.collections, rng)
+            results[name] = {"single_key": single, "composite_key": composite}
+            logger.info(f"{name}: {single['rows_per_second']:.0f} rows/s (id), "
+                        f"{composite['rows_per_second']:.0f} rows/s (collection_id, product_id)")
+    finally:
+        await conn.close()
+    return {"rows": args.rows, "batch": args.batch, "collections": args.collections, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Insert rate and index size with UUIDv4 versus UUIDv7 keys.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--collections", type=int, default=10_000, help="Distinct collections in the pins table.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    report = json.dumps(asyncio.run(run_benchmark(args)), indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@ import logging
 
 from fastapi import FastAPI
 from sqlalchemy.sql import text
-from app.api.v1.routes import health, auth, user, product as product_router, interaction as interaction_router, collection as collection_router
+from app.api.v1.routes import health, auth, user, product as product_router, interaction as interaction_router, collection as collection_router, impression as impression_router, seller as seller_router
 from app.core.config import settings
 from app.core.logging_config import configure_logging
 from app.db import session as db_session
+from app.db.redis_session import redis_pool
+from app.services.catalog_changes import CatalogChangeListener
+import redis.asyncio as redis
 
 # Configure logging at the module's entry point
 configure_logging()
@@ -22,7 +25,15 @@ async def lifespan(_app: FastAPI):
         log.info("Database connection pool established successfully.")
     except Exception as e:
         log.critical(f"Failed to connect to the database on startup: {e}")
+    # Invalidate caches when the catalog is changed outside the app
+    change_listener = None
+    if settings.CATALOG_CHANGES_LISTEN:
+        change_listener = CatalogChangeListener(redis.Redis(connection_pool=redis_pool))
+        change_listener.start()
     yield
+    if change_listener is not None:
+        await change_listener.stop()
+        await change_listener.redis.close()
     # Cleanly close the connection pool on shutdown
     log.info("Closing database connection pool...")
     await db_session.engine.dispose()
@@ -64,6 +75,9 @@ def create_app() -> FastAPI:
     app_instance.include_router(auth.router)
     app_instance.include_router(interaction_router.router)
     app_instance.include_router(collection_router.router)
+    app_instance.include_router(collection_router.collections_router)
+    app_instance.include_router(impression_router.router)
+    app_instance.include_router(seller_router.router)
     return app_instance
 
 
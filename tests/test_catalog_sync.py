@@ -0,0 +1,156 @@
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+import pytest
+
+from app.ingest.catalog import CatalogRecord, ChunkStats
+from app.ingest.fake_source import FakeCatalog, create_app
+from app.ingest.sync import CURSOR_KEY, ETAGS_KEY, CatalogSource, CatalogSync
+
+pytestmark = pytest.mark.anyio
+
+
+class MemoryRedis:
+    """The handful of Redis commands CatalogSync uses, kept in dicts."""
+
+    def __init__(self):
+        self.values: Dict[str, str] = {}
+        self.hashes: Dict[str, Dict[str, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value) -> None:
+        self.values[key] = str(value)
+
+    async def hmget(self, key: str, fields: Sequence[str]) -> List[Optional[str]]:
+        stored = self.hashes.get(key, {})
+        return [stored.get(name) for name in fields]
+
+    async def hset(self, key: str, mapping: Dict[str, str]) -> None:
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def pipeline(self) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, redis_client: MemoryRedis):
+        self.redis = redis_client
+        self.commands = []
+
+    def set(self, *args) -> None:
+        self.commands.append(self.redis.set(*args))
+
+    def hset(self, key: str, mapping: Dict[str, str]) -> None:
+        self.commands.append(self.redis.hset(key, mapping=mapping))
+
+    async def execute(self) -> list:
+        return [await command for command in self.commands]
+
+
+class RecordingIngestor:
+    """Stands in for CatalogIngestor and keeps every chunk it is handed."""
+
+    def __init__(self):
+        self.chunks: List[List[CatalogRecord]] = []
+
+    async def prepare(self) -> None:
+        pass
+
+    async def ingest_chunk(self, records: Sequence[CatalogRecord]) -> ChunkStats:
+        self.chunks.append(list(records))
+        return ChunkStats(records=len(records), inserted=len(records))
+
+    @property
+    def records(self) -> List[CatalogRecord]:
+        return [record for chunk in self.chunks for record in chunk]
+
+
+@pytest.fixture
+def catalog() -> FakeCatalog:
+    return FakeCatalog(products=25, seed=1)
+
+
+@pytest.fixture
+def redis_client() -> MemoryRedis:
+    return MemoryRedis()
+
+
+@pytest.fixture
+async def source(catalog):
+    source = CatalogSource("http://catalog", concurrency=4, transport=httpx.ASGITransport(app=create_app(catalog)))
+    yield source
+    await source.close()
+
+
+def make_sync(source: CatalogSource, redis_client: MemoryRedis) -> CatalogSync:
+    sync = CatalogSync(source, conn=None, redis_client=redis_client, seller_id=uuid.uuid4())
+    sync.ingestor = RecordingIngestor()
+    return sync
+
+
+async def test_first_sync_pages_through_the_whole_feed(catalog, source, redis_client):
+    sync = make_sync(source, redis_client)
+
+    stats = await sync.run_once(page_size=10)
+
+    assert stats.pages == 3
+    assert stats.listed == stats.fetched == stats.inserted == 25
+    assert stats.since == catalog.version
+    assert sorted(record.dg_variant_id for record in sync.ingestor.records) == [5_000_000 + offset for offset in range(25)]
+    assert redis_client.values[CURSOR_KEY] == str(catalog.version)
+    assert len(redis_client.hashes[ETAGS_KEY]) == 25
+
+
+async def test_idle_source_answers_not_modified(source, redis_client):
+    await make_sync(source, redis_client).run_once(page_size=10)
+    sync = make_sync(source, redis_client)
+
+    stats = await sync.run_once(page_size=10)
+
+    assert stats.pages == 0
+    assert stats.fetched == 0
+    assert sync.ingestor.chunks == []
+
+
+async def test_only_changed_products_are_fetched(catalog, source, redis_client):
+    await make_sync(source, redis_client).run_once(page_size=10)
+    catalog.mutate(3)
+    sync = make_sync(source, redis_client)
+
+    stats = await sync.run_once(page_size=10)
+
+    assert stats.listed == stats.fetched == 3
+    assert stats.since == catalog.version
+    changed = {dg_product_id for dg_product_id, version in catalog.versions.items() if version > 25}
+    assert {record.dg_product_id for record in sync.ingestor.records} == changed
+
+
+async def test_products_listed_again_after_a_crash_answer_not_modified(catalog, source, redis_client):
+    await make_sync(source, redis_client).run_once(page_size=10)
+    # The mark is lost (e.g. the process died before moving it); the ETags are still there
+    redis_client.values[CURSOR_KEY] = "0"
+    sync = make_sync(source, redis_client)
+
+    stats = await sync.run_once(page_size=10)
+
+    assert stats.listed == stats.not_modified == 25
+    assert stats.fetched == 0
+    assert sync.ingestor.chunks == []
+    assert redis_client.values[CURSOR_KEY] == str(catalog.version)
+
+
+async def test_products_gone_at_the_source_are_skipped(catalog, source, redis_client):
+    gone = next(iter(catalog.docs))
+    del catalog.docs[gone]
+    sync = make_sync(source, redis_client)
+
+    stats = await sync.run_once(page_size=10)
+
+    assert stats.listed == 25
+    assert stats.fetched == 24
+    assert gone not in {record.dg_product_id for record in sync.ingestor.records}
+    assert str(gone) not in redis_client.hashes[ETAGS_KEY]
+    assert stats.since == catalog.version